@@ -1,15 +1,58 @@
+import itertools
 from abc import ABC, abstractmethod
-from typing import List, Type, Union, Optional, Set
+from typing import List, Type, Union, Optional, Set, Dict, Hashable, Callable, Tuple
 
 import numpy as np
 
 from gig.main.corpus import Corpus
+from gig.main.corpus_event import CorpusEvent
 from gig.main.candidate import Candidate
-from gig.main.exceptions import DescriptorError
+from gig.io.parsable import ParsableEnum
+from gig.main.exceptions import CandidatesError, CorpusError
 from gig.main.descriptor import Descriptor
+from gig.main.label import Label
 from gig.stubs.transform import Transform
 
 
+class TransformTable:
+    """ Lookup table interning transforms as integer ids, allowing array-based `Candidates` to store transforms as
+        an integer array rather than one object per candidate. Id 0 is always reserved for `None` (no transform). """
+
+    def __init__(self, transforms: Optional[List[Optional[Union[Transform, int]]]] = None):
+        self.transforms: List[Optional[Union[Transform, int]]] = [None]
+        self._lookup: Dict[Hashable, int] = {self._key(None): 0}
+        if transforms is not None:
+            for transform in transforms:
+                self.id_of(transform)
+
+    def __len__(self):
+        return len(self.transforms)
+
+    def id_of(self, transform: Optional[Union[Transform, int]]) -> int:
+        """ Returns the id of `transform`, adding it to the table if it doesn't exist """
+        key: Hashable = self._key(transform)
+        try:
+            return self._lookup[key]
+        except KeyError:
+            self.transforms.append(transform)
+            self._lookup[key] = len(self.transforms) - 1
+            return len(self.transforms) - 1
+
+    def lookup(self, transform_ids: np.ndarray) -> List[Optional[Union[Transform, int]]]:
+        return [self.transforms[i] for i in transform_ids]
+
+    def remap(self, transforms: List[Optional[Union[Transform, int]]]) -> np.ndarray:
+        """ Returns an array mapping each position in `transforms` to the corresponding id in this table """
+        return np.array([self.id_of(t) for t in transforms], dtype=np.int32)
+
+    @staticmethod
+    def _key(transform: Optional[Union[Transform, int]]) -> Hashable:
+        # TODO[B2]: Transforms are temporarily allowed to be integers, these are compared by value
+        if isinstance(transform, Transform):
+            return type(transform), transform.to_id()
+        return transform
+
+
 class Candidates(ABC):
 
     # TODO[B2] This cannot be implemented until we have a good solution for transforms
@@ -18,9 +61,17 @@ class Candidates(ABC):
     # def create_empty(cls, associated_corpus: Corpus, *args, **kwargs) -> 'Candidates':
     #     """ """
 
+    def __init__(self):
+        self._feature_cache: Dict[Union[Type[Descriptor], str], np.ndarray] = {}
+
     def __len__(self):
         return self.size()
 
+    def clear_feature_cache(self) -> None:
+        """ Invalidate all cached feature arrays. Membership changes through `add`, `remove`, etc. are handled
+            automatically, but this needs to be called if the underlying candidates are modified by other means. """
+        self._feature_cache.clear()
+
     @abstractmethod
     def shallow_copy(self) -> 'Candidates':
         """ :raises TypeError if trying to copy `Candidates` as an invalid type. """
@@ -31,7 +82,12 @@ class Candidates(ABC):
 
     @abstractmethod
     def get_feature_array(self, feature: Union[Type[Descriptor], str]) -> np.ndarray:
-        """ """
+        """ raises: DescriptorError if any of the candidates' events doesn't have the given feature """
+
+    @abstractmethod
+    def get_label_codes(self, label_type: Union[Type[Label], str]) -> np.ndarray:
+        """ Returns the code (see `Corpus.get_label_codes`) of the label `label_type` of each candidate's event.
+            raises: LabelError if any of the candidates' corpora doesn't have labels of the given type """
 
     @abstractmethod
     def get_candidate(self, index: int) -> Candidate:
@@ -65,6 +121,13 @@ class Candidates(ABC):
     def remove(self, indices: Union[int, np.ndarray]) -> None:
         """ :raises IndexError if an index is out of bounds """
 
+    def keep(self, indices: np.ndarray) -> None:
+        """ Retain only the candidates given by `indices` (either an array of indices or a boolean mask of the same
+            size as the candidates) and remove all others, i.e. the complement of `remove`.
+            Function that may be overridden for optimization reasons
+            :raises IndexError if an index is out of bounds """
+        self.remove(~self.as_mask(indices))
+
     @abstractmethod
     def is_empty(self) -> bool:
         """ """
@@ -90,9 +153,78 @@ class Candidates(ABC):
             ```
         """
 
+    def top_k(self, k: int, sort: bool = True) -> np.ndarray:
+        """ Returns the indices of the `k` candidates with the highest scores (or all indices if `k` exceeds the
+            number of candidates), in descending order of score if `sort` is True. Uses partial sorting, so only the
+            selected `k` indices are sorted. Use `keep` to reduce the candidates to the selection. """
+        scores: np.ndarray = self.get_scores()
+        k = min(max(k, 0), scores.size)
+        if k == 0:
+            return np.zeros(0, dtype=np.intp)
+        if k < scores.size:
+            indices: np.ndarray = np.argpartition(-scores, k - 1)[:k]
+        else:
+            indices: np.ndarray = np.arange(scores.size)
+        if sort:
+            indices = indices[np.argsort(-scores[indices], kind="stable")]
+        return indices
+
+    def argmax(self) -> Optional[int]:
+        """ Returns the index of the candidate with the highest score or None if there are no candidates """
+        scores: np.ndarray = self.get_scores()
+        if scores.size == 0:
+            return None
+        return int(np.argmax(scores))
+
+    def threshold(self, min_score: float) -> np.ndarray:
+        """ Returns the indices of all candidates with a score greater than or equal to `min_score`.
+            Use `keep` to reduce the candidates to the selection. """
+        return np.flatnonzero(self.get_scores() >= min_score)
+
+    def as_mask(self, indices: Union[int, np.ndarray]) -> np.ndarray:
+        """ Convert an index, an array of indices or a boolean mask to a boolean mask
+            :raises IndexError if an index is out of bounds or if a boolean mask has an invalid size """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            if indices.shape != (self.size(),):
+                raise IndexError(f"boolean mask of shape {indices.shape} does not match {self.size()} candidates")
+            return indices
+        mask: np.ndarray = np.zeros(self.size(), dtype=bool)
+        mask[indices.astype(np.intp, copy=False)] = True
+        return mask
+
+    def _cached_feature_array(self, feature: Union[Type[Descriptor], str],
+                              gather: Callable[[], np.ndarray]) -> np.ndarray:
+        """ Returns the cached (read-only) array for `feature`, calling `gather` to compute it if not cached """
+        try:
+            return self._feature_cache[feature]
+        except KeyError:
+            values: np.ndarray = gather()
+            values.flags.writeable = False
+            self._feature_cache[feature] = values
+            return values
+
+    def _extend_feature_cache(self, gather: Callable[[Union[Type[Descriptor], str]], np.ndarray]) -> None:
+        """ Append the feature values of newly added candidates (computed by `gather`) to each cached feature array """
+        for feature, values in self._feature_cache.items():
+            new_values: np.ndarray = gather(feature)
+            if new_values.shape[0] == 0:
+                continue
+            values = new_values if values.shape[0] == 0 else np.concatenate((values, new_values))
+            values.flags.writeable = False
+            self._feature_cache[feature] = values
+
+    def _remove_from_feature_cache(self, indices: Union[int, np.ndarray]) -> None:
+        """ Remove the given indices (or boolean mask) from each cached feature array """
+        for feature, values in self._feature_cache.items():
+            values = np.delete(values, indices, axis=0)
+            values.flags.writeable = False
+            self._feature_cache[feature] = values
+
 
 class ListCandidates(Candidates):
     def __init__(self, candidates: List[Candidate], associated_corpus: Optional[Corpus] = None):
+        super().__init__()
         self._candidates: List[Candidate] = candidates
 
         self.corpora: Set[Corpus] = set()
@@ -107,18 +239,28 @@ class ListCandidates(Candidates):
         return cls([], associated_corpus=associated_corpus)
 
     def shallow_copy(self) -> 'Candidates':
-        return ListCandidates([c.shallow_copy() for c in self._candidates])
+        copy: ListCandidates = ListCandidates([c.shallow_copy() for c in self._candidates])
+        copy._feature_cache = dict(self._feature_cache)
+        return copy
 
     def add(self, candidates: List[Candidate], **kwargs) -> None:
         self._candidates.extend(candidates)
         for candidate in candidates:
             self.corpora.add(candidate.associated_corpus)
+        self._extend_feature_cache(lambda feature: self._gather_features(feature, candidates))
 
     def get_feature_array(self, feature: Union[Type[Descriptor], str]) -> np.ndarray:
-        try:
-            return np.array([c.event.get_descriptor(feature).value for c in self._candidates])
-        except KeyError as e:
-            raise DescriptorError(e)
+        """ Note: the returned array is cached and read-only. If candidates in the list returned from
+            `get_candidates` are modified directly, `clear_feature_cache` must be called. """
+        return self._cached_feature_array(feature, lambda: self._gather_features(feature, self._candidates))
+
+    def get_label_codes(self, label_type: Union[Type[Label], str]) -> np.ndarray:
+        positions: Optional[Tuple[List[Corpus], np.ndarray, np.ndarray]] = self._corpus_positions(self._candidates)
+        if positions is None:
+            labels: List[Optional[Label]] = [c.event.labels.get(label_type) for c in self._candidates]
+            return np.fromiter((-1 if label is None else label.code for label in labels), dtype=np.int64,
+                               count=len(labels))
+        return _gather_label_codes(label_type, *positions)
 
     def get_candidate(self, index: int) -> Candidate:
         return self._candidates[index]
@@ -127,10 +269,10 @@ class ListCandidates(Candidates):
         return self._candidates
 
     def get_scores(self) -> np.ndarray:
-        return np.array([c.score for c in self._candidates], dtype=np.int32)
+        return np.fromiter((c.score for c in self._candidates), dtype=np.float64, count=len(self._candidates))
 
     def get_indices(self) -> np.ndarray:
-        return np.array([c.event.index for c in self._candidates], dtype=np.int32)
+        return np.fromiter((c.event.index for c in self._candidates), dtype=np.int32, count=len(self._candidates))
 
     def get_transforms(self) -> List[Transform]:
         return [c.transform for c in self._candidates]
@@ -139,18 +281,23 @@ class ListCandidates(Candidates):
         return list(self.corpora)
 
     def normalize(self, norm: float = 1.0) -> None:
-        scores: np.ndarray = np.array([c.score for c in self._candidates])
+        scores: np.ndarray = self.get_scores()
         if scores.size > 0:
             normalization_factor: float = norm / float(np.max(scores))
             for c in self._candidates:
                 c.score *= normalization_factor
 
     def remove(self, indices: Union[int, np.ndarray]) -> None:
-        if isinstance(indices, int):
+        """ `indices` may be a single index, an array of indices or a boolean mask. Removing multiple candidates
+            is performed in a single pass over the candidates. """
+        if isinstance(indices, (int, np.integer)):
             del self._candidates[indices]
+            self._remove_from_feature_cache(indices)
         else:
-            for index in sorted(indices, reverse=True):
-                del self._candidates[index]
+            self._compact(~self.as_mask(indices))
+
+    def keep(self, indices: np.ndarray) -> None:
+        self._compact(self.as_mask(indices))
 
     def is_empty(self) -> bool:
         return len(self._candidates) == 0
@@ -167,10 +314,506 @@ class ListCandidates(Candidates):
         for c, s in zip(self._candidates, scores):  # type: Candidate, float
             c.score = s
 
+    def _compact(self, keep: np.ndarray) -> None:
+        """ Retain the candidates where `keep` is True (in place, to not invalidate `get_candidates`) """
+        self._candidates[:] = itertools.compress(self._candidates, keep)
+        self._remove_from_feature_cache(~keep)
+
+    @staticmethod
+    def _gather_features(feature: Union[Type[Descriptor], str], candidates: List[Candidate]) -> np.ndarray:
+        """ raises: DescriptorError if any of the events doesn't have a descriptor of the given type """
+        positions: Optional[Tuple[List[Corpus], np.ndarray, np.ndarray]] = ListCandidates._corpus_positions(candidates)
+        if positions is None:
+            return np.array([c.event.get_descriptor(feature).value for c in candidates])
+        return _gather_features(feature, *positions)
+
+    @staticmethod
+    def _corpus_positions(candidates: List[Candidate]) -> Optional[Tuple[List[Corpus], np.ndarray, np.ndarray]]:
+        """ The corpora of the candidates, the corpus id of each candidate and the position of its event in its
+            corpus (given by the index of the event), allowing values to be gathered from the corpora's columns.
+            Returns None if any event isn't at the position given by its index in its corpus, in which case values
+            must be read from the events """
+        corpus_lookup: Dict[Corpus, int] = {}
+        corpus_ids: np.ndarray = np.array([corpus_lookup.setdefault(c.associated_corpus, len(corpus_lookup))
+                                           for c in candidates], dtype=np.int32)
+        indices: np.ndarray = np.array([c.event.index for c in candidates], dtype=np.int32)
+        for candidate, index in zip(candidates, indices.tolist()):
+            events: List[CorpusEvent] = candidate.associated_corpus.events
+            if not 0 <= index < len(events) or events[index] is not candidate.event:
+                return None
+        return list(corpus_lookup.keys()), corpus_ids, indices
+
+
+class PeakMergeMode(ParsableEnum):
+    """ Strategy for combining the scores of peaks added at an (index, transform) that already exists """
+    SUM = "sum"
+    MAX = "max"
+
 
 class DiscreteCandidates(Candidates):
-    pass  # TODO: Implementation ongoing in somax.peaks
+    """ Sparse `Candidates` over a single corpus, storing a set of (event index, score, transform) peaks.
+
+        Peaks are stored in pre-allocated numpy buffers that grow geometrically, so adding peaks is amortized O(1)
+        per peak. Adding a peak at an (index, transform) that already exists merges it into the existing peak
+        according to `merge_mode` rather than creating a duplicate (existing peaks are found through a dict mapping
+        each (index, transform) to its position in the buffers, which is rebuilt when peaks are removed).
+        All operations (`decay`, `apply_threshold`, `prune`, `remove`, etc.) are performed in place without creating
+        any `Candidate` objects.
+    """
+    INITIAL_CAPACITY = 64
+    GROWTH_FACTOR = 2
+
+    def __init__(self,
+                 associated_corpus: Corpus,
+                 indices: Optional[np.ndarray] = None,
+                 scores: Optional[np.ndarray] = None,
+                 transform_ids: Optional[np.ndarray] = None,
+                 transforms: Optional[List[Optional[Union[Transform, int]]]] = None,
+                 merge_mode: PeakMergeMode = PeakMergeMode.MAX):
+        """ `transform_ids` refer to positions in `transforms` (or to `None` if no `transforms` are provided). """
+        super().__init__()
+        self.corpus: Corpus = associated_corpus
+        self.merge_mode: PeakMergeMode = merge_mode
+        self._transforms: TransformTable = TransformTable()
+        self._size: int = 0
+        self._indices: np.ndarray = np.zeros(self.INITIAL_CAPACITY, dtype=np.int32)
+        self._scores: np.ndarray = np.zeros(self.INITIAL_CAPACITY, dtype=np.float64)
+        self._transform_ids: np.ndarray = np.zeros(self.INITIAL_CAPACITY, dtype=np.int32)
+        self._slots: Dict[int, int] = {}  # {key of (index, transform) (see `_keys`): position in buffers}
+
+        if indices is not None:
+            indices = np.asarray(indices, dtype=np.int32).reshape(-1)
+            scores = np.ones(indices.size) if scores is None else scores
+            if transform_ids is not None and transforms is not None:
+                transform_map: np.ndarray = self._transforms.remap(transforms)
+                transform_ids = transform_map[np.asarray(transform_ids, dtype=np.int32)]
+            self.add_peaks(indices, scores, transform_ids)
+
+    @classmethod
+    def new_empty(cls, associated_corpus: Corpus, merge_mode: PeakMergeMode = PeakMergeMode.MAX):
+        return cls(associated_corpus, merge_mode=merge_mode)
+
+    def shallow_copy(self) -> 'DiscreteCandidates':
+        copy: DiscreteCandidates = DiscreteCandidates(self.corpus, merge_mode=self.merge_mode)
+        copy._transforms = TransformTable(self._transforms.transforms)
+        copy._reserve(self._size)
+        copy._indices[:self._size] = self._indices[:self._size]
+        copy._scores[:self._size] = self._scores[:self._size]
+        copy._transform_ids[:self._size] = self._transform_ids[:self._size]
+        copy._size = self._size
+        copy._slots = dict(self._slots)
+        copy._feature_cache = dict(self._feature_cache)
+        return copy
+
+    def add(self, candidates: List[Candidate], **kwargs) -> None:
+        """ raises: CorpusError if any of the candidates belongs to another corpus """
+        for candidate in candidates:
+            if candidate.associated_corpus is not self.corpus:
+                raise CorpusError(f"Cannot add candidates from another corpus to {self.__class__.__name__}")
+
+        self.add_peaks(indices=np.array([c.event.index for c in candidates], dtype=np.int32),
+                       scores=np.array([c.score for c in candidates], dtype=np.float64),
+                       transform_ids=np.array([self._transforms.id_of(c.transform) for c in candidates],
+                                              dtype=np.int32))
+
+    def add_peaks(self,
+                  indices: np.ndarray,
+                  scores: Union[float, np.ndarray],
+                  transform_ids: Optional[np.ndarray] = None) -> None:
+        """ Add peaks, merging them by (index, transform) with existing peaks as well as with each other.
+            `transform_ids` refer to the ids returned from `transform_id`. """
+        indices = np.asarray(indices, dtype=np.int32).reshape(-1)
+        if indices.size == 0:
+            return
+        scores = np.broadcast_to(np.asarray(scores, dtype=np.float64), indices.shape)
+        transform_ids = (np.zeros(indices.size, dtype=np.int32) if transform_ids is None
+                         else np.asarray(transform_ids, dtype=np.int32).reshape(-1))
+
+        # merge duplicates within the added peaks
+        keys, inverse = np.unique(self._keys(indices, transform_ids), return_inverse=True)
+        merged_scores: np.ndarray = np.zeros(keys.size, dtype=np.float64)
+        if self.merge_mode == PeakMergeMode.SUM:
+            np.add.at(merged_scores, inverse, scores)
+        else:
+            merged_scores.fill(-np.inf)
+            np.maximum.at(merged_scores, inverse, scores)
+
+        # merge with existing peaks
+        slots: np.ndarray = np.fromiter((self._slots.get(key, -1) for key in keys.tolist()), dtype=np.intp,
+                                        count=keys.size)
+        matched: np.ndarray = slots >= 0
+        if np.any(matched):
+            slots = slots[matched]
+            if self.merge_mode == PeakMergeMode.SUM:
+                self._scores[slots] += merged_scores[matched]
+            else:
+                self._scores[slots] = np.maximum(self._scores[slots], merged_scores[matched])
+
+        new: np.ndarray = ~matched
+        num_new: int = int(np.count_nonzero(new))
+        self._reserve(self._size + num_new)
+        end: int = self._size + num_new
+        self._indices[self._size:end] = keys[new] >> 32
+        self._transform_ids[self._size:end] = keys[new] & 0xFFFFFFFF
+        self._scores[self._size:end] = merged_scores[new]
+        self._slots.update(zip(keys[new].tolist(), range(self._size, end)))
+        self._extend_feature_cache(lambda feature: self.corpus.gather_descriptors(feature,
+                                                                                   self._indices[self._size:end]))
+        self._size = end
+
+    def transform_id(self, transform: Optional[Union[Transform, int]]) -> int:
+        """ Returns the id used to refer to `transform` in `add_peaks` """
+        return self._transforms.id_of(transform)
+
+    def decay(self, factor: float) -> None:
+        """ Multiply all peak scores by `factor` in place """
+        self._scores[:self._size] *= factor
+
+    def apply_threshold(self, min_score: float) -> None:
+        """ Remove all peaks with a score lower than `min_score` in place """
+        self._compact(self._scores[:self._size] >= min_score)
+
+    def prune(self, max_size: int) -> None:
+        """ Keep only the `max_size` peaks with the highest scores (in arbitrary order) """
+        if self._size > max_size:
+            mask: np.ndarray = np.zeros(self._size, dtype=bool)
+            mask[np.argpartition(-self._scores[:self._size], max_size)[:max_size]] = True
+            self._compact(mask)
+
+    def get_feature_array(self, feature: Union[Type[Descriptor], str]) -> np.ndarray:
+        """ Note: the returned array is cached and read-only """
+        return self._cached_feature_array(feature, lambda: self.corpus.gather_descriptors(feature, self.get_indices()))
+
+    def get_label_codes(self, label_type: Union[Type[Label], str]) -> np.ndarray:
+        return self.corpus.gather_label_codes(label_type, self.get_indices())
+
+    def get_candidate(self, index: int) -> Candidate:
+        if not -self._size <= index < self._size:
+            raise IndexError(f"index {index} is out of bounds for {self.__class__.__name__} of size {self._size}")
+        index %= self._size
+        return Candidate(event=self.corpus.events[self._indices[index]],
+                         score=float(self._scores[index]),
+                         transform=self._transforms.transforms[self._transform_ids[index]],
+                         associated_corpus=self.corpus)
+
+    def get_candidates(self) -> List[Candidate]:
+        return [self.get_candidate(i) for i in range(self._size)]
+
+    def get_scores(self) -> np.ndarray:
+        """ Note: returns a view of the internal score buffer, use `scale` or `normalize` to modify scores """
+        return self._scores[:self._size]
+
+    def get_indices(self) -> np.ndarray:
+        """ Note: returns a view of the internal index buffer, which should not be modified """
+        return self._indices[:self._size]
+
+    def get_transforms(self) -> List[Transform]:
+        return self._transforms.lookup(self._transform_ids[:self._size])
+
+    def get_transform_ids(self) -> np.ndarray:
+        return self._transform_ids[:self._size]
+
+    def transform_table(self) -> List[Optional[Union[Transform, int]]]:
+        return self._transforms.transforms
+
+    def associated_corpora(self) -> List[Corpus]:
+        return [self.corpus]
+
+    def normalize(self, norm: float = 1.0) -> None:
+        if self._size > 0:
+            max_score: float = float(np.max(self._scores[:self._size]))
+            if max_score > 0:
+                self._scores[:self._size] *= norm / max_score
+
+    def remove(self, indices: Union[int, np.ndarray]) -> None:
+        """ `indices` may be a single index, an array of indices or a boolean mask.
+            raises: IndexError if an index is out of bounds """
+        self._compact(~self.as_mask(indices))
+
+    def keep(self, indices: np.ndarray) -> None:
+        self._compact(self.as_mask(indices))
+
+    def is_empty(self) -> bool:
+        return self._size == 0
+
+    def size(self) -> int:
+        return self._size
+
+    def scale(self, factors: Union[float, np.ndarray], indices: Optional[np.ndarray] = None) -> None:
+        if indices is not None:
+            self._scores[:self._size][indices] *= factors
+        else:
+            self._scores[:self._size] *= factors
+
+    def _compact(self, keep: np.ndarray) -> None:
+        """ Move all peaks where `keep` is True to the beginning of the buffers """
+        num_kept: int = int(np.count_nonzero(keep))
+        if num_kept < self._size:
+            self._indices[:num_kept] = self._indices[:self._size][keep]
+            self._scores[:num_kept] = self._scores[:self._size][keep]
+            self._transform_ids[:num_kept] = self._transform_ids[:self._size][keep]
+            self._remove_from_feature_cache(~keep)
+            self._size = num_kept
+            self._slots = dict(zip(self._keys(self._indices[:num_kept], self._transform_ids[:num_kept]).tolist(),
+                                   range(num_kept)))
+
+    def _reserve(self, capacity: int) -> None:
+        if capacity > self._indices.size:
+            new_capacity: int = max(capacity, self._indices.size * self.GROWTH_FACTOR)
+            self._indices = self._grow(self._indices, new_capacity)
+            self._scores = self._grow(self._scores, new_capacity)
+            self._transform_ids = self._grow(self._transform_ids, new_capacity)
+
+    def _grow(self, buffer: np.ndarray, capacity: int) -> np.ndarray:
+        new_buffer: np.ndarray = np.zeros(capacity, dtype=buffer.dtype)
+        new_buffer[:self._size] = buffer[:self._size]
+        return new_buffer
+
+    @staticmethod
+    def _keys(indices: np.ndarray, transform_ids: np.ndarray) -> np.ndarray:
+        return (indices.astype(np.int64) << 32) | transform_ids.astype(np.int64)
 
 
 class MatrixCandidates(Candidates):
-    pass
+    """ Columnar `Candidates` storing scores, event indices, transforms and corpora as parallel numpy arrays.
+
+        Transforms and corpora are stored as integer ids referring to the lookup tables `self._transforms` and
+        `self._corpora`. `Candidate` objects are only created when explicitly requested through `get_candidate` or
+        `get_candidates`, and modifying them will not affect the internal state: use `scale`, `normalize`, etc.
+
+        Note: event indices are assumed to correspond to the position of each event in its corpus.
+    """
+
+    def __init__(self,
+                 indices: np.ndarray,
+                 scores: np.ndarray,
+                 corpora: List[Corpus],
+                 corpus_ids: Optional[np.ndarray] = None,
+                 transforms: Optional[List[Optional[Union[Transform, int]]]] = None,
+                 transform_ids: Optional[np.ndarray] = None):
+        """ raises: CandidatesError if the arrays aren't aligned or if `corpus_ids` is omitted for multiple corpora """
+        super().__init__()
+        self._indices: np.ndarray = np.asarray(indices, dtype=np.int32).reshape(-1)
+        self._scores: np.ndarray = np.asarray(scores, dtype=np.float64).reshape(-1)
+
+        self._corpora: List[Corpus] = list(corpora)
+        self._corpus_lookup: Dict[Corpus, int] = {corpus: i for i, corpus in enumerate(self._corpora)}
+        if corpus_ids is None:
+            if len(self._corpora) > 1:
+                raise CandidatesError(f"{self.__class__.__name__} requires corpus ids when using multiple corpora")
+            self._corpus_ids: np.ndarray = np.zeros(self._indices.size, dtype=np.int32)
+        else:
+            self._corpus_ids: np.ndarray = np.asarray(corpus_ids, dtype=np.int32).reshape(-1)
+
+        self._transforms: TransformTable = TransformTable()
+        if transform_ids is None:
+            self._transform_ids: np.ndarray = np.zeros(self._indices.size, dtype=np.int32)
+        else:
+            self._transform_ids: np.ndarray = np.asarray(transform_ids, dtype=np.int32).reshape(-1)
+            if transforms is not None:
+                self._transform_ids = self._transforms.remap(transforms)[self._transform_ids]
+
+        if not (self._indices.size == self._scores.size == self._corpus_ids.size == self._transform_ids.size):
+            raise CandidatesError(f"Could not create {self.__class__.__name__}: indices, scores, corpus ids and "
+                                  f"transform ids must have the same size")
+
+    @classmethod
+    def new_empty(cls, associated_corpus: Optional[Corpus] = None) -> 'MatrixCandidates':
+        corpora: List[Corpus] = [associated_corpus] if associated_corpus is not None else []
+        return cls(np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64), corpora=corpora)
+
+    @classmethod
+    def from_corpus(cls, associated_corpus: Corpus, scores: Optional[np.ndarray] = None) -> 'MatrixCandidates':
+        """ Create one candidate per event in `associated_corpus` (with score 1.0 if no scores are provided) """
+        scores = np.ones(len(associated_corpus), dtype=np.float64) if scores is None else scores
+        return cls(np.arange(len(associated_corpus), dtype=np.int32), scores, corpora=[associated_corpus])
+
+    @classmethod
+    def from_candidates(cls, candidates: Union[List[Candidate], Candidates]) -> 'MatrixCandidates':
+        matrix_candidates: MatrixCandidates = cls.new_empty()
+        matrix_candidates.add(candidates)
+        return matrix_candidates
+
+    def shallow_copy(self) -> 'MatrixCandidates':
+        copy: MatrixCandidates = MatrixCandidates(indices=self._indices.copy(),
+                                                  scores=self._scores.copy(),
+                                                  corpora=self._corpora,
+                                                  corpus_ids=self._corpus_ids.copy(),
+                                                  transforms=self._transforms.transforms,
+                                                  transform_ids=self._transform_ids.copy())
+        copy._feature_cache = dict(self._feature_cache)
+        return copy
+
+    def add(self, candidates: Union[List[Candidate], Candidates], **kwargs) -> None:
+        """ Candidates may be provided as a list or as any `Candidates` instance. Adding `MatrixCandidates` or
+            `DiscreteCandidates` is vectorized, while other types are added candidate by candidate. """
+        if isinstance(candidates, MatrixCandidates):
+            corpus_map: np.ndarray = np.array([self._corpus_id(c) for c in candidates._corpora], dtype=np.int32)
+            transform_map: np.ndarray = self._transforms.remap(candidates.transform_table())
+            self._append(indices=candidates._indices,
+                         scores=candidates._scores,
+                         corpus_ids=corpus_map[candidates._corpus_ids] if corpus_map.size > 0 else corpus_map,
+                         transform_ids=transform_map[candidates._transform_ids])
+        elif isinstance(candidates, DiscreteCandidates):
+            transform_map: np.ndarray = self._transforms.remap(candidates.transform_table())
+            self._append(indices=candidates.get_indices().copy(),
+                         scores=candidates.get_scores().copy(),
+                         corpus_ids=np.full(candidates.size(), self._corpus_id(candidates.corpus), dtype=np.int32),
+                         transform_ids=transform_map[candidates.get_transform_ids()])
+        else:
+            if isinstance(candidates, Candidates):
+                candidates = candidates.get_candidates()
+            self._append(indices=np.array([c.event.index for c in candidates], dtype=np.int32),
+                         scores=np.array([c.score for c in candidates], dtype=np.float64),
+                         corpus_ids=np.array([self._corpus_id(c.associated_corpus) for c in candidates],
+                                             dtype=np.int32),
+                         transform_ids=np.array([self._transforms.id_of(c.transform) for c in candidates],
+                                                dtype=np.int32))
+
+    def add_arrays(self,
+                   indices: np.ndarray,
+                   scores: np.ndarray,
+                   associated_corpus: Corpus,
+                   transform: Optional[Union[Transform, int]] = None) -> None:
+        """ Vectorized version of `add` for candidates from a single corpus sharing the same transform """
+        indices = np.asarray(indices, dtype=np.int32).reshape(-1)
+        self._append(indices=indices,
+                     scores=np.broadcast_to(np.asarray(scores, dtype=np.float64), indices.shape),
+                     corpus_ids=np.full(indices.size, self._corpus_id(associated_corpus), dtype=np.int32),
+                     transform_ids=np.full(indices.size, self._transforms.id_of(transform), dtype=np.int32))
+
+    def get_feature_array(self, feature: Union[Type[Descriptor], str]) -> np.ndarray:
+        """ Note: the returned array is cached and read-only """
+        return self._cached_feature_array(
+            feature, lambda: _gather_features(feature, self._corpora, self._corpus_ids, self._indices)
+        )
+
+    def get_label_codes(self, label_type: Union[Type[Label], str]) -> np.ndarray:
+        return _gather_label_codes(label_type, self._corpora, self._corpus_ids, self._indices)
+
+    def get_candidate(self, index: int) -> Candidate:
+        corpus: Corpus = self._corpora[self._corpus_ids[index]]
+        return Candidate(event=corpus.events[self._indices[index]],
+                         score=float(self._scores[index]),
+                         transform=self._transforms.transforms[self._transform_ids[index]],
+                         associated_corpus=corpus)
+
+    def get_candidates(self) -> List[Candidate]:
+        return [self.get_candidate(i) for i in range(self.size())]
+
+    def get_scores(self) -> np.ndarray:
+        """ Note: returns the internal score array, use `scale` or `normalize` to modify scores """
+        return self._scores
+
+    def get_indices(self) -> np.ndarray:
+        """ Note: returns the internal index array, which should not be modified """
+        return self._indices
+
+    def get_transforms(self) -> List[Transform]:
+        return self._transforms.lookup(self._transform_ids)
+
+    def get_transform_ids(self) -> np.ndarray:
+        """ Returns each candidate's id in the lookup table returned from `transform_table` """
+        return self._transform_ids
+
+    def transform_table(self) -> List[Optional[Union[Transform, int]]]:
+        return self._transforms.transforms
+
+    def get_corpus_ids(self) -> np.ndarray:
+        """ Returns each candidate's id in the lookup table returned from `associated_corpora` """
+        return self._corpus_ids
+
+    def associated_corpora(self) -> List[Corpus]:
+        return self._corpora
+
+    def normalize(self, norm: float = 1.0) -> None:
+        if self._scores.size > 0:
+            max_score: float = float(np.max(self._scores))
+            if max_score > 0:
+                self._scores *= norm / max_score
+
+    def remove(self, indices: Union[int, np.ndarray]) -> None:
+        """ `indices` may be a single index, an array of indices or a boolean mask.
+            raises: IndexError if an index is out of bounds """
+        if not isinstance(indices, (int, np.integer)):
+            indices = np.asarray(indices)
+            if indices.dtype != bool:
+                indices = indices.astype(np.intp, copy=False)
+        self._indices = np.delete(self._indices, indices)
+        self._scores = np.delete(self._scores, indices)
+        self._corpus_ids = np.delete(self._corpus_ids, indices)
+        self._transform_ids = np.delete(self._transform_ids, indices)
+        self._remove_from_feature_cache(indices)
+
+    def keep(self, indices: np.ndarray) -> None:
+        mask: np.ndarray = self.as_mask(indices)
+        self._indices = self._indices[mask]
+        self._scores = self._scores[mask]
+        self._corpus_ids = self._corpus_ids[mask]
+        self._transform_ids = self._transform_ids[mask]
+        self._remove_from_feature_cache(~mask)
+
+    def is_empty(self) -> bool:
+        return self._indices.size == 0
+
+    def size(self) -> int:
+        return self._indices.size
+
+    def scale(self, factors: Union[float, np.ndarray], indices: Optional[np.ndarray] = None) -> None:
+        if indices is not None:
+            self._scores[indices] *= factors
+        else:
+            self._scores *= factors
+
+    def _append(self, indices: np.ndarray, scores: np.ndarray, corpus_ids: np.ndarray,
+                transform_ids: np.ndarray) -> None:
+        self._extend_feature_cache(lambda feature: _gather_features(feature, self._corpora, corpus_ids, indices))
+        self._indices = np.concatenate((self._indices, indices))
+        self._scores = np.concatenate((self._scores, scores))
+        self._corpus_ids = np.concatenate((self._corpus_ids, corpus_ids))
+        self._transform_ids = np.concatenate((self._transform_ids, transform_ids))
+
+    def _corpus_id(self, corpus: Corpus) -> int:
+        try:
+            return self._corpus_lookup[corpus]
+        except KeyError:
+            self._corpora.append(corpus)
+            self._corpus_lookup[corpus] = len(self._corpora) - 1
+            return len(self._corpora) - 1
+
+
+def _gather_features(feature: Union[Type[Descriptor], str],
+                     corpora: List[Corpus],
+                     corpus_ids: np.ndarray,
+                     indices: np.ndarray) -> np.ndarray:
+    """ Gather the values of `feature` for events given by `indices` in the corpora given by `corpus_ids` """
+    if len(corpora) == 1 or (len(corpora) > 1 and indices.size == 0):
+        return corpora[0].gather_descriptors(feature, indices)
+
+    values: Optional[np.ndarray] = None
+    for corpus_id, corpus in enumerate(corpora):
+        positions: np.ndarray = np.flatnonzero(corpus_ids == corpus_id)
+        if positions.size == 0:
+            continue
+        corpus_values: np.ndarray = corpus.gather_descriptors(feature, indices[positions])
+        if values is None:
+            values = np.empty((indices.size, *corpus_values.shape[1:]), dtype=corpus_values.dtype)
+        values[positions] = corpus_values
+
+    return values if values is not None else np.zeros(0)
+
+
+def _gather_label_codes(label_type: Union[Type[Label], str],
+                        corpora: List[Corpus],
+                        corpus_ids: np.ndarray,
+                        indices: np.ndarray) -> np.ndarray:
+    """ Gather the label codes of `label_type` for events given by `indices` in the corpora given by `corpus_ids` """
+    if len(corpora) == 1:
+        return corpora[0].gather_label_codes(label_type, indices)
+
+    codes: np.ndarray = np.full(indices.size, -1, dtype=np.int64)
+    for corpus_id, corpus in enumerate(corpora):
+        positions: np.ndarray = np.flatnonzero(corpus_ids == corpus_id)
+        if positions.size > 0:
+            codes[positions] = corpus.gather_label_codes(label_type, indices[positions])
+    return codes
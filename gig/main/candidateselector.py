@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, List, Tuple
 
+import numpy as np
+
+from gig.io.component import Component
+from gig.io.param_utils import MaxFloat, NumericRange
+from gig.io.parameter import Parameter
 from gig.main.candidate import Candidate
 from gig.main.candidates import Candidates
 
@@ -18,3 +23,78 @@ class CandidateSelector(ABC):
     @abstractmethod
     def clear(self) -> None:
         """ """
+
+
+class WeightedRandomSelector(CandidateSelector, Component):
+    """ Selects candidates randomly with a probability proportional to their score.
+
+        The cumulative distribution is built once per call to `decide`/`decide_multiple`, after which each draw is a
+        binary search (O(log n)). `temperature` sharpens (< 1.0) or flattens (> 1.0) the distribution, where a
+        temperature of 0.0 always selects the highest score. `top_p` restricts the selection to the smallest set of
+        highest-scoring candidates whose combined probability is at least `top_p`.
+        Candidates with a score less than or equal to zero are never selected.
+    """
+
+    def __init__(self, temperature: float = 1.0, top_p: float = 1.0, seed: Optional[int] = None,
+                 name: str = "candidate_selector", *args, **kwargs):
+        super().__init__(name=name, *args, **kwargs)
+        self.temperature: Parameter[float] = Parameter("temperature", float(temperature), type_info=MaxFloat(),
+                                                       param_range=NumericRange(lower_bound=0.0),
+                                                       description="Sharpness of the selection distribution")
+        self.top_p: Parameter[float] = Parameter("top_p", float(top_p), type_info=MaxFloat(),
+                                                 param_range=NumericRange(0.0, 1.0),
+                                                 description="Probability mass of the candidates to select among")
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+
+    def seed(self, seed: Optional[int]) -> None:
+        """ Reset the random number generator, for example to obtain reproducible results """
+        self._rng = np.random.default_rng(seed)
+
+    def decide(self, candidates: Candidates) -> Optional[Candidate]:
+        selected: List[Candidate] = self.decide_multiple(candidates, 1)
+        return selected[0] if len(selected) > 0 else None
+
+    def decide_multiple(self, candidates: Candidates, num_candidates: int) -> List[Candidate]:
+        """ Draw `num_candidates` candidates (with replacement) from the same distribution,
+            for example when handling a `TriggerQuery` with `content > 1`.
+            Returns an empty list if no candidate has a positive score. """
+        distribution: Optional[Tuple[np.ndarray, np.ndarray]] = self._distribution(candidates.get_scores())
+        if distribution is None or num_candidates <= 0:
+            return []
+
+        indices, cumulative_weights = distribution
+        draws: np.ndarray = self._rng.random(num_candidates) * cumulative_weights[-1]
+        positions: np.ndarray = np.searchsorted(cumulative_weights, draws, side="right")
+        positions = np.minimum(positions, indices.size - 1)
+        return [candidates.get_candidate(int(i)) for i in indices[positions]]
+
+    def feedback(self, candidate: Optional[Candidate], **kwargs) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def _distribution(self, scores: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """ Returns the indices of all selectable candidates and their cumulative weights """
+        indices: np.ndarray = np.flatnonzero(scores > 0)
+        if indices.size == 0:
+            return None
+
+        if self.temperature.value <= 0.0:
+            best: int = int(indices[np.argmax(scores[indices])])
+            return np.array([best]), np.ones(1)
+
+        weights: np.ndarray = scores[indices]
+        if self.temperature.value != 1.0:
+            # computed in log domain relative to max to avoid overflow for low temperatures
+            log_weights: np.ndarray = np.log(weights)
+            weights = np.exp((log_weights - np.max(log_weights)) / self.temperature.value)
+
+        if self.top_p.value < 1.0:
+            order: np.ndarray = np.argsort(-weights, kind="stable")
+            cumulative: np.ndarray = np.cumsum(weights[order])
+            cutoff: int = int(np.searchsorted(cumulative, self.top_p.value * cumulative[-1])) + 1
+            order = order[:cutoff]
+            indices, weights = indices[order], weights[order]
+
+        return indices, np.cumsum(weights)
@@ -1,13 +1,20 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Type
+from collections import OrderedDict
+from typing import List, Optional, Type, Tuple, Hashable, Any, Union, Iterable
+
+import numpy as np
 
 from gig.io.parsable import Parsable
-from gig.main.descriptor import Descriptor, IntegralDescriptor, MidiPitch
+from gig.main.corpus import Corpus
+from gig.main.descriptor import Descriptor, IntegralDescriptor, MidiPitch, VectorialDescriptor, DescriptorArray
 from gig.main.exceptions import ClassificationError
 from gig.main.label import Label, IntLabel
+from gig.main.nearest_neighbour import pairwise_squared_distances
 
 
 class Classifier(Parsable['Classifier'], ABC):
+    # Type of the labels returned by `classify`, whose values are the values returned by `classify_array`
+    label_type: Type[Label] = IntLabel
 
     @abstractmethod
     def classify(self, descriptor: Descriptor) -> Label:
@@ -26,10 +33,55 @@ class Classifier(Parsable['Classifier'], ABC):
             boundary explicitly in this function in order to allow static evaluation of a given user configuration.
         """
 
-    def classify_multiple(self, descriptors: List[Descriptor]) -> List[Label]:
-        """ Function that may be overridden for optimization reasons
+    def classify_multiple(self, descriptors: Union[List[Descriptor], DescriptorArray]) -> List[Label]:
+        """ Function that may be overridden for optimization reasons. If all descriptors have the same type (for
+            example a `DescriptorArray`) and the classifier implements `classify_array`, classification is performed
+            in a single call to `classify_array`.
             raises: ClassificationError if classification of one or more descriptors fails """
-        return [self.classify(descriptor) for descriptor in descriptors]
+        if len(descriptors) == 0:
+            return []
+        if type(self).classify_array is Classifier.classify_array:
+            return [self.classify(descriptor) for descriptor in descriptors]
+        if isinstance(descriptors, DescriptorArray):
+            values: np.ndarray = self.classify_array(descriptors)
+        else:
+            descriptor_type: Type[Descriptor] = type(descriptors[0])
+            if any(type(descriptor) is not descriptor_type for descriptor in descriptors):
+                return [self.classify(descriptor) for descriptor in descriptors]
+            values: np.ndarray = self.classify_array(np.array([d.value for d in descriptors]), descriptor_type)
+        return [self.label_type(value) for value in values.tolist()]
+
+    def classify_array(self, values: Union[np.ndarray, DescriptorArray],
+                       descriptor_type: Optional[Type[Descriptor]] = None) -> np.ndarray:
+        """ Classify multiple descriptor values at once, given as an array with one value per row (for example a
+            descriptor column of a corpus) or as a `DescriptorArray`. Returns an int array with the label value (i.e.
+            the `label` of the `label_type` returned by `classify`) of each value. These may be converted to label
+            codes (for comparison with `Corpus.get_label_codes`) with `label_type.vocabulary().codes`.
+
+            The default implementation classifies each value separately with `classify` and requires
+            `descriptor_type` (unless `values` is a `DescriptorArray`). Classifiers should override this with a
+            vectorized implementation if possible.
+            raises: ClassificationError if classification of one or more values fails """
+        if isinstance(values, DescriptorArray):
+            descriptors: Iterable[Descriptor] = values
+        elif descriptor_type is None:
+            raise ClassificationError(f"{self.__class__.__name__} requires a descriptor type to classify arrays")
+        else:
+            descriptors: Iterable[Descriptor] = (descriptor_type(value) for value in values)
+        try:
+            return np.array([self.classify(descriptor).label for descriptor in descriptors], dtype=np.int64)
+        except (TypeError, ValueError) as e:
+            raise ClassificationError(f"{self.__class__.__name__} does not produce integer label values") from e
+
+    def classify_corpus(self, corpus: Corpus, descriptor_type: Type[Descriptor]) -> np.ndarray:
+        """ Classify the descriptor `descriptor_type` of all events in the corpus, in a single call to
+            `classify_array` on the corpus' descriptor column. Returns the label value of each event.
+            raises: ClassificationError if classification fails or the classifier isn't compatible with the descriptor
+                    DescriptorError if any event in the corpus doesn't have the descriptor """
+        if not self.compatible_with(descriptor_type):
+            raise ClassificationError(f"{self.__class__.__name__} cannot classify descriptors of type "
+                                      f"{descriptor_type.__name__}")
+        return self.classify_array(corpus.get_descriptors_of_type(descriptor_type, as_array=True), descriptor_type)
 
 
 class Trainable(ABC):
@@ -44,16 +96,23 @@ class Trainable(ABC):
 class IdentityClassifier(Classifier):
 
     def classify(self, descriptor: Descriptor) -> Label:
-        if not IntegralDescriptor:
+        if not isinstance(descriptor, IntegralDescriptor):
             raise ClassificationError(f"{self.__class__.__name__} can only handle integral values")
 
         return IntLabel(descriptor.value)
 
+    def classify_array(self, values: Union[np.ndarray, DescriptorArray],
+                       descriptor_type: Optional[Type[Descriptor]] = None) -> np.ndarray:
+        values = np.asarray(values)
+        if values.ndim != 1 or not np.issubdtype(values.dtype, np.integer):
+            raise ClassificationError(f"{self.__class__.__name__} can only handle integral values")
+        return values.astype(np.int64)
+
     def clear(self) -> None:
         pass
 
     def compatible_with(self, descriptor_type: Type[Descriptor]) -> bool:
-        return issubclass(descriptor_type, IntegralDescriptor)
+        return descriptor_type in IntegralDescriptor.subtypes()
 
 
 class PitchClassClassifier(Classifier):
@@ -64,8 +123,221 @@ class PitchClassClassifier(Classifier):
 
         return IntLabel(descriptor.value % 12)
 
+    def classify_array(self, values: Union[np.ndarray, DescriptorArray],
+                       descriptor_type: Optional[Type[Descriptor]] = None) -> np.ndarray:
+        values = np.asarray(values)
+        if values.ndim != 1 or not np.issubdtype(values.dtype, np.integer):
+            raise ClassificationError(f"{self.__class__.__name__} can only handle integral pitch descriptors")
+        return np.mod(values, 12).astype(np.int64)
+
     def clear(self) -> None:
         pass
 
     def compatible_with(self, descriptor_type: Type[Descriptor]) -> bool:
-        return issubclass(descriptor_type, MidiPitch)
+        return descriptor_type in MidiPitch.subtypes()
+
+
+class KMeansClassifier(Classifier, Trainable):
+    """ Vector quantization of `VectorialDescriptor`s (for example `Chroma12`): each value is labelled with the index
+        of its nearest centroid, where centroids are learned with mini-batch k-means (k-means++ initialization).
+
+        Training (`pre_process`) iterates over random mini-batches of `batch_size` values, updating each centroid to the
+        running mean of all values assigned to it, and warm starts from the current centroids if already trained.
+        `partial_fit` performs a single update with new values (for example after learning new events) without
+        retraining. Note that updating the centroids may change the label of previously classified values.
+    """
+    MAX_CHUNK_SIZE = 8192  # max number of values assigned at once (bounds the size of the distance matrix)
+
+    def __init__(self,
+                 num_clusters: int = 16,
+                 batch_size: int = 1024,
+                 max_iterations: int = 100,
+                 tolerance: float = 1e-4,
+                 seed: Optional[int] = None):
+        self.num_clusters: int = num_clusters
+        self.batch_size: int = batch_size
+        self.max_iterations: int = max_iterations
+        self.tolerance: float = tolerance
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self._counts: Optional[np.ndarray] = None  # number of values assigned to each centroid so far
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def pre_process(self, descriptors: Optional[Union[List[Descriptor], DescriptorArray]] = None,
+                    values: Optional[np.ndarray] = None, warm_start: bool = True, *args, **kwargs) -> None:
+        """ Train on `descriptors` (a list or `DescriptorArray`) or on `values` (an array with one vector per row,
+            for example a descriptor column of a corpus). Continues from the current centroids if trained and
+            `warm_start` is True (the running means are restarted, see `partial_fit` to update them instead).
+            raises: ClassificationError if no values are given or the values aren't vectors """
+        values = self._as_values(descriptors, values)
+        if not self.is_trained or not warm_start:
+            self._initialize(values)
+        # warm starts only reuse the centroids: with the counts of a previous run, the learning rate of each centroid
+        # (1 / count) would already be close to zero and the new values would barely move the centroids
+        self._counts = np.zeros(self.centroids.shape[0], dtype=np.int64)
+
+        for _ in range(self.max_iterations):
+            batch: np.ndarray = values[self._rng.integers(0, values.shape[0], size=min(self.batch_size,
+                                                                                      values.shape[0]))]
+            shift: float = self._update(batch)
+            if shift <= self.tolerance:
+                break
+
+    def partial_fit(self, descriptors: Optional[Union[List[Descriptor], DescriptorArray]] = None,
+                    values: Optional[np.ndarray] = None) -> None:
+        """ Update the centroids with new values in a single mini-batch step (or initialize them if not trained)
+            raises: ClassificationError if no values are given or the values aren't vectors """
+        values = self._as_values(descriptors, values)
+        if not self.is_trained:
+            self._initialize(values)
+        self._update(values)
+
+    def classify(self, descriptor: Descriptor) -> Label:
+        if not isinstance(descriptor, VectorialDescriptor):
+            raise ClassificationError(f"{self.__class__.__name__} can only handle vectorial descriptors")
+        return IntLabel(int(self.classify_array(descriptor.value.reshape(1, -1))[0]))
+
+    def classify_array(self, values: Union[np.ndarray, DescriptorArray],
+                       descriptor_type: Optional[Type[Descriptor]] = None) -> np.ndarray:
+        if not self.is_trained:
+            raise ClassificationError(f"{self.__class__.__name__} has not been trained")
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] != self.centroids.shape[1]:
+            raise ClassificationError(f"{self.__class__.__name__} can only handle vectors of size "
+                                      f"{self.centroids.shape[1]} (actual shape: {values.shape})")
+        codes: np.ndarray = np.empty(values.shape[0], dtype=np.int64)
+        for start in range(0, values.shape[0], self.MAX_CHUNK_SIZE):
+            end: int = start + self.MAX_CHUNK_SIZE
+            codes[start:end] = np.argmin(pairwise_squared_distances(values[start:end], self.centroids), axis=1)
+        return codes
+
+    def clear(self) -> None:
+        pass
+
+    def compatible_with(self, descriptor_type: Type[Descriptor]) -> bool:
+        return descriptor_type in VectorialDescriptor.subtypes()
+
+    def _initialize(self, values: np.ndarray) -> None:
+        """ Greedy k-means++ initialization (on a sample of the values): for each centroid, a few candidates are drawn
+            with probability proportional to their squared distance to the nearest centroid, and the candidate that
+            reduces the total squared distance the most is kept """
+        sample: np.ndarray = values[self._rng.choice(values.shape[0], min(values.shape[0], 50 * self.num_clusters),
+                                                     replace=False)]
+        num_clusters: int = min(self.num_clusters, sample.shape[0])
+        num_candidates: int = 2 + int(np.log(num_clusters))
+        centroids: np.ndarray = np.empty((num_clusters, values.shape[1]), dtype=np.float64)
+        centroids[0] = sample[self._rng.integers(sample.shape[0])]
+        distances: np.ndarray = pairwise_squared_distances(sample, centroids[:1])[:, 0]
+        for i in range(1, num_clusters):
+            total: float = float(distances.sum())
+            if total <= 0:
+                candidates: np.ndarray = self._rng.integers(sample.shape[0], size=1)
+            else:
+                candidates: np.ndarray = self._rng.choice(sample.shape[0], size=num_candidates, p=distances / total)
+            # (num_candidates, num_samples) distances to the nearest centroid if each candidate were added
+            candidate_distances: np.ndarray = np.minimum(distances,
+                                                         pairwise_squared_distances(sample[candidates], sample))
+            best: int = int(np.argmin(candidate_distances.sum(axis=1)))
+            centroids[i] = sample[candidates[best]]
+            distances = candidate_distances[best]
+        self.centroids = centroids
+        self._counts = np.zeros(num_clusters, dtype=np.int64)
+
+    def _update(self, batch: np.ndarray) -> float:
+        """ Move each centroid to the running mean of all values assigned to it. Returns the max squared shift """
+        assignments: np.ndarray = self.classify_array(batch)
+        batch_counts: np.ndarray = np.bincount(assignments, minlength=self.centroids.shape[0])
+        sums: np.ndarray = np.zeros_like(self.centroids)
+        np.add.at(sums, assignments, batch)
+        self._counts += batch_counts
+        updated: np.ndarray = batch_counts > 0
+        previous: np.ndarray = self.centroids[updated]
+        self.centroids[updated] += ((sums[updated] - batch_counts[updated, np.newaxis] * previous)
+                                    / self._counts[updated, np.newaxis])
+        shifts: np.ndarray = self.centroids[updated] - previous
+        return float(np.einsum("ij,ij->i", shifts, shifts).max()) if shifts.size > 0 else 0.0
+
+    def _as_values(self, descriptors: Optional[Union[List[Descriptor], DescriptorArray]],
+                   values: Optional[np.ndarray]) -> np.ndarray:
+        """ raises: ClassificationError if no values are given or the values aren't vectors """
+        if values is None and isinstance(descriptors, DescriptorArray):
+            values = descriptors.values
+        elif values is None and descriptors is not None and len(descriptors) > 0:
+            values = np.array([descriptor.value for descriptor in descriptors])
+        if values is None or len(values) == 0:
+            raise ClassificationError(f"{self.__class__.__name__} requires values to train on")
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or (self.is_trained and values.shape[1] != self.centroids.shape[1]):
+            raise ClassificationError(f"{self.__class__.__name__} can only handle vectors of uniform size "
+                                      f"(actual shape: {values.shape})")
+        return values
+
+
+class CachedClassifier(Classifier, Trainable):
+    """ Wrapper memoizing the labels returned by `classify` of any classifier, keyed by the type and value of each
+        descriptor, for example when classifying streams of influences where the same values often repeat.
+        Least recently used entries are evicted once the cache holds `max_size` entries.
+
+        The cache is invalidated on `clear` and `pre_process`. If the wrapped classifier is modified directly (for
+        example with `KMeansClassifier.partial_fit`), `invalidate` must be called.
+    """
+
+    def __init__(self, classifier: Classifier, max_size: int = 4096):
+        self.classifier: Classifier = classifier
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._cache: 'OrderedDict[Tuple[Type[Descriptor], Hashable], Label]' = OrderedDict()
+
+    @property
+    def label_type(self) -> Type[Label]:
+        return self.classifier.label_type
+
+    def classify(self, descriptor: Descriptor) -> Label:
+        key: Tuple[Type[Descriptor], Hashable] = (type(descriptor), self._hashable(descriptor.value))
+        try:
+            label: Label = self._cache[key]
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return label
+        except KeyError:
+            self.misses += 1
+
+        label = self.classifier.classify(descriptor)
+        self._cache[key] = label
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return label
+
+    def classify_array(self, values: Union[np.ndarray, DescriptorArray],
+                       descriptor_type: Optional[Type[Descriptor]] = None) -> np.ndarray:
+        return self.classifier.classify_array(values, descriptor_type)
+
+    def pre_process(self, descriptors: Optional[List[Descriptor]] = None, *args, **kwargs) -> None:
+        """ Pre-process the wrapped classifier (if `Trainable`) and invalidate the cache """
+        if isinstance(self.classifier, Trainable):
+            self.classifier.pre_process(descriptors, *args, **kwargs)
+        self.invalidate()
+
+    def clear(self) -> None:
+        self.classifier.clear()
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+    def compatible_with(self, descriptor_type: Type[Descriptor]) -> bool:
+        return self.classifier.compatible_with(descriptor_type)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses > 0 else 0.0
+
+    @staticmethod
+    def _hashable(value: Any) -> Hashable:
+        if isinstance(value, np.ndarray):
+            return value.dtype.str, value.shape, value.tobytes()
+        return value
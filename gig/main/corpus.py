@@ -1,13 +1,21 @@
 import logging
+import pickle
 from abc import ABC, abstractmethod
-from typing import List, Type, Optional, TypeVar, Generic, Set, Union
+from typing import List, Type, Optional, TypeVar, Generic, Set, Union, Dict, Any, Tuple, Callable, Sequence, \
+    Iterable
 
 import numpy as np
 
+from gig.main.corpus_cache import CorpusCache
+from gig.main.corpus_columns import CorpusColumns, LabelIndex
 from gig.main.corpus_event import CorpusEvent, GenericCorpusEvent, T
-from gig.main.descriptor import Descriptor
-from gig.main.exceptions import CorpusError
+from gig.main.corpus_format import BinaryCorpusFormat, CorpusContent, ColumnarEventList
+from gig.main.corpus_shared_memory import SharedCorpusMemory, SharedCorpusHandle
+from gig.main.descriptor import Descriptor, DescriptorArray
+from gig.main.descriptor_analyzer import DescriptorAnalyzer
+from gig.main.exceptions import CorpusError, LabelError, DescriptorError
 from gig.main.label import Label
+from gig.main.nearest_neighbour import NearestNeighbourIndex
 
 E = TypeVar('E', bound=CorpusEvent)
 
@@ -15,14 +23,32 @@ E = TypeVar('E', bound=CorpusEvent)
 class Corpus(Generic[E], ABC):
     def __init__(self, events: List[E],
                  descriptor_types: Optional[List[Type[Descriptor]]] = None,
-                 label_types: Optional[List[Type[Label]]] = None):
-        # TODO[B4]: handle descriptor types (if not provided, gather all from events. Also: pre-compute feature values
+                 label_types: Optional[List[Type[Label]]] = None,
+                 columns: Optional[CorpusColumns] = None):
+        """ `columns` may be provided if the event data already is available in columnar form
+            (for example when loading a corpus), otherwise it's computed from the events. """
+        # TODO[B4]: handle descriptor types (if not provided, gather all from events.
         self.logger = logging.getLogger(__name__)
         self.events: List[E] = events
-        self.descriptor_types: List[Type[Descriptor]] = (descriptor_types if descriptor_types is not None
+        # copied, as descriptors computed by analyzers are added to the list
+        self.descriptor_types: List[Type[Descriptor]] = (list(descriptor_types) if descriptor_types is not None
                                                          else self.compute_descriptor_types(events))
-        self.label_types: List[Type[Label]] = (label_types if label_types is not None
+        self.label_types: List[Type[Label]] = (list(label_types) if label_types is not None
                                                else self.compute_label_types(events))
+        # One contiguous column per descriptor type and scheduling attribute (row i corresponds to self.events[i])
+        self._columns: CorpusColumns = (columns if columns is not None and len(columns) == len(events)
+                                        else CorpusColumns.from_events(self.events, self.descriptor_types,
+                                                                       self.label_types))
+        self._version: int = 0
+        # Nearest neighbour indices (built on demand) and the corpus version at which they were last updated
+        self._nearest_neighbour_indices: Dict[Union[Type[Descriptor], str], Tuple[NearestNeighbourIndex, int]] = {}
+        # Shared memory that the columns are views of, if the corpus was attached with `attach`
+        self._shared_memory: Optional[SharedCorpusMemory] = None
+        # Analyzers registered for this corpus only, and analyzers of the descriptor columns computed by them
+        self._analyzers: Dict[Union[Type[Descriptor], str], DescriptorAnalyzer] = {}
+        self._analyzed: Dict[Union[Type[Descriptor], str], DescriptorAnalyzer] = {}
+        # The file that the corpus was last loaded from or exported to (if any)
+        self._filepath: Optional[str] = None
 
     def __len__(self):
         return len(self.events)
@@ -32,6 +58,21 @@ class Corpus(Generic[E], ABC):
     def build(cls, *args, **kwargs) -> 'Corpus':
         """ """
 
+    @classmethod
+    def build_cached(cls, cache: CorpusCache, sources: List[str], *args, **kwargs) -> 'Corpus':
+        """ `build` with a `CorpusCache`: if a corpus has previously been built from the same content of the files
+            `sources` with the same arguments, it's loaded from the cache, otherwise it's built and added to the cache.
+            `args` and `kwargs` are passed to `build` (and should include the sources if `build` requires them).
+            raises: IOError if any of the source files can't be read, or errors raised by `build` """
+        key: str = cache.key(sources, {"corpus_type": BinaryCorpusFormat.type_name(cls),
+                                       "args": args,
+                                       "kwargs": kwargs})
+        corpus: Optional[Corpus] = cache.get(key, lambda path: cls.load(path))
+        if corpus is None:
+            corpus = cls.build(*args, **kwargs)
+            cache.put(key, lambda path: corpus.export(path, overwrite=True))
+        return corpus
+
     @classmethod
     @abstractmethod
     def load(cls, filepath: str, volatile: bool = False, **kwargs) -> 'Corpus':
@@ -45,7 +86,91 @@ class Corpus(Generic[E], ABC):
 
     @abstractmethod
     def append(self, event: E) -> None:
-        """ """
+        """ Note: implementations should keep appending amortized O(1) in order to support continuous online learning.
+            Appending to `self.events` is sufficient to keep the columnar storage up to date. """
+
+    def extend(self, events: Sequence[E]) -> None:
+        """ Append multiple events at once. The schema of the batch is validated once (over the distinct sets of
+            descriptor and label types in the batch), and columnar storage and label indices grow at most once.
+            raises: CorpusError if any of the events can't be added to the corpus (in which case none are added) """
+        self._validate_schema({frozenset(e.descriptors) for e in events}, {frozenset(e.labels) for e in events})
+        self.events.extend(events)
+        self._sync_columns()
+
+    def extend_arrays(self,
+                      descriptors: Dict[Union[Type[Descriptor], str], Union[np.ndarray, DescriptorArray]],
+                      labels: Optional[Dict[Union[Type[Label], str], Sequence[Any]]] = None,
+                      indices: Optional[Sequence[int]] = None,
+                      allow_missing: bool = False,
+                      **fields: Sequence[Any]) -> None:
+        """ Append multiple events given as columns, with one row per event: `descriptors` and `labels` map the key
+            of each descriptor/label type to its values, and `fields` are the scheduling attributes (for example
+            `absolute_onset`) of the events. Events are created with `from_fields` of the corpus' event type and
+            get consecutive indices starting at `len(self)` unless `indices` are given. The columns are appended to
+            columnar storage directly, without being gathered from the events.
+            Descriptor values are validated once per column (see `DescriptorArray`), and the descriptors of the events
+            are views of the given values.
+            Unless `allow_missing` is True, values must be given for all descriptor columns (except for descriptors
+            that can be computed by an analyzer) and labels of the corpus. Otherwise, the events don't have the missing
+            descriptors or labels, and the columns of missing descriptors are removed from columnar storage.
+            raises: CorpusError if the columns don't have the same number of rows, if descriptors or labels are missing
+                    or if the events can't be added to the corpus (in which case none are added) """
+        labels = labels if labels is not None else {}
+        lengths: Set[int] = {len(values) for values in [*descriptors.values(), *labels.values(), *fields.values()]}
+        if indices is not None:
+            lengths.add(len(indices))
+        if len(lengths) > 1:
+            raise CorpusError(f"Could not add events: columns have different numbers of rows ({sorted(lengths)})")
+        num_events: int = lengths.pop() if len(lengths) > 0 else 0
+        if num_events == 0:
+            return
+
+        self._validate_schema([descriptors.keys()], [labels.keys()])
+        self._sync_columns()
+        if not allow_missing:
+            missing: List[str] = [getattr(k, '__name__', str(k)) for k in self._columns.descriptors.keys()
+                                  if k not in descriptors and self._analyzer(k) is None]
+            missing += [getattr(k, '__name__', str(k)) for k in self._columns.labels if k not in labels]
+            if len(missing) > 0:
+                raise CorpusError(f"Could not add events: values of {', '.join(missing)} are missing "
+                                  f"(use allow_missing to add events without them)")
+        descriptor_arrays: Dict[Union[Type[Descriptor], str], DescriptorArray] = {
+            key: self._descriptor_array(key, values) for key, values in descriptors.items()
+        }
+        descriptor_values: List[Tuple[Any, List[Descriptor]]] = [(key, list(array))
+                                                                 for key, array in descriptor_arrays.items()]
+        label_values: List[Tuple[Any, Type[Label], List]] = [
+            (key, self._value_type(key, "labels"), values.tolist() if isinstance(values, np.ndarray) else list(values))
+            for key, values in labels.items()
+        ]
+        field_values: Dict[str, List[Any]] = {field: values.tolist() if isinstance(values, np.ndarray)
+                                              else list(values) for field, values in fields.items()}
+        index_values: List[int] = (list(range(len(self), len(self) + num_events)) if indices is None
+                                   else [int(i) for i in indices])
+        event_type: Type[E] = self._event_type()
+        try:
+            events: List[E] = [event_type.from_fields(
+                index=index_values[i],
+                descriptors={key: values[i] for key, values in descriptor_values},
+                labels={key: value_type(values[i]) for key, value_type, values in label_values},
+                **{field: values[i] for field, values in field_values.items()}
+            ) for i in range(num_events)]
+        except (TypeError, ValueError, DescriptorError, LabelError) as e:
+            raise CorpusError(f"Could not add events of type {event_type.__name__}: {repr(e)}") from e
+
+        self.events.extend(events)
+        if len(self._columns) == 0:
+            # no columns to extend yet: build them from the events
+            self._sync_columns()
+            return
+        self._columns.extend_arrays(
+            descriptors={**{key: array.values for key, array in descriptor_arrays.items()},
+                         **self._analyze_missing(events, provided=descriptors.keys())},
+            schedule={field: np.asarray(fields[field]) for field in self._columns.schedule.keys() if field in fields},
+            labels={key: [e.labels.get(key) for e in events] for key in labels},
+            num_rows=num_events
+        )
+        self._version += num_events
 
     @abstractmethod
     def get_content_type(self) -> Type[E]:
@@ -71,20 +196,339 @@ class Corpus(Generic[E], ABC):
 
         return list(label_types)
 
+    @property
+    def version(self) -> int:
+        """ Monotonically increasing counter that is incremented for each event added to the corpus, which may be
+            used by caches of corpus data to determine whether they're up to date """
+        self._sync_columns()
+        return self._version
+
+    def reserve(self, num_events: int) -> None:
+        """ Pre-allocate columnar storage for `num_events` events, for example before a session of online learning """
+        self._sync_columns()
+        self._columns.reserve(num_events)
+
+    def get_schedule_array(self, field: str) -> np.ndarray:
+        """ Returns a read-only array of a scheduling attribute (for example `absolute_onset`) of all events.
+            raises: CorpusError if the events in the corpus don't have the given attribute """
+        self._sync_columns()
+        try:
+            return self._columns.schedule.get(field)
+        except KeyError:
+            raise CorpusError(f"Events in corpus do not have the scheduling attribute '{field}'")
+
+    def indices_with_label(self, label: Label, label_type: Optional[Union[Type[Label], str]] = None) -> np.ndarray:
+        """ Returns a sorted read-only array of the indices of all events with the given label (matched by value).
+            `label_type` is the key of the label in each event's `labels` (by default the type of `label`).
+            Lookup is performed in an inverted index and is O(number of matching events), independently of corpus
+            size.
+            raises: LabelError if the corpus doesn't have labels of the given type """
+        index: LabelIndex = self._label_index(type(label) if label_type is None else label_type)
+        return index.lookup_code(self._label_codes(index, [label])[0])
+
+    def indices_with_labels(self, labels: List[Label],
+                            label_type: Optional[Union[Type[Label], str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """ Look up multiple labels (all of the same type) at once. Returns the concatenated indices of all labels as
+            well as offsets, where the indices of `labels[i]` are given by `indices[offsets[i]:offsets[i + 1]]`.
+            raises: LabelError if the corpus doesn't have labels of the given type """
+        if label_type is None:
+            if len(labels) == 0:
+                return np.zeros(0, dtype=np.intp), np.zeros(1, dtype=np.intp)
+            label_type = type(labels[0])
+        return self._label_index(label_type).lookup_batch([label.label for label in labels])
+
+    def indices_with_label_sequence(self, labels: List[Label],
+                                    label_type: Optional[Union[Type[Label], str]] = None) -> np.ndarray:
+        """ Returns the sorted indices `i` of all events where the events `i, i + 1, ..., i + len(labels) - 1` have
+            the labels `labels` (matched by value), i.e. the start of each occurrence of the label sequence.
+            Matching is performed on label codes (see `get_label_codes`), starting from the indices of the first label.
+            Note: event indices are assumed to correspond to the position of each event in the corpus.
+            raises: LabelError if the corpus doesn't have labels of the given type """
+        if len(labels) == 0:
+            return np.arange(len(self), dtype=np.intp)
+        index: LabelIndex = self._label_index(type(labels[0]) if label_type is None else label_type)
+        sequence: np.ndarray = self._label_codes(index, labels)
+        codes: np.ndarray = index.codes()
+        starts: np.ndarray = index.lookup_code(int(sequence[0]))
+        starts = starts[starts <= codes.size - sequence.size]
+        for offset in range(1, sequence.size):
+            starts = starts[codes[starts + offset] == sequence[offset]]
+        return starts
+
+    def get_label_codes(self, label_type: Union[Type[Label], str]) -> np.ndarray:
+        """ Returns a read-only array of the code (see `Label.code`) of the label `label_type` of each event, or -1
+            for events without a label of the given type. Label codes may be compared as integers, and are converted
+            back to labels with `Label.from_code` (or `from_codes`) of the label type.
+            raises: LabelError if the corpus doesn't have labels of the given type """
+        return self._label_index(label_type).codes()
+
+    def gather_label_codes(self, label_type: Union[Type[Label], str], indices: np.ndarray) -> np.ndarray:
+        """ Returns the label codes (see `get_label_codes`) of the events at `indices`.
+            Note: event indices are assumed to correspond to the position of each event in the corpus.
+            raises: LabelError if the corpus doesn't have labels of the given type """
+        return self.get_label_codes(label_type)[indices]
+
+    def gather_descriptors(self, descriptor_type: Union[Type[Descriptor], str], indices: np.ndarray) -> np.ndarray:
+        """ Returns the values of the descriptor `descriptor_type` for the events at `indices` as an array.
+            Note: event indices are assumed to correspond to the position of each event in the corpus.
+            raises: DescriptorError if any of the events doesn't have a descriptor of the given type """
+        if self._has_descriptor_column(descriptor_type):
+            return self._columns.descriptors.gather(descriptor_type, indices)
+        return np.array([self.events[i].get_descriptor(descriptor_type).value for i in indices])
+
     def get_descriptors_of_type(self, descriptor_type: Type[Descriptor],
                              as_array: bool = False) -> Union[List[Descriptor], np.ndarray]:
+        """ Note: if `as_array` is True, a read-only view of the corpus' internal descriptor column is returned """
         if as_array:
+            if self._has_descriptor_column(descriptor_type):
+                return self._columns.descriptors.get(descriptor_type)
             return np.array([e.get_descriptor(descriptor_type).value for e in self.events])
+        elif descriptor_type in self._analyzed and self._has_descriptor_column(descriptor_type):
+            # computed descriptors are only stored as a column, not in the events
+            return list(self.get_descriptor_array(descriptor_type))
         else:
             return [e.get_descriptor(descriptor_type) for e in self.events]
 
+    def get_descriptor_array(self, descriptor_type: Union[Type[Descriptor], str]) -> DescriptorArray:
+        """ Returns the descriptors `descriptor_type` of all events as a `DescriptorArray`, which is a read-only view of
+            the corpus' internal descriptor column if available.
+            raises: DescriptorError if any event in the corpus doesn't have a valid descriptor of the given type
+                    CorpusError if the type of the descriptor can't be determined """
+        return DescriptorArray(self._value_type(descriptor_type, "descriptors"),
+                               self.get_descriptors_of_type(descriptor_type, as_array=True))
+
+    def register_analyzer(self, analyzer: DescriptorAnalyzer, override: bool = False) -> None:
+        """ Register an analyzer for this corpus only (see `DescriptorAnalyzer.register` for all corpora). The
+            descriptor will be computed for all events the first time it's requested (unless it already exists).
+            raises: DescriptorError if an analyzer is already registered for the key and `override` is False """
+        if analyzer.key in self._analyzers and not override:
+            raise DescriptorError(f"An analyzer is already registered for "
+                                  f"'{getattr(analyzer.key, '__name__', analyzer.key)}'")
+        self._analyzers[analyzer.key] = analyzer
+
+    def persist_analyzed_descriptors(self, filepath: Optional[str] = None) -> None:
+        """ Store all descriptor columns computed by analyzers in the corpus at `filepath` (exported in
+            `BinaryCorpusFormat`, by default the file that this corpus was loaded from or last exported to),
+            so that they're loaded with the corpus rather than recomputed.
+            raises: IOError if `filepath` doesn't exist or isn't a corpus in `BinaryCorpusFormat`
+                    CorpusError if no filepath is given and the corpus hasn't been loaded or exported, or if the
+                                corpus at `filepath` doesn't have the same number of events """
+        filepath = filepath if filepath is not None else self._filepath
+        if filepath is None:
+            raise CorpusError("Could not persist descriptors: the corpus has not been loaded or exported")
+        self._sync_columns()
+        for key, analyzer in self._analyzed.items():
+            if key in self._columns.descriptors:
+                BinaryCorpusFormat.add_descriptor_column(filepath, key, analyzer.descriptor_type,
+                                                         self._columns.descriptors.get(key))
+
+    def nearest_neighbour_index(self, descriptor_type: Union[Type[Descriptor], str],
+                                factory: Optional[Callable[[np.ndarray], NearestNeighbourIndex]] = None
+                                ) -> NearestNeighbourIndex:
+        """ Returns a nearest neighbour index over the values of the (vectorial) descriptor `descriptor_type`, where
+            the id of each vector is the index of its event. The index is built on first access with `factory`
+            (by default `NearestNeighbourIndex.create`) and is kept up to date incrementally as events are appended.
+            Providing a `factory` always rebuilds the index.
+            raises: DescriptorError if the corpus doesn't have a descriptor column of the given type """
+        if not self._has_descriptor_column(descriptor_type):
+            raise DescriptorError(f"Corpus does not have a descriptor column of type "
+                                  f"'{getattr(descriptor_type, '__name__', descriptor_type)}'")
+        column: np.ndarray = self._columns.descriptors.get(descriptor_type)
+        if column.ndim == 1:
+            column = column.reshape(-1, 1)
+
+        if descriptor_type in self._nearest_neighbour_indices:
+            index, version = self._nearest_neighbour_indices[descriptor_type]
+            # Only appends since last update: the version has increased by exactly the number of new events
+            if factory is None and self._version - version == len(self) - len(index) >= 0:
+                if len(index) < len(self):
+                    index.add(column[len(index):])
+                    self._nearest_neighbour_indices[descriptor_type] = index, self._version
+                return index
+
+        index = (factory if factory is not None else NearestNeighbourIndex.create)(column)
+        self._nearest_neighbour_indices[descriptor_type] = index, self._version
+        return index
+
+    def share(self) -> SharedCorpusMemory:
+        """ Publish the columns of the corpus in shared memory, so that other processes can use the corpus without
+            loading a copy of it, by passing `handle` of the returned object to `attach` in those processes.
+            The caller owns the shared memory and should `close` it once all other processes have terminated.
+            raises: CorpusError if any descriptor or label can't be stored as a column """
+        self._sync_columns()
+        return SharedCorpusMemory.publish(self._event_type(), self.events, self._columns, self.label_types,
+                                          extra_files=self._extra_files(),
+                                          descriptor_value_types=self._analyzed_value_types())
+
+    @classmethod
+    def attach(cls, handle: SharedCorpusHandle, lazy_events: bool = False, **kwargs) -> 'Corpus':
+        """ Create a corpus from a corpus published with `share` (typically in another process). Descriptor columns,
+            scheduling attributes and label values are read-only views of shared memory (appending events to the
+            returned corpus is supported, but will copy the columns into memory owned by this process).
+            If `lazy_events` is True, events are created from the columns on access (see `ColumnarEventList`).
+            raises: CorpusError if the corpus is no longer published or can't be loaded """
+        shared_memory, content = SharedCorpusMemory.attach(handle, lazy_events=lazy_events)
+        corpus: Corpus = cls._from_content(content, source="<shared memory>", **kwargs)
+        corpus._shared_memory = shared_memory
+        return corpus
+
+    def _extra_files(self) -> Dict[str, bytes]:
+        """ Additional content that subclasses need to store alongside the columns when exporting or sharing """
+        return {}
+
+    def _restore_extra_files(self, extra_files: Dict[str, bytes]) -> None:
+        """ Restore content stored with `_extra_files` after loading or attaching """
+        pass
+
+    def _event_type(self) -> Type[E]:
+        return type(self.events[0]) if len(self.events) > 0 else self.get_content_type()
+
+    def _export_binary(self, filepath: str, overwrite: bool = False) -> None:
+        """ Export the corpus in `BinaryCorpusFormat`.
+            raises: IOError if unable to write to file or if file already exists and `overwrite` is False.
+                    CorpusError if any descriptor or label can't be stored as a column """
+        self._sync_columns()
+        BinaryCorpusFormat.export(filepath, self._event_type(), self.events, self._columns, self.label_types,
+                                  overwrite=overwrite, extra_files=self._extra_files(),
+                                  descriptor_value_types=self._analyzed_value_types())
+        self._filepath = filepath
+
+    @classmethod
+    def _load_binary(cls, filepath: str, volatile: bool = False, lazy_events: bool = False, **kwargs) -> 'Corpus':
+        """ Load a corpus exported with `_export_binary`. Unless `volatile` is True, descriptor values are
+            memory-mapped rather than read into memory. If `lazy_events` is True, events are not held in memory
+            but created from the columns on access (see `ColumnarEventList`).
+            raises: IOError if file at `filepath` doesn't exist or is an invalid file type
+                    CorpusError if fails to load corpus """
+        content: CorpusContent = BinaryCorpusFormat.load(filepath, volatile, lazy_events)
+        corpus: Corpus = cls._from_content(content, source=filepath, **kwargs)
+        corpus._filepath = filepath
+        return corpus
+
+    @classmethod
+    def _from_content(cls, content: CorpusContent, source: str, **kwargs) -> 'Corpus':
+        """ raises: CorpusError if the events can't be stored in this type of corpus """
+        corpus: Corpus = cls(content.events, descriptor_types=content.descriptor_types,
+                             label_types=content.label_types, columns=content.columns, **kwargs)
+        if len(content.events) > 0 and not isinstance(content.events[0], corpus.get_content_type()):
+            raise CorpusError(f"Could not load corpus '{source}': events of type {type(content.events[0]).__name__} "
+                              f"cannot be loaded into a {cls.__name__}")
+        corpus._restore_extra_files(content.extra_files)
+        return corpus
+
+    def _label_index(self, label_type: Union[Type[Label], str]) -> LabelIndex:
+        """ raises: LabelError if the corpus doesn't have labels of the given type """
+        self._sync_columns()
+        try:
+            return self._columns.labels[label_type]
+        except KeyError:
+            raise LabelError(f"Corpus does not have labels of type '{getattr(label_type, '__name__', label_type)}'")
+
+    @staticmethod
+    def _label_codes(index: LabelIndex, labels: List[Label]) -> np.ndarray:
+        """ The codes of `labels` in the vocabulary of `index`, or -2 for labels that don't exist in the vocabulary
+            (which, unlike -1, never matches any event) """
+        if all(label.vocabulary() is index.vocabulary for label in labels):
+            return np.fromiter((label.code for label in labels), dtype=np.int64, count=len(labels))
+        return np.fromiter((index.vocabulary.get(index.hashable(label.label), -2) for label in labels),
+                           dtype=np.int64, count=len(labels))
+
+    def _has_descriptor_column(self, descriptor_type: Union[Type[Descriptor], str]) -> bool:
+        """ Computes the column if it doesn't exist and an analyzer is registered for the descriptor
+            raises: DescriptorError if the analyzer fails to compute the descriptor """
+        self._sync_columns()
+        if descriptor_type in self._columns.descriptors:
+            return True
+        analyzer: Optional[DescriptorAnalyzer] = self._analyzer(descriptor_type)
+        if analyzer is None:
+            return False
+
+        column: np.ndarray = analyzer.analyze(self.events)
+        if column.ndim == 0 or column.shape[0] != len(self.events):
+            raise DescriptorError(f"Analyzer of {analyzer.descriptor_type.__name__} returned an array of shape "
+                                  f"{column.shape} for {len(self.events)} events")
+        self._columns.descriptors.set_column(descriptor_type, column)
+        self._analyzed[descriptor_type] = analyzer
+        if descriptor_type not in self.descriptor_types:
+            self.descriptor_types.append(descriptor_type)
+        if isinstance(self.events, ColumnarEventList):
+            self.events.add_descriptor(descriptor_type, analyzer.descriptor_type, column)
+        return True
+
+    def _analyzer(self, descriptor_type: Union[Type[Descriptor], str]) -> Optional[DescriptorAnalyzer]:
+        analyzer: Optional[DescriptorAnalyzer] = self._analyzers.get(descriptor_type)
+        return analyzer if analyzer is not None else DescriptorAnalyzer.registered(descriptor_type)
+
+    def _validate_schema(self,
+                         descriptor_key_sets: Iterable[Iterable[Union[Type[Descriptor], str]]],
+                         label_key_sets: Iterable[Iterable[Union[Type[Label], str]]]) -> None:
+        """ Validate the descriptor and label types of events to be added to the corpus, given as the distinct
+            sets of keys of the events' descriptors and labels. By default, all events are accepted.
+            raises: CorpusError if events with the given descriptors or labels can't be added to the corpus """
+        pass
+
+    def _value_type(self, key: Union[type, str], attribute: str) -> type:
+        """ The class of the values of a descriptor or label (`attribute` is either "descriptors" or "labels")
+            raises: CorpusError if the class can't be determined """
+        if isinstance(key, type):
+            return key
+        if attribute == "descriptors" and key in self._analyzed:
+            return self._analyzed[key].descriptor_type
+        if len(self.events) > 0 and key in getattr(self.events[0], attribute):
+            return type(getattr(self.events[0], attribute)[key])
+        raise CorpusError(f"Could not add events: unknown type of '{key}'")
+
+    def _descriptor_array(self, key: Union[Type[Descriptor], str],
+                          values: Union[np.ndarray, DescriptorArray]) -> DescriptorArray:
+        """ raises: CorpusError if the values aren't valid values of the descriptor """
+        if isinstance(values, DescriptorArray):
+            return values
+        value_type: Type[Descriptor] = self._value_type(key, "descriptors")
+        try:
+            return DescriptorArray(value_type, values)
+        except DescriptorError as e:
+            raise CorpusError(f"Could not add events: invalid values of {value_type.__name__}: {repr(e)}") from e
+
+    def _analyzed_value_types(self) -> Dict[Union[Type[Descriptor], str], Type[Descriptor]]:
+        return {key: analyzer.descriptor_type for key, analyzer in self._analyzed.items()}
+
+    def _sync_columns(self) -> None:
+        """ Append any events that have been added to `self.events` since the columns were last updated. This also
+            keeps the columns valid for subclasses that append to `self.events` without updating the columns. """
+        num_rows: int = len(self._columns)
+        if num_rows == len(self.events):
+            return
+
+        if num_rows == 0 or num_rows > len(self.events):
+            # all rows are rebuilt, which counts as adding every event
+            self._columns = CorpusColumns.from_events(self.events, self.descriptor_types, self.label_types)
+            self._version += len(self.events)
+        else:
+            new_events: List[E] = self.events[num_rows:]
+            self._columns.extend(new_events, self._analyze_missing(new_events))
+            self._version += len(new_events)
+
+    def _analyze_missing(self, events: Sequence[E], provided: Iterable[Union[Type[Descriptor], str]] = ()
+                         ) -> Dict[Union[Type[Descriptor], str], np.ndarray]:
+        """ Compute the values of the descriptor columns that are missing from (some of) the given events, for
+            which an analyzer is available (and that aren't in `provided`) """
+        analyzed: Dict[Union[Type[Descriptor], str], np.ndarray] = {}
+        for key in self._columns.descriptors.keys():
+            analyzer: Optional[DescriptorAnalyzer] = self._analyzer(key)
+            if analyzer is not None and key not in provided and any(key not in e.descriptors for e in events):
+                analyzed[key] = analyzer.analyze(events)
+        return analyzed
+
 
 class GenericCorpus(Corpus[GenericCorpusEvent[T]]):
+    DATA_FILE = "data.pickle"
+
     def __init__(self,
                  events: List[GenericCorpusEvent[T]],
                  descriptor_types: Optional[List[Type[Descriptor]]] = None,
-                 label_types: Optional[List[Type[Label]]] = None):
-        super().__init__(events=events, descriptor_types=descriptor_types, label_types=label_types)
+                 label_types: Optional[List[Type[Label]]] = None,
+                 columns: Optional[CorpusColumns] = None):
+        super().__init__(events=events, descriptor_types=descriptor_types, label_types=label_types, columns=columns)
 
     @classmethod
     def build(cls, *args, **kwargs) -> 'GenericCorpus[T]':
@@ -92,22 +536,50 @@ class GenericCorpus(Corpus[GenericCorpusEvent[T]]):
 
     @classmethod
     def load(cls, filepath: str, volatile: bool = False, **kwargs) -> 'GenericCorpus[T]':
-        raise NotImplemented("Not implemented")  # TODO[B6]
+        """ Note: the `data` of each event is stored with pickle and should only be loaded from trusted sources """
+        return cls._load_binary(filepath, volatile=volatile, **kwargs)
 
     def get_content_type(self) -> Type[E]:
         return GenericCorpusEvent
 
     def export(self, filepath: str, overwrite: bool = False, **kwargs) -> None:
-        raise NotImplemented("Not implemented")  # TODO[B6]
+        """ raises: IOError if unable to write to file or if file already exists and `overwrite` is False.
+                    CorpusError if any descriptor or label can't be stored as a column """
+        self._export_binary(filepath, overwrite=overwrite)
 
-    def append(self, event: GenericCorpusEvent[T]) -> None:
-        for descriptor in event.descriptors:
-            if descriptor not in self.descriptor_types:
-                raise CorpusError(f"Descriptor {descriptor.__class__.__name__} does not exist in corpus {self}. "
-                                  f"Could not add event")
-        for label in event.labels:
-            if label not in self.label_types:
-                raise CorpusError(f"Label {label.__class__.__name__} does not exist in corpus {self}. "
-                                  f"Could not add event")
+    def _extra_files(self) -> Dict[str, bytes]:
+        if any(e.data is not None for e in self.events):
+            return {self.DATA_FILE: pickle.dumps([e.data for e in self.events])}
+        return {}
 
+    def _restore_extra_files(self, extra_files: Dict[str, bytes]) -> None:
+        if self.DATA_FILE in extra_files:
+            data: List[T] = pickle.loads(extra_files[self.DATA_FILE])
+            if isinstance(self.events, ColumnarEventList):
+                self.events.set_field("data", data)
+                return
+            for event, event_data in zip(self.events, data):
+                event.data = event_data
+
+    def append(self, event: GenericCorpusEvent[T]) -> None:
+        """ raises: CorpusError if the event has descriptors or labels that don't exist in the corpus """
+        self._validate_schema([event.descriptors.keys()], [event.labels.keys()])
         self.events.append(event)
+        self._sync_columns()
+
+    def _validate_schema(self,
+                         descriptor_key_sets: Iterable[Iterable[Union[Type[Descriptor], str]]],
+                         label_key_sets: Iterable[Iterable[Union[Type[Label], str]]]) -> None:
+        """ raises: CorpusError if any event has descriptors or labels that don't exist in the corpus """
+        descriptor_types: Set[Union[Type[Descriptor], str]] = set(self.descriptor_types)
+        for keys in descriptor_key_sets:
+            for descriptor_type in keys:
+                if descriptor_type not in descriptor_types:
+                    raise CorpusError(f"Descriptor {getattr(descriptor_type, '__name__', descriptor_type)} does not "
+                                      f"exist in corpus {self}. Could not add event")
+        label_types: Set[Union[Type[Label], str]] = set(self.label_types)
+        for keys in label_key_sets:
+            for label_type in keys:
+                if label_type not in label_types:
+                    raise CorpusError(f"Label {getattr(label_type, '__name__', label_type)} does not exist in corpus "
+                                      f"{self}. Could not add event")
@@ -0,0 +1,173 @@
+import itertools
+import logging
+from typing import Generic, Type, Optional, Callable, Iterable, List, Dict, Union, Any, Iterator
+
+import numpy as np
+
+from gig.main.corpus import Corpus, E
+from gig.main.corpus_columns import ColumnStore, CorpusColumns, LabelIndex
+from gig.main.corpus_event import schedule_fields
+from gig.main.corpus_format import BinaryCorpusFormat
+from gig.main.descriptor import Descriptor
+from gig.main.exceptions import CorpusError
+from gig.main.label import Label
+
+
+class CorpusBuilder(Generic[E]):
+    """ Builds a corpus from a stream of events (for example a generator analysing a long recording) in a single
+        pass: events are consumed in chunks of `chunk_size`, and the descriptor types, label types and columnar
+        storage of the corpus are all updated from each chunk, so the events are never scanned more than once.
+
+        The schema is inferred from the events: descriptor and label types are listed in the order they're first
+        encountered. As with `CorpusColumns`, only descriptors that all events have (with values of a uniform
+        shape) are stored as columns, while labels are stored as codes in a `LabelIndex` per label type.
+
+        If `keep_events` is False, events are discarded once their chunk has been processed, so that only the
+        columns are held in memory. Such a builder can't `build` a corpus, but can `export` it in
+        `BinaryCorpusFormat`, from which it can later be loaded (memory-mapped) with `Corpus.load`. Note that content
+        that isn't part of the columns (for example the `data` of a `GenericCorpusEvent`) is not exported.
+
+        `progress` is called after each chunk with the number of events processed so far and the total number of
+        events (if the iterable passed to `consume` has a length, otherwise None).
+    """
+    DEFAULT_CHUNK_SIZE = 4096
+
+    def __init__(self,
+                 corpus_type: Type[Corpus[E]],
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 keep_events: bool = True,
+                 progress: Optional[Callable[[int, Optional[int]], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.corpus_type: Type[Corpus[E]] = corpus_type
+        self.chunk_size: int = max(1, chunk_size)
+        self.keep_events: bool = keep_events
+        self.progress: Optional[Callable[[int, Optional[int]], None]] = progress
+
+        self._event_type: Optional[Type[E]] = None
+        self._events: List[E] = []
+        self._size: int = 0
+        # {key: class of its values} in order of first occurrence
+        self._descriptor_types: Dict[Union[Type[Descriptor], str], Type[Descriptor]] = {}
+        self._label_types: Dict[Union[Type[Label], str], Type[Label]] = {}
+
+        self._indices: ColumnStore[str] = ColumnStore({BinaryCorpusFormat.INDEX: np.zeros(0, dtype=np.int64)})
+        self._descriptors: ColumnStore[Union[Type[Descriptor], str]] = ColumnStore()
+        self._schedule: ColumnStore[str] = ColumnStore()
+        self._labels: Dict[Union[Type[Label], str], LabelIndex] = {}  # label code of each row
+        # why the events added so far can't be exported, if any of them has content that isn't stored in columns
+        self._unstorable: Optional[str] = None
+        # the built corpus takes ownership of the events and columns, after which the builder can't be used
+        self._built: bool = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def consume(self, events: Iterable[E]) -> 'CorpusBuilder[E]':
+        """ Add all events of `events` (consumed lazily, `chunk_size` events at a time). Returns self """
+        total: Optional[int] = len(events) if hasattr(events, "__len__") else None
+        total = self._size + total if total is not None else None
+        iterator: Iterator[E] = iter(events)
+        while True:
+            chunk: List[E] = list(itertools.islice(iterator, self.chunk_size))
+            if len(chunk) == 0:
+                return self
+            self.add_chunk(chunk)
+            if self.progress is not None:
+                self.progress(self._size, total)
+
+    def add_chunk(self, events: List[E]) -> None:
+        """ Add a chunk of events, updating the schema and appending the chunk to all columns at once
+            raises: CorpusError if a corpus has already been built (see `build`) """
+        self._check_not_built()
+        if len(events) == 0:
+            return
+        if self._event_type is None:
+            self._event_type = type(events[0])
+
+        descriptor_rows: List[Dict[Union[Type[Descriptor], str], Any]] = []
+        for event in events:
+            descriptor_rows.append({k: d.value for k, d in event.descriptors.items()})
+            for key, descriptor in event.descriptors.items():
+                if key not in self._descriptor_types:
+                    self._add_type(self._descriptor_types, key, type(descriptor), "Descriptor")
+            for key, label in event.labels.items():
+                if key not in self._label_types:
+                    self._label_types[key] = type(label)
+                    self._labels[key] = LabelIndex(size=self._size, vocabulary=type(label).vocabulary())
+
+        fields: List[str] = schedule_fields(self._event_type)
+        schedule_rows: List[Dict[str, Any]] = [{f: getattr(e, f) for f in fields if hasattr(e, f)} for e in events]
+        index_rows: List[Dict[str, Any]] = [{BinaryCorpusFormat.INDEX: e.index} for e in events]
+
+        if self._size == 0:
+            self._descriptors = ColumnStore.from_rows(self._descriptor_types.keys(), descriptor_rows)
+            self._schedule = ColumnStore.from_rows(fields, schedule_rows)
+        else:
+            self._descriptors.extend(descriptor_rows)
+            self._schedule.extend(schedule_rows)
+        for key, index in self._labels.items():
+            index.extend_labels([e.labels.get(key) for e in events])
+        self._indices.extend(index_rows)
+
+        if self._unstorable is None:
+            try:
+                BinaryCorpusFormat.check_storable(events)
+            except CorpusError as e:
+                self._unstorable = str(e)
+        if self.keep_events:
+            self._events.extend(events)
+        self._size += len(events)
+
+    def build(self, **kwargs) -> Corpus[E]:
+        """ Create the corpus from all events added so far. `kwargs` are passed to the corpus' constructor.
+            The corpus takes ownership of the events and columns of the builder (rather than copying them), so the
+            builder can't be used any more once the corpus has been built.
+            raises: CorpusError if the builder doesn't keep its events or if a corpus has already been built """
+        self._check_not_built()
+        if not self.keep_events:
+            raise CorpusError(f"Cannot build a corpus from a {self.__class__.__name__} that doesn't keep its events. "
+                              f"Use export instead")
+        self._built = True
+        columns: CorpusColumns = CorpusColumns(descriptors=self._descriptors, schedule=self._schedule,
+                                               labels=dict(self._labels))
+        return self.corpus_type(self._events,
+                                descriptor_types=list(self._descriptor_types.keys()),
+                                label_types=list(self._label_types.keys()),
+                                columns=columns,
+                                **kwargs)
+
+    def export(self, filepath: str, overwrite: bool = False) -> None:
+        """ Write all events added so far to `filepath` in `BinaryCorpusFormat`, without creating a corpus.
+            raises: IOError if unable to write to file or if file already exists and `overwrite` is False.
+                    CorpusError if any descriptor or label can't be stored as a column, if any event has content that
+                    can't be stored (see `BinaryCorpusFormat.check_storable`) or if a corpus has already been built """
+        self._check_not_built()
+        if self._event_type is None:
+            raise CorpusError("Could not export corpus: no events have been added")
+        if self._unstorable is not None:
+            raise CorpusError(self._unstorable)
+        missing: List[str] = [str(k) for k in self._descriptor_types if k not in self._descriptors]
+        if len(missing) > 0:
+            raise CorpusError(f"Could not export corpus: descriptors {', '.join(missing)} are either missing "
+                              f"from some events or have non-uniform shapes")
+        manifest, arrays = BinaryCorpusFormat.encode_columns(
+            event_type=self._event_type,
+            indices=self._indices.get(BinaryCorpusFormat.INDEX),
+            descriptors=self._descriptors,
+            descriptor_value_types=self._descriptor_types,
+            schedule=self._schedule,
+            labels=self._labels,
+            label_value_types=self._label_types
+        )
+        BinaryCorpusFormat.write(filepath, manifest, arrays, overwrite=overwrite)
+
+    def _check_not_built(self) -> None:
+        """ raises: CorpusError if a corpus has already been built """
+        if self._built:
+            raise CorpusError(f"{self.__class__.__name__} cannot be used after building a corpus")
+
+    def _add_type(self, types: Dict[Any, type], key: Any, value_type: type, kind: str) -> None:
+        types[key] = value_type
+        if self._size > 0:
+            self.logger.debug(f"{kind} {getattr(key, '__name__', key)} is missing from the first {self._size} events "
+                              f"and cannot be stored as a column")
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Optional, Callable, TypeVar, Iterable, Any, Dict, List, Tuple
+
+from gig.main.exceptions import CorpusError
+
+C = TypeVar('C')
+
+
+class CorpusCache:
+    """ Content-addressed on-disk cache of built corpora. Each entry is a directory (a corpus exported in
+        `BinaryCorpusFormat`) named by a key computed from the content of the source files that the corpus was built
+        from and the configuration that it was built with, so an entry is reused if and only if neither has changed.
+
+        The total size of all entries is bounded by `max_size` bytes: when exceeded, least recently used entries are
+        evicted. Hashes of source files are memoized by path, size and modification time, so computing the key of
+        an unchanged set of source files doesn't require reading them again.
+    """
+    DEFAULT_MAX_SIZE = 2 ** 31
+    HASHES_FILE = "source_hashes.json"
+    CHUNK_SIZE = 2 ** 20
+
+    def __init__(self, directory: str, max_size: Optional[int] = DEFAULT_MAX_SIZE):
+        """ `max_size` is the maximum total size of all entries in bytes (unbounded if None) """
+        self.logger = logging.getLogger(__name__)
+        self.directory: str = directory
+        self.max_size: Optional[int] = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, sources: Iterable[str], config: Any) -> str:
+        """ Returns the key of a corpus built from the files `sources` with the given configuration. `config` may be
+            any json-serializable object (other objects are represented by their type and `repr`, so objects without a
+            deterministic `repr` will result in cache misses). The order of `sources` is part of the key, as it
+            generally determines the order of the events in the corpus.
+            raises: IOError if any of the source files can't be read """
+        digest = hashlib.sha256()
+        for i, digest_of_source in enumerate(self._source_digests(sources)):
+            digest.update(f"{i}:{digest_of_source};".encode())
+        digest.update(json.dumps(config, sort_keys=True, default=self._json_default).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str, load: Callable[[str], C]) -> Optional[C]:
+        """ Returns the cached corpus, loaded from the path of the entry with `load`, or None if no valid entry exists.
+            Entries that fail to load are removed. """
+        path: str = self.path(key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            corpus: C = load(path)
+        except (IOError, CorpusError) as e:
+            self.logger.warning(f"Removing invalid corpus cache entry {key}: {repr(e)}")
+            self.remove(key)
+            return None
+        os.utime(path)  # mark as recently used
+        return corpus
+
+    def put(self, key: str, export: Callable[[str], None]) -> None:
+        """ Store a corpus by calling `export` with the path of the entry, then evict least recently used entries
+            (other than the new one) until the cache is within `max_size`
+            raises: IOError if unable to write the entry """
+        export(self.path(key))
+        self.evict(keep=key)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """ Returns the key, size in bytes and last access time of each entry, least recently used first """
+        entries: List[Tuple[str, int, float]] = []
+        for entry in os.scandir(self.directory):
+            if entry.is_dir() and not entry.name.endswith(".tmp"):
+                size: int = sum(f.stat().st_size for f in os.scandir(entry.path) if f.is_file())
+                entries.append((entry.name, size, entry.stat().st_mtime))
+        return sorted(entries, key=lambda e: e[2])
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """ Remove least recently used entries until the total size is within `max_size` """
+        if self.max_size is None:
+            return
+        entries: List[Tuple[str, int, float]] = self.entries()
+        total: int = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if total <= self.max_size:
+                return
+            if key != keep:
+                self.remove(key)
+                total -= size
+
+    def remove(self, key: str) -> None:
+        shutil.rmtree(self.path(key), ignore_errors=True)
+
+    def clear(self) -> None:
+        for key, _, _ in self.entries():
+            self.remove(key)
+
+    def _source_digests(self, sources: Iterable[str]) -> List[str]:
+        """ raises: IOError if any of the source files can't be read """
+        hashes_path: str = os.path.join(self.directory, self.HASHES_FILE)
+        try:
+            with open(hashes_path, "r") as f:
+                memo: Dict[str, List[Any]] = json.load(f)
+        except (IOError, ValueError):
+            memo = {}
+
+        digests: List[str] = []
+        updated: Dict[str, List[Any]] = {}
+        for source in sources:
+            path: str = os.path.abspath(source)
+            stat: os.stat_result = os.stat(path)
+            cached: Optional[List[Any]] = memo.get(path)
+            if cached is not None and cached[:2] == [stat.st_size, stat.st_mtime_ns]:
+                digests.append(cached[2])
+            else:
+                digests.append(self._file_digest(path))
+                updated[path] = [stat.st_size, stat.st_mtime_ns, digests[-1]]
+
+        if len(updated) > 0:
+            memo.update(updated)
+            tmp_path: str = f"{hashes_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(memo, f)
+            os.replace(tmp_path, hashes_path)
+        return digests
+
+    @staticmethod
+    def _file_digest(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CorpusCache.CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _json_default(obj: Any) -> str:
+        if isinstance(obj, type):
+            return f"{obj.__module__}:{obj.__qualname__}"
+        return f"{type(obj).__module__}:{type(obj).__qualname__}:{repr(obj)}"
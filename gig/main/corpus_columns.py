@@ -0,0 +1,395 @@
+import logging
+from typing import Dict, Generic, TypeVar, Optional, List, Any, Iterable, Union, Type, Hashable, Sequence, Tuple
+
+import numpy as np
+
+from gig.main.corpus_event import CorpusEvent, schedule_fields
+from gig.main.descriptor import Descriptor
+from gig.main.label import Label, LabelVocabulary
+
+K = TypeVar('K')
+
+
+class ColumnStore(Generic[K]):
+    """ A set of aligned numpy columns with one row per corpus event, where each column is identified by a key
+        (for example a descriptor type). Columns may have any number of dimensions, where the first axis is the row.
+
+        Columns are stored in buffers that grow geometrically when rows are appended, so appending is amortized O(1)
+        per row regardless of the number of rows. Columns that are read-only (for example memory-mapped) are copied
+        into a growable buffer the first time a row is appended.
+    """
+    GROWTH_FACTOR = 2
+    MIN_CAPACITY = 64
+
+    def __init__(self, columns: Optional[Dict[K, np.ndarray]] = None, size: int = 0):
+        """ raises: ValueError if the provided columns don't have `size` rows """
+        self._columns: Dict[K, np.ndarray] = {}
+        self._size: int = size
+        if columns is not None:
+            for key, values in columns.items():
+                self.set_column(key, values)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._columns
+
+    def keys(self) -> List[K]:
+        return list(self._columns.keys())
+
+    def get(self, key: K) -> np.ndarray:
+        """ Returns a read-only view of the column.
+            raises: KeyError if no column exists for `key` """
+        view: np.ndarray = self._columns[key][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def gather(self, key: K, indices: np.ndarray) -> np.ndarray:
+        """ raises: KeyError if no column exists for `key`
+                    IndexError if any index is out of bounds """
+        return self.get(key)[indices]
+
+    def set_column(self, key: K, values: np.ndarray) -> None:
+        """ raises: ValueError if `values` doesn't have one row per event """
+        values = np.asarray(values)
+        if values.ndim == 0 or values.shape[0] != self._size:
+            raise ValueError(f"column must have {self._size} rows (actual shape: {values.shape})")
+        self._columns[key] = values
+
+    def remove_column(self, key: K) -> None:
+        self._columns.pop(key, None)
+
+    def capacity(self) -> int:
+        """ Number of rows that can be stored without reallocating """
+        return min((c.shape[0] if c.flags.writeable else self._size for c in self._columns.values()),
+                   default=self._size)
+
+    def reserve(self, capacity: int) -> None:
+        """ Pre-allocate buffers for at least `capacity` rows """
+        for key, column in self._columns.items():
+            if capacity > column.shape[0] or not column.flags.writeable:
+                buffer: np.ndarray = np.empty((max(capacity, self._size), *column.shape[1:]), dtype=column.dtype)
+                buffer[:self._size] = column[:self._size]
+                self._columns[key] = buffer
+
+    def append(self, row: Dict[K, Any]) -> List[K]:
+        """ Append a row with one value per column (see `extend`). Amortized O(1).
+            Returns the keys of all removed columns """
+        return self.extend([row])
+
+    def extend(self, rows: List[Dict[K, Any]]) -> List[K]:
+        """ Append multiple rows at once, with at most one reallocation per column. Columns for which any row is
+            missing a value or has a value of another shape or type are removed (see `extend_columns`).
+            Returns the keys of all removed columns """
+        return self.extend_columns({key: self._as_column([row.get(key) for row in rows]) for key in self._columns},
+                                   len(rows))
+
+    def extend_columns(self, values: Dict[K, Optional[np.ndarray]], num_rows: int) -> List[K]:
+        """ Append `num_rows` rows given as one array per column, with at most one reallocation per column. Columns
+            that are missing from `values` (or whose values are None or have another shape or type) can no longer be
+            stored as columns and are removed. Columns are widened if the new values can't be stored in the column's
+            dtype without loss (for example floats in an int column, or longer strings).
+            Returns the keys of all removed columns """
+        if num_rows == 0:
+            return []
+        chunks: Dict[K, np.ndarray] = {}
+        widened: Dict[K, np.dtype] = {}
+        removed: List[K] = []
+        for key, column in self._columns.items():
+            try:
+                chunk: Optional[np.ndarray] = values.get(key)
+                if chunk is None or np.shape(chunk) != (num_rows, *column.shape[1:]):
+                    raise ValueError(f"values cannot be stored in column of shape {column.shape[1:]}")
+                chunk = np.asarray(chunk)
+                dtype: np.dtype = self._storable_dtype(column.dtype, chunk.dtype)
+                if dtype != column.dtype:
+                    widened[key] = dtype
+                chunks[key] = chunk
+            except (ValueError, TypeError):
+                removed.append(key)
+
+        for key in removed:
+            self.remove_column(key)
+        for key, dtype in widened.items():
+            self._columns[key] = self._columns[key].astype(dtype)
+        end: int = self._size + num_rows
+        if self.capacity() < end:
+            self.reserve(max(end, self.MIN_CAPACITY, self._size * self.GROWTH_FACTOR))
+        for key, chunk in chunks.items():
+            self._columns[key][self._size:end] = chunk
+        self._size = end
+        return removed
+
+    @staticmethod
+    def _storable_dtype(column_dtype: np.dtype, value_dtype: np.dtype) -> np.dtype:
+        """ The dtype a column of `column_dtype` must have to store values of `value_dtype` without loss: either
+            `column_dtype` or a wider dtype (including longer strings).
+            raises: TypeError if values of the two dtypes can't be stored in the same column """
+        if np.can_cast(value_dtype, column_dtype, "safe"):
+            return column_dtype
+        if value_dtype.kind in "OV" or (column_dtype.kind in "US") != (value_dtype.kind in "US"):
+            raise TypeError(f"values of dtype {value_dtype} cannot be stored in a column of dtype {column_dtype}")
+        return np.result_type(column_dtype, value_dtype)
+
+    @classmethod
+    def from_rows(cls, keys: Iterable[K], rows: List[Dict[K, Any]]) -> 'ColumnStore[K]':
+        """ Build a column for each key for which all rows have a value and the values have a uniform shape.
+            Keys that can't be stored as a column are ignored. """
+        store: ColumnStore[K] = cls(size=len(rows))
+        for key in keys:
+            column: Optional[np.ndarray] = cls._as_column([row.get(key) for row in rows])
+            if column is not None:
+                store.set_column(key, column)
+        return store
+
+    @staticmethod
+    def _as_column(values: List[Any]) -> Optional[np.ndarray]:
+        """ Returns None if values can't be stored as a numeric array (missing or ragged values) """
+        if any(v is None for v in values):
+            return None
+        try:
+            column: np.ndarray = np.asarray(values)
+        except ValueError:
+            return None
+        if column.dtype == object or len(values) == 0:
+            return None
+        return column
+
+
+class LabelIndex:
+    """ Inverted index mapping each value of a label type to the (sorted) rows of all events with that label value,
+        along with a column of the label code of each row (see `LabelVocabulary`), where rows without a label have
+        code -1. Codes allow comparing labels of many rows at once as integer arrays (for example sequence matching).
+
+        Rows are appended in increasing order, so each posting list remains sorted without re-sorting.
+    """
+    MIN_CAPACITY = 16
+    GROWTH_FACTOR = 2
+
+    def __init__(self, size: int = 0, vocabulary: Optional[LabelVocabulary] = None):
+        """ `vocabulary` should be the vocabulary of the label type (`Label.vocabulary`), so that the codes of the
+            index correspond to `Label.code`. If not provided, the index uses a vocabulary of its own """
+        self.vocabulary: LabelVocabulary = vocabulary if vocabulary is not None else LabelVocabulary()
+        # posting lists (keyed by label code) are stored as (buffer, size) and grow geometrically
+        self._postings: Dict[int, Tuple[np.ndarray, int]] = {}
+        self._codes: np.ndarray = np.full(max(size, self.MIN_CAPACITY), -1, dtype=np.int64)
+        self._size: int = size
+
+    def __len__(self) -> int:
+        """ Number of rows covered by the index (including rows without a label of this type) """
+        return self._size
+
+    @classmethod
+    def from_labels(cls, labels: Sequence[Optional[Label]],
+                    vocabulary: Optional[LabelVocabulary] = None) -> 'LabelIndex':
+        """ Build an index over `labels` (one label per row, or None for rows without a label) """
+        index: LabelIndex = cls(vocabulary=vocabulary)
+        index.extend_labels(labels)
+        return index
+
+    @classmethod
+    def from_codes(cls, codes: np.ndarray, vocabulary: LabelVocabulary) -> 'LabelIndex':
+        """ Build an index over `codes` (one code in `vocabulary` per row, or -1 for rows without a label) """
+        index: LabelIndex = cls(vocabulary=vocabulary)
+        index.extend_codes(codes)
+        return index
+
+    def append(self, value: Optional[Any]) -> None:
+        """ Add a row with the given label value (or None if the row has no label of this type). Amortized O(1).
+            Note: values are interned as given, so they should be canonical values of the label type (`Label.label`),
+            for example as obtained from `Label`s with `append_label` """
+        self.extend([value])
+
+    def append_label(self, label: Optional[Label]) -> None:
+        """ `append` a row with the given label (or None), by the code of the label if it's in `vocabulary` """
+        self.extend_labels([label])
+
+    def extend(self, values: Sequence[Any]) -> None:
+        """ Add multiple rows at once (see `append`), with at most one reallocation per label value """
+        self.extend_codes(self._encode(values))
+
+    def extend_labels(self, labels: Sequence[Optional[Label]]) -> None:
+        """ `extend` with the label of each row (see `append_label`) """
+        self.extend_codes(np.fromiter((self._label_code(label) for label in labels), dtype=np.int64,
+                                      count=len(labels)))
+
+    def extend_codes(self, codes: np.ndarray) -> None:
+        """ `extend` with the code in `vocabulary` of the label of each row (-1 for rows without a label) """
+        codes = np.asarray(codes, dtype=np.int64)
+        self._reserve(self._size + codes.size)
+        self._codes[self._size:self._size + codes.size] = codes
+        labelled: np.ndarray = np.flatnonzero(codes >= 0)
+        if labelled.size > 0:
+            order: np.ndarray = labelled[np.argsort(codes[labelled], kind="stable")]
+            unique_codes, starts = np.unique(codes[order], return_index=True)
+            for code, rows in zip(unique_codes.tolist(), np.split(order, starts[1:])):
+                self._add_rows(code, rows + self._size)
+        self._size += codes.size
+
+    def reserve(self, capacity: int) -> None:
+        self._reserve(capacity)
+
+    def codes(self) -> np.ndarray:
+        """ Returns a read-only array of the label code of each row (-1 for rows without a label) """
+        view: np.ndarray = self._codes[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def _label_code(self, label: Optional[Label]) -> int:
+        if label is None:
+            return -1
+        if label.vocabulary() is self.vocabulary:
+            return label.code
+        return self.vocabulary.code(self.hashable(label.label))
+
+    def _encode(self, values: Sequence[Any]) -> np.ndarray:
+        if isinstance(values, np.ndarray) and values.ndim == 1 and values.dtype != object:
+            unique_values, inverse = np.unique(values, return_inverse=True)
+            return self.vocabulary.codes(unique_values.tolist())[inverse.reshape(-1)]
+        return np.fromiter((-1 if value is None else self.vocabulary.code(self.hashable(value)) for value in values),
+                           dtype=np.int64, count=len(values))
+
+    def _reserve(self, capacity: int) -> None:
+        if capacity > self._codes.size:
+            codes: np.ndarray = np.full(max(capacity, self._codes.size * self.GROWTH_FACTOR), -1, dtype=np.int64)
+            codes[:self._size] = self._codes[:self._size]
+            self._codes = codes
+
+    def _add_rows(self, code: int, rows: np.ndarray) -> None:
+        buffer, size = self._postings.get(code, (np.zeros(0, dtype=np.intp), 0))
+        if size + rows.size > buffer.size:
+            new_buffer: np.ndarray = np.empty(max(self.MIN_CAPACITY, size + rows.size, size * self.GROWTH_FACTOR),
+                                              dtype=np.intp)
+            new_buffer[:size] = buffer[:size]
+            buffer = new_buffer
+        buffer[size:size + rows.size] = rows
+        self._postings[code] = buffer, size + rows.size
+
+    def lookup(self, value: Any) -> np.ndarray:
+        """ Returns a read-only array of the sorted rows with the given label value (empty if no row has the value) """
+        return self.lookup_code(self.vocabulary.get(self.hashable(value)))
+
+    def lookup_code(self, code: int) -> np.ndarray:
+        """ `lookup` by label code """
+        try:
+            buffer, size = self._postings[code]
+        except KeyError:
+            return np.zeros(0, dtype=np.intp)
+        view: np.ndarray = buffer[:size]
+        view.flags.writeable = False
+        return view
+
+    def lookup_batch(self, values: Iterable[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """ Look up multiple label values at once. Returns the concatenated rows of all values as well as an array of
+            offsets, where the rows of `values[i]` are given by `rows[offsets[i]:offsets[i + 1]]` """
+        postings: List[np.ndarray] = [self.lookup(value) for value in values]
+        offsets: np.ndarray = np.zeros(len(postings) + 1, dtype=np.intp)
+        np.cumsum([p.size for p in postings], out=offsets[1:])
+        rows: np.ndarray = np.concatenate(postings) if len(postings) > 0 else np.zeros(0, dtype=np.intp)
+        return rows, offsets
+
+    def values(self) -> List[Hashable]:
+        return self.vocabulary.values(self._postings.keys())
+
+    @staticmethod
+    def hashable(value: Any) -> Hashable:
+        if isinstance(value, (list, np.ndarray)):
+            return tuple(np.asarray(value).tolist())
+        return value.item() if isinstance(value, np.generic) else value
+
+
+class CorpusColumns:
+    """ Columnar storage of the event data in a corpus, with one row per event (in the order of `Corpus.events`):
+        one column per descriptor type, one column per scheduling attribute (onsets, durations, etc.) and an inverted
+        `LabelIndex` per label type. Data that can't be stored as a column (for example descriptors that are missing
+        from some events) is left out, and should be read from the events themselves.
+    """
+
+    def __init__(self,
+                 descriptors: ColumnStore[Union[Type[Descriptor], str]],
+                 schedule: ColumnStore[str],
+                 labels: Optional[Dict[Union[Type[Label], str], LabelIndex]] = None):
+        """ raises: ValueError if the stores don't have the same number of rows """
+        labels = labels if labels is not None else {}
+        if len(descriptors) != len(schedule) or any(len(index) != len(descriptors) for index in labels.values()):
+            raise ValueError("all column stores must have the same number of rows")
+        self.logger = logging.getLogger(__name__)
+        self.descriptors: ColumnStore[Union[Type[Descriptor], str]] = descriptors
+        self.schedule: ColumnStore[str] = schedule
+        self.labels: Dict[Union[Type[Label], str], LabelIndex] = labels
+
+    def __len__(self) -> int:
+        return len(self.descriptors)
+
+    @classmethod
+    def from_events(cls, events: List[CorpusEvent],
+                    descriptor_types: List[Union[Type[Descriptor], str]],
+                    label_types: List[Union[Type[Label], str]]) -> 'CorpusColumns':
+        fields: List[str] = schedule_fields(type(events[0])) if len(events) > 0 else []
+        return cls(descriptors=ColumnStore.from_rows(descriptor_types, [cls._descriptor_row(e) for e in events]),
+                   schedule=ColumnStore.from_rows(fields, [cls._schedule_row(e, fields) for e in events]),
+                   labels={label_type: LabelIndex.from_labels([e.labels.get(label_type) for e in events],
+                                                               cls._label_vocabulary(events, label_type))
+                           for label_type in label_types})
+
+    def append(self, event: CorpusEvent,
+               descriptors: Optional[Dict[Union[Type[Descriptor], str], Any]] = None) -> None:
+        """ Append a single event (see `extend`). Amortized O(1). `descriptors` may provide values of descriptors that
+            aren't stored in the event """
+        self.extend([event], {key: ColumnStore._as_column([value]) for key, value in (descriptors or {}).items()})
+
+    def extend(self, events: Sequence[CorpusEvent],
+               descriptors: Optional[Dict[Union[Type[Descriptor], str], np.ndarray]] = None) -> None:
+        """ Append multiple events at once, with at most one reallocation per column. `descriptors` may provide
+            values (one row per event) of descriptors that aren't stored in the events """
+        descriptor_values: Dict[Union[Type[Descriptor], str], Optional[np.ndarray]] = {
+            key: ColumnStore._as_column([e.descriptors[key].value if key in e.descriptors else None for e in events])
+            for key in self.descriptors.keys() if descriptors is None or key not in descriptors
+        }
+        descriptor_values.update(descriptors or {})
+        schedule_values: Dict[str, Optional[np.ndarray]] = {
+            field: ColumnStore._as_column([getattr(e, field, None) for e in events]) for field in self.schedule.keys()
+        }
+        self.extend_arrays(descriptor_values,
+                           schedule_values,
+                           {label_type: [e.labels.get(label_type) for e in events] for label_type in self.labels},
+                           len(events))
+
+    def extend_arrays(self,
+                      descriptors: Dict[Union[Type[Descriptor], str], Optional[np.ndarray]],
+                      schedule: Dict[str, Optional[np.ndarray]],
+                      labels: Dict[Union[Type[Label], str], Sequence[Optional[Label]]],
+                      num_rows: int) -> None:
+        """ Append `num_rows` rows given as one array per column (or sequence of `Label`s or None, for labels), with
+            at most one reallocation per column. Columns that are missing from the arrays are removed
+            (see `ColumnStore.extend_columns`) """
+        for key in self.descriptors.extend_columns(descriptors, num_rows):
+            self.logger.debug(f"Descriptor {key} is missing from or has a different shape in some of the added "
+                              f"events and cannot be stored as a column. "
+                              f"Falling back to per-event lookup for this descriptor")
+        self.schedule.extend_columns(schedule, num_rows)
+        for label_type, index in self.labels.items():
+            index.extend_labels(labels.get(label_type, [None] * num_rows))
+
+    def reserve(self, capacity: int) -> None:
+        self.descriptors.reserve(capacity)
+        self.schedule.reserve(capacity)
+        for index in self.labels.values():
+            index.reserve(capacity)
+
+    @staticmethod
+    def _descriptor_row(event: CorpusEvent) -> Dict[Union[Type[Descriptor], str], Any]:
+        return {k: d.value for k, d in event.descriptors.items()}
+
+    @staticmethod
+    def _schedule_row(event: CorpusEvent, fields: Iterable[str]) -> Dict[str, Any]:
+        return {field: getattr(event, field) for field in fields if hasattr(event, field)}
+
+    @staticmethod
+    def _label_vocabulary(events: List[CorpusEvent], label_type: Union[Type[Label], str]) -> Optional[LabelVocabulary]:
+        """ The vocabulary of the labels `label_type` of the events, if known """
+        if isinstance(label_type, type) and issubclass(label_type, Label):
+            return label_type.vocabulary()
+        label: Optional[Label] = events[0].labels.get(label_type) if len(events) > 0 else None
+        return label.vocabulary() if label is not None else None
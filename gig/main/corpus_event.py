@@ -1,4 +1,3 @@
-import logging
 from typing import Dict, Union, Type, List, Optional, Generic, TypeVar
 
 from gig.main.descriptor import Descriptor
@@ -10,7 +9,10 @@ T = TypeVar('T')
 
 
 class RelativeSchedulable:
-    """ Interface for events that may be scheduled in relative time (ticks) """
+    """ Interface for events that may be scheduled in relative time (ticks).
+        Note: declares no slots (to allow combining it with other slotted bases), so concrete subclasses must
+              declare `__slots__` for its attributes """
+    __slots__ = ()
 
     def __init__(self, relative_onset: float, relative_duration: float, tempo: float, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -20,7 +22,10 @@ class RelativeSchedulable:
 
 
 class AbsoluteSchedulable:
-    """ Interface for events that may be scheduled in absolute time (seconds) """
+    """ Interface for events that may be scheduled in absolute time (seconds).
+        Note: declares no slots (to allow combining it with other slotted bases), so concrete subclasses must
+              declare `__slots__` for its attributes """
+    __slots__ = ()
 
     def __init__(self, absolute_onset: float, absolute_duration: float, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -28,14 +33,28 @@ class AbsoluteSchedulable:
         self.absolute_duration: float = absolute_duration
 
 
+def schedule_fields(event_type: type) -> List[str]:
+    """ Returns the names of the (numeric) scheduling attributes of the given event type """
+    fields: List[str] = []
+    if issubclass(event_type, RelativeSchedulable):
+        fields.extend(["relative_onset", "relative_duration", "tempo"])
+    if issubclass(event_type, AbsoluteSchedulable):
+        fields.extend(["absolute_onset", "absolute_duration"])
+    return fields
+
+
 class CorpusEvent:
+    """ Base class for all events in a corpus. Events are slotted, as a corpus may hold hundreds of thousands of
+        them: subclasses should declare `__slots__` for all of their attributes (including those of any mixin,
+        see `RelativeSchedulable`) """
+    __slots__ = ("index", "descriptors", "labels")
+
     def __init__(self,
                  index: int,
                  descriptors: Optional[Dict[Union[str, Type[Descriptor]], Descriptor]] = None,
                  labels: Optional[Dict[Union[str, Type[Label]], Label]] = None,
                  **kwargs):
         super().__init__(**kwargs)
-        self.logger = logging.getLogger(__name__)
         self.index: int = index
         self.descriptors: Dict[Union[str, Type[Descriptor]], Descriptor]
         self.descriptors = descriptors if descriptors is not None else {}
@@ -48,6 +67,17 @@ class CorpusEvent:
         else:
             return f"{self.__class__.__name__}(index={self.index},descriptors=...,labels=...)"
 
+    @classmethod
+    def from_fields(cls,
+                    index: int,
+                    descriptors: Dict[Union[str, Type[Descriptor]], Descriptor],
+                    labels: Dict[Union[str, Type[Label]], Label],
+                    **fields) -> 'CorpusEvent':
+        """ Create an event from the fields stored when exporting a corpus (index, descriptors, labels and any
+            scheduling attributes). Subclasses with additional constructor arguments that aren't stored should
+            override this to provide default values for them. """
+        return cls(index=index, descriptors=descriptors, labels=labels, **fields)
+
     def get_descriptor(self, descriptor_type: Union[str, Type[Descriptor]]) -> Descriptor:
         try:
             return self.descriptors[descriptor_type]
@@ -63,6 +93,8 @@ class CorpusEvent:
 
 
 class GenericCorpusEvent(CorpusEvent, Generic[T]):
+    __slots__ = ("data",)
+
     def __init__(self,
                  data: T,
                  index: int,
@@ -72,8 +104,19 @@ class GenericCorpusEvent(CorpusEvent, Generic[T]):
         super().__init__(index=index, descriptors=descriptors, labels=labels, **kwargs)
         self.data: T = data
 
+    @classmethod
+    def from_fields(cls,
+                    index: int,
+                    descriptors: Dict[Union[str, Type[Descriptor]], Descriptor],
+                    labels: Dict[Union[str, Type[Label]], Label],
+                    data: Optional[T] = None,
+                    **fields) -> 'GenericCorpusEvent[T]':
+        return cls(data=data, index=index, descriptors=descriptors, labels=labels, **fields)
+
 
 class MidiEvent(CorpusEvent, RelativeSchedulable, AbsoluteSchedulable):
+    __slots__ = ("relative_onset", "relative_duration", "tempo", "absolute_onset", "absolute_duration", "notes")
+
     def __init__(self,
                  index: int,
                  descriptors: Dict[Union[str, Type[Descriptor]], Descriptor],
@@ -94,22 +137,37 @@ class MidiEvent(CorpusEvent, RelativeSchedulable, AbsoluteSchedulable):
                          absolute_duration=absolute_duration)
         self.notes: List[Note] = notes
 
+    @classmethod
+    def from_fields(cls,
+                    index: int,
+                    descriptors: Dict[Union[str, Type[Descriptor]], Descriptor],
+                    labels: Dict[Union[str, Type[Label]], Label],
+                    **fields) -> 'MidiEvent':
+        # notes aren't stored in `BinaryCorpusFormat`, which refuses to export events with notes (see `check_storable`)
+        return cls(index=index, descriptors=descriptors, labels=labels, notes=[], **fields)
+
 
 class AudioEvent(CorpusEvent, AbsoluteSchedulable):
+    __slots__ = ("absolute_onset", "absolute_duration")
+
     def __init__(self,
                  index: int,
                  descriptors: Dict[Union[str, Type[Descriptor]], Descriptor],
                  labels: Dict[Union[str, Type[Label]], Label],
                  absolute_onset: float,
-                 absolute_duration: float):
+                 absolute_duration: float,
+                 **kwargs):
         super().__init__(index=index,
                          descriptors=descriptors,
                          labels=labels,
                          absolute_onset=absolute_onset,
-                         absolute_duration=absolute_duration)
+                         absolute_duration=absolute_duration,
+                         **kwargs)
 
 
 class BeatAudioEvent(AudioEvent, RelativeSchedulable):
+    __slots__ = ("relative_onset", "relative_duration", "tempo")
+
     def __init__(self,
                  index: int,
                  descriptors: Dict[Union[str, Type[Descriptor]], Descriptor],
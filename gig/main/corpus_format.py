@@ -0,0 +1,487 @@
+import importlib
+import json
+import os
+import shutil
+from typing import Dict, List, Type, Union, Any, Optional, Tuple, NamedTuple, Callable, Sequence, Iterator, \
+    Iterable, overload
+
+import numpy as np
+
+from gig.main.corpus_columns import ColumnStore, CorpusColumns, LabelIndex
+from gig.main.corpus_event import CorpusEvent, MidiEvent
+from gig.main.descriptor import Descriptor
+from gig.main.exceptions import CorpusError, LabelError
+from gig.main.label import Label
+
+
+class CorpusContent(NamedTuple):
+    events: List[CorpusEvent]
+    descriptor_types: List[Union[Type[Descriptor], str]]
+    label_types: List[Union[Type[Label], str]]
+    columns: CorpusColumns
+    extra_files: Dict[str, bytes] = {}
+
+
+class ColumnarEventList(Sequence[CorpusEvent]):
+    """ List of events of a corpus loaded in columnar form, where events are not held in memory but created from
+        the columns (index, descriptors, labels and scheduling attributes) each time they're accessed, so that a
+        corpus of any size only needs its columns in memory. Events are therefore transient: two accesses to the same
+        index return equal but distinct objects, and modifying an event has no effect on the corpus.
+
+        Events appended to the list (for example with `Corpus.append`) are stored as is. Additional per-event
+        fields (passed to `from_fields` of the event type, for example the `data` of a `GenericCorpusEvent`) may be
+        provided with `set_field`.
+    """
+
+    def __init__(self,
+                 event_type: Type[CorpusEvent],
+                 indices: np.ndarray,
+                 descriptors: List[Tuple[Union[Type[Descriptor], str], Type[Descriptor], np.ndarray]],
+                 labels: List[Tuple[Union[Type[Label], str], Type[Label], np.ndarray]],
+                 schedule: Dict[str, np.ndarray]):
+        """ `labels` hold the label code (see `Label.code`) of each row, or -1 for rows without the label """
+        self.event_type: Type[CorpusEvent] = event_type
+        self._indices: np.ndarray = indices
+        self._descriptors: List[Tuple[Union[Type[Descriptor], str], Type[Descriptor], np.ndarray]] = descriptors
+        self._labels: List[Tuple[Union[Type[Label], str], Type[Label], np.ndarray]] = labels
+        self._schedule: Dict[str, np.ndarray] = schedule
+        self._fields: Dict[str, Sequence[Any]] = {}
+        self._appended: List[CorpusEvent] = []
+
+    def __len__(self) -> int:
+        return self._indices.shape[0] + len(self._appended)
+
+    @overload
+    def __getitem__(self, i: int) -> CorpusEvent: ...
+
+    @overload
+    def __getitem__(self, s: slice) -> List[CorpusEvent]: ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[CorpusEvent, List[CorpusEvent]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError("event index out of range")
+        num_columnar: int = self._indices.shape[0]
+        if i >= num_columnar:
+            return self._appended[i - num_columnar]
+        return self.event_type.from_fields(
+            index=int(self._indices[i]),
+            descriptors={key: value_type(column[i] if column.ndim > 1 else column[i].item())
+                         for key, value_type, column in self._descriptors},
+            labels={key: value_type.from_code(int(codes[i]))
+                    for key, value_type, codes in self._labels if codes[i] >= 0},
+            **{field: column[i].item() for field, column in self._schedule.items()},
+            **{field: values[i] for field, values in self._fields.items()}
+        )
+
+    def __iter__(self) -> Iterator[CorpusEvent]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def append(self, event: CorpusEvent) -> None:
+        self._appended.append(event)
+
+    def extend(self, events: Iterable[CorpusEvent]) -> None:
+        self._appended.extend(events)
+
+    def add_descriptor(self, key: Union[Type[Descriptor], str], value_type: Type[Descriptor],
+                       column: np.ndarray) -> None:
+        """ Include a descriptor that isn't stored in the corpus file (see `DescriptorAnalyzer`) in all columnar
+            events, where `column` has (at least) one row per columnar event """
+        self._descriptors = [d for d in self._descriptors if d[0] != key]
+        self._descriptors.append((key, value_type, column))
+
+    def set_field(self, name: str, values: Sequence[Any]) -> None:
+        """ Provide the value of an additional field for each of the columnar (i.e. not appended) events
+            raises: ValueError if `values` doesn't have one value per columnar event """
+        if len(values) != self._indices.shape[0]:
+            raise ValueError(f"expected {self._indices.shape[0]} values for field '{name}' (actual: {len(values)})")
+        self._fields[name] = values
+
+
+class BinaryCorpusFormat:
+    """ On-disk corpus format storing all events as aligned arrays, one `.npy` file per column, in a directory:
+
+            <filepath>/manifest.json        format version, event type and a description of each column
+            <filepath>/index.npy            event indices
+            <filepath>/<field>.npy          onsets/durations/tempo for `AbsoluteSchedulable`/`RelativeSchedulable`
+            <filepath>/descriptor_<n>.npy   one column per descriptor type (2-d for vectorial descriptors)
+            <filepath>/label_<n>.npy        one column of label codes per label type (-1 for events without the
+                                            label), indexing the label values listed in the manifest
+
+        Since each column is a plain `.npy` file, columns can be memory-mapped when loading, which makes loading
+        independent of corpus size (apart from creating the event objects) and lets multiple processes loading the
+        same corpus share the page cache.
+    """
+    FORMAT_VERSION = 2
+    MANIFEST = "manifest.json"
+    INDEX = "index"
+
+    @staticmethod
+    def export(filepath: str,
+               event_type: Type[CorpusEvent],
+               events: List[CorpusEvent],
+               columns: CorpusColumns,
+               label_types: List[Union[Type[Label], str]],
+               overwrite: bool = False,
+               extra_files: Optional[Dict[str, bytes]] = None,
+               descriptor_value_types: Optional[Dict[Union[Type[Descriptor], str], Type[Descriptor]]] = None) -> None:
+        """ Write the events (with descriptor values and scheduling attributes given by `columns`) to `filepath`.
+            `extra_files` may be used by subclasses of `Corpus` to store additional content alongside the columns.
+            See `encode` for `descriptor_value_types`.
+            raises: IOError if unable to write to file or if file already exists and `overwrite` is False.
+                    CorpusError if any descriptor or label can't be stored as a column """
+        if os.path.exists(filepath) and not overwrite:
+            raise FileExistsError(f"Could not export corpus: '{filepath}' already exists")
+
+        manifest, arrays = BinaryCorpusFormat.encode(event_type, events, columns, label_types, extra_files,
+                                                     descriptor_value_types)
+        BinaryCorpusFormat.write(filepath, manifest, arrays, extra_files, overwrite=overwrite)
+
+    @staticmethod
+    def write(filepath: str,
+              manifest: Dict[str, Any],
+              arrays: Dict[str, np.ndarray],
+              extra_files: Optional[Dict[str, bytes]] = None,
+              overwrite: bool = False) -> None:
+        """ Write an encoded corpus (see `encode`) to `filepath`. The corpus is first written to a temporary
+            directory, so that an existing corpus at `filepath` is only replaced once writing has succeeded.
+            raises: IOError if unable to write to file or if file already exists and `overwrite` is False. """
+        if os.path.exists(filepath) and not overwrite:
+            raise FileExistsError(f"Could not export corpus: '{filepath}' already exists")
+
+        tmp_path: str = f"{filepath.rstrip(os.sep)}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name, column in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(column), allow_pickle=False)
+        for name, content in (extra_files or {}).items():
+            with open(os.path.join(tmp_path, name), "wb") as f:
+                f.write(content)
+        with open(os.path.join(tmp_path, BinaryCorpusFormat.MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        if os.path.isdir(filepath):
+            shutil.rmtree(filepath)
+        elif os.path.exists(filepath):
+            os.remove(filepath)
+        os.rename(tmp_path, filepath)
+
+    @staticmethod
+    def load(filepath: str, volatile: bool = False, lazy_events: bool = False) -> CorpusContent:
+        """ Load events, descriptor types, label types and columns from `filepath`. If `volatile` is
+            False, all columns are memory-mapped (read-only), otherwise they are read into memory.
+            See `decode` for `lazy_events`.
+            raises: IOError if `filepath` doesn't exist or isn't a corpus in this format
+                    CorpusError if the corpus can't be loaded (for example if it uses an outdated format) """
+        manifest: Dict[str, Any] = BinaryCorpusFormat.read_manifest(filepath)
+        mmap_mode: Optional[str] = None if volatile else "r"
+
+        def read(name: str) -> np.ndarray:
+            return np.load(os.path.join(filepath, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+
+        extra_files: Dict[str, bytes] = {}
+        for name in manifest.get("extra_files", []):
+            with open(os.path.join(filepath, name), "rb") as f:
+                extra_files[name] = f.read()
+
+        return BinaryCorpusFormat.decode(manifest, read, extra_files, source=filepath, lazy_events=lazy_events)
+
+    @staticmethod
+    def encode(event_type: Type[CorpusEvent],
+               events: List[CorpusEvent],
+               columns: CorpusColumns,
+               label_types: List[Union[Type[Label], str]],
+               extra_files: Optional[Dict[str, bytes]] = None,
+               descriptor_value_types: Optional[Dict[Union[Type[Descriptor], str], Type[Descriptor]]] = None
+               ) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """ Returns the manifest and the arrays (by name) describing the corpus, independently of storage.
+            The class of the values of each descriptor column is taken from the first event, unless given in
+            `descriptor_value_types` (for columns that aren't stored in the events, see `DescriptorAnalyzer`).
+            raises: CorpusError if any descriptor or label can't be stored as a column, or if any event has content
+                    that can't be stored (see `check_storable`) """
+        BinaryCorpusFormat.check_storable(events)
+        value_types: Dict[Union[Type[Descriptor], str], Type[Descriptor]] = dict(descriptor_value_types or {})
+        for key in columns.descriptors.keys():
+            if key not in value_types:
+                if len(events) > 0 and key in events[0].descriptors:
+                    value_types[key] = type(events[0].descriptors[key])
+                elif isinstance(key, type):
+                    value_types[key] = key
+                else:
+                    raise CorpusError(f"Could not export corpus: unknown type of descriptor '{key}'")
+
+        if len(events) > 0:
+            missing: List[str] = [str(k) for k in events[0].descriptors.keys() if k not in columns.descriptors]
+            if len(missing) > 0:
+                raise CorpusError(f"Could not export corpus: descriptors {', '.join(missing)} are either missing "
+                                  f"from some events or have non-uniform shapes")
+
+        label_value_types: Dict[Union[Type[Label], str], Type[Label]] = {}
+        for key in label_types:
+            if key not in columns.labels:
+                raise CorpusError(f"Could not export corpus: no index of label '{getattr(key, '__name__', key)}'")
+            label_value_types[key] = BinaryCorpusFormat._label_value_type(key, columns.labels[key], events)
+        return BinaryCorpusFormat.encode_columns(
+            event_type=event_type,
+            indices=np.array([e.index for e in events], dtype=np.int64),
+            descriptors=columns.descriptors,
+            descriptor_value_types={k: value_types[k] for k in columns.descriptors.keys()},
+            schedule=columns.schedule,
+            labels=columns.labels,
+            label_value_types=label_value_types,
+            extra_files=extra_files
+        )
+
+    @staticmethod
+    def check_storable(events: Iterable[CorpusEvent]) -> None:
+        """ Only columns (and extra files) are stored, so events must not have any other content. In particular,
+            the notes of a `MidiEvent` aren't stored, as `Note` isn't implemented yet.
+            raises: CorpusError if any event has content that can't be stored """
+        for event in events:
+            if isinstance(event, MidiEvent) and len(event.notes) > 0:
+                raise CorpusError(f"Could not export corpus: notes of {type(event).__name__} {event.index} "
+                                  f"cannot be stored")
+
+    @staticmethod
+    def encode_columns(event_type: Type[CorpusEvent],
+                       indices: np.ndarray,
+                       descriptors: ColumnStore[Union[Type[Descriptor], str]],
+                       descriptor_value_types: Dict[Union[Type[Descriptor], str], Type[Descriptor]],
+                       schedule: ColumnStore[str],
+                       labels: Dict[Union[Type[Label], str], LabelIndex],
+                       label_value_types: Dict[Union[Type[Label], str], Type[Label]],
+                       extra_files: Optional[Dict[str, bytes]] = None) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """ `encode` from columns only, where the value types map the key of each descriptor/label to the class of
+            its values. Labels are stored as codes, with the values of all codes used listed in the manifest.
+            raises: CorpusError if any label in `label_value_types` has no index or its values can't be stored
+                    in the manifest (as json) """
+        arrays: Dict[str, np.ndarray] = {BinaryCorpusFormat.INDEX: np.asarray(indices, dtype=np.int64)}
+        manifest: Dict[str, Any] = {"version": BinaryCorpusFormat.FORMAT_VERSION,
+                                    "event_type": BinaryCorpusFormat.type_name(event_type),
+                                    "size": len(indices),
+                                    "schedule": [],
+                                    "descriptors": [],
+                                    "labels": [],
+                                    "extra_files": sorted(extra_files or {})}
+
+        for field in schedule.keys():
+            arrays[field] = schedule.get(field)
+            manifest["schedule"].append(field)
+
+        for i, key in enumerate(descriptors.keys()):
+            arrays[f"descriptor_{i}"] = descriptors.get(key)
+            manifest["descriptors"].append({"file": f"descriptor_{i}",
+                                            "key": BinaryCorpusFormat._key_to_json(key),
+                                            "type": BinaryCorpusFormat.type_name(descriptor_value_types[key])})
+
+        for i, (key, value_type) in enumerate(label_value_types.items()):
+            if key not in labels:
+                raise CorpusError(f"Could not export corpus: no index of label '{getattr(key, '__name__', key)}'")
+            codes, vocabulary = BinaryCorpusFormat._encode_label_codes(labels[key])
+            try:
+                json.dumps(vocabulary)
+            except (TypeError, ValueError) as e:
+                raise CorpusError(f"Could not export corpus: values of label '{getattr(key, '__name__', key)}' "
+                                  f"cannot be stored ({repr(e)})") from e
+            arrays[f"label_{i}"] = codes
+            manifest["labels"].append({"file": f"label_{i}",
+                                       "key": BinaryCorpusFormat._key_to_json(key),
+                                       "type": BinaryCorpusFormat.type_name(value_type),
+                                       "vocabulary": vocabulary})
+
+        return manifest, arrays
+
+    @staticmethod
+    def decode(manifest: Dict[str, Any],
+               read: Callable[[str], np.ndarray],
+               extra_files: Optional[Dict[str, bytes]] = None,
+               source: str = "",
+               lazy_events: bool = False) -> CorpusContent:
+        """ Inverse of `encode`, where `read` returns the array with the given name. Columns are used as returned by
+            `read` (i.e. without copying), vectorial descriptor values of events are views of their column.
+            If `lazy_events` is True, events are not created up front but read from the columns on access
+            (see `ColumnarEventList`).
+            raises: CorpusError if the corpus can't be loaded (for example if it uses an outdated format) """
+        try:
+            event_type: Type[CorpusEvent] = BinaryCorpusFormat.resolve_type(manifest["event_type"], CorpusEvent)
+            size: int = manifest["size"]
+            indices: np.ndarray = read(BinaryCorpusFormat.INDEX)
+            schedule_columns: ColumnStore[str] = ColumnStore({field: read(field) for field in manifest["schedule"]},
+                                                             size=size)
+
+            descriptor_columns: ColumnStore = ColumnStore(size=size)
+            descriptor_types: List[Tuple[Union[Type[Descriptor], str], Type[Descriptor]]] = []
+            for entry in manifest["descriptors"]:
+                key: Union[Type[Descriptor], str] = BinaryCorpusFormat._key_from_json(entry["key"], Descriptor)
+                descriptor_columns.set_column(key, read(entry["file"]))
+                descriptor_types.append((key, BinaryCorpusFormat.resolve_type(entry["type"], Descriptor)))
+
+            label_columns: Dict[Union[Type[Label], str], np.ndarray] = {}
+            label_types: List[Tuple[Union[Type[Label], str], Type[Label]]] = []
+            for entry in manifest["labels"]:
+                key: Union[Type[Label], str] = BinaryCorpusFormat._key_from_json(entry["key"], Label)
+                value_type: Type[Label] = BinaryCorpusFormat.resolve_type(entry["type"], Label)
+                label_columns[key] = BinaryCorpusFormat._decode_label_codes(read(entry["file"]), entry["vocabulary"],
+                                                                            value_type)
+                label_types.append((key, value_type))
+        except (KeyError, TypeError, ValueError, IndexError, AttributeError, LabelError) as e:
+            raise CorpusError(f"Could not load corpus '{source}': invalid or corrupt file ({repr(e)})") from e
+
+        descriptors: List[Tuple[Union[Type[Descriptor], str], Type[Descriptor], np.ndarray]] = [
+            (key, value_type, descriptor_columns.get(key)) for key, value_type in descriptor_types
+        ]
+        labels: List[Tuple[Union[Type[Label], str], Type[Label], np.ndarray]] = [
+            (key, value_type, label_columns[key]) for key, value_type in label_types
+        ]
+        schedule: Dict[str, np.ndarray] = {field: schedule_columns.get(field) for field in schedule_columns.keys()}
+
+        events: List[CorpusEvent]
+        if lazy_events:
+            events = ColumnarEventList(event_type, indices, descriptors, labels, schedule)
+        else:
+            # scalar values are converted to python types, vectorial values are views of their column
+            descriptor_values: List[Tuple[Any, Type[Descriptor], Union[List, np.ndarray]]] = [
+                (key, value_type, column if column.ndim > 1 else column.tolist())
+                for key, value_type, column in descriptors
+            ]
+            label_codes: List[Tuple[Any, Type[Label], List[int]]] = [(k, t, c.tolist()) for k, t, c in labels]
+            schedule_values: Dict[str, List[float]] = {field: column.tolist() for field, column in schedule.items()}
+            index_values: List[int] = indices.tolist()
+            events = []
+            for i in range(size):
+                events.append(event_type.from_fields(
+                    index=index_values[i],
+                    descriptors={key: value_type(values[i]) for key, value_type, values in descriptor_values},
+                    labels={key: value_type.from_code(codes[i]) for key, value_type, codes in label_codes
+                            if codes[i] >= 0},
+                    **{field: values[i] for field, values in schedule_values.items()}
+                ))
+
+        return CorpusContent(events=events,
+                             descriptor_types=[key for key, _ in descriptor_types],
+                             label_types=[key for key, _ in label_types],
+                             columns=CorpusColumns(descriptors=descriptor_columns,
+                                                   schedule=schedule_columns,
+                                                   labels={key: LabelIndex.from_codes(codes, value_type.vocabulary())
+                                                           for key, value_type, codes in labels}),
+                             extra_files=dict(extra_files or {}))
+
+    @staticmethod
+    def add_descriptor_column(filepath: str,
+                              key: Union[Type[Descriptor], str],
+                              value_type: Type[Descriptor],
+                              column: np.ndarray) -> None:
+        """ Add (or replace) the column of a descriptor in an exported corpus.
+            raises: IOError if `filepath` doesn't exist or isn't a corpus in this format
+                    CorpusError if the column doesn't have one row per event in the corpus """
+        manifest: Dict[str, Any] = BinaryCorpusFormat.read_manifest(filepath)
+        if column.shape[0] != manifest["size"]:
+            raise CorpusError(f"Could not add descriptor column to '{filepath}': expected {manifest['size']} rows "
+                              f"(actual: {column.shape[0]})")
+        json_key: Dict[str, str] = BinaryCorpusFormat._key_to_json(key)
+        entries: List[Dict[str, Any]] = [e for e in manifest["descriptors"] if e["key"] != json_key]
+        files: List[str] = [e["file"] for e in entries]
+        n: int = len(entries)
+        while f"descriptor_{n}" in files:
+            n += 1
+        entries.append({"file": f"descriptor_{n}",
+                        "key": json_key,
+                        "type": BinaryCorpusFormat.type_name(value_type)})
+        manifest["descriptors"] = entries
+
+        # write to temporary files first, so that the corpus remains valid if writing fails
+        tmp_column: str = os.path.join(filepath, f"descriptor_{n}.tmp.npy")
+        np.save(tmp_column, np.ascontiguousarray(column), allow_pickle=False)
+        tmp_manifest: str = os.path.join(filepath, f"{BinaryCorpusFormat.MANIFEST}.tmp")
+        with open(tmp_manifest, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_column, os.path.join(filepath, f"descriptor_{n}.npy"))
+        os.replace(tmp_manifest, os.path.join(filepath, BinaryCorpusFormat.MANIFEST))
+
+    @staticmethod
+    def read_manifest(filepath: str) -> Dict[str, Any]:
+        """ raises: IOError if `filepath` doesn't exist or isn't a corpus in this format
+                    CorpusError if the corpus uses an unsupported format version """
+        manifest_path: str = os.path.join(filepath, BinaryCorpusFormat.MANIFEST)
+        if not os.path.isfile(manifest_path):
+            raise FileNotFoundError(f"'{filepath}' is not a corpus in {BinaryCorpusFormat.__name__}")
+        try:
+            with open(manifest_path, "r") as f:
+                manifest: Dict[str, Any] = json.load(f)
+        except json.JSONDecodeError as e:
+            raise CorpusError(f"Could not load corpus '{filepath}': invalid manifest") from e
+
+        if manifest.get("version") != BinaryCorpusFormat.FORMAT_VERSION:
+            raise CorpusError(f"Could not load corpus '{filepath}': unsupported format version "
+                              f"{manifest.get('version')} (expected {BinaryCorpusFormat.FORMAT_VERSION})")
+        return manifest
+
+    @staticmethod
+    def type_name(t: type) -> str:
+        return f"{t.__module__}:{t.__qualname__}"
+
+    @staticmethod
+    def resolve_type(name: str, base: type) -> type:
+        """ Resolve a type name (see `type_name`) to a class, which must be a subclass of `base`. Type names are read
+            from files, so the resolved object is checked before it's ever called.
+            raises: CorpusError if the type cannot be imported or isn't a subclass of `base` """
+        try:
+            module_name, qualname = name.split(":")
+            obj: Any = importlib.import_module(module_name)
+            for attr in qualname.split("."):
+                obj = getattr(obj, attr)
+        except (ValueError, ImportError, AttributeError) as e:
+            raise CorpusError(f"Could not resolve type '{name}'") from e
+        if not isinstance(obj, type) or not issubclass(obj, base):
+            raise CorpusError(f"Could not resolve type '{name}': not a subclass of {base.__name__}")
+        return obj
+
+    @staticmethod
+    def _label_value_type(key: Union[Type[Label], str], index: LabelIndex,
+                          events: Sequence[CorpusEvent]) -> Type[Label]:
+        """ The class of the values of a label, taken from the first event with the label
+            raises: CorpusError if no event has the label and the key isn't a label type """
+        labelled: np.ndarray = np.flatnonzero(index.codes() >= 0)
+        if labelled.size > 0 and labelled[0] < len(events) and key in events[int(labelled[0])].labels:
+            return type(events[int(labelled[0])].labels[key])
+        if isinstance(key, type) and issubclass(key, Label):
+            return key
+        raise CorpusError(f"Could not export corpus: unknown type of label '{key}'")
+
+    @staticmethod
+    def _encode_label_codes(index: LabelIndex) -> Tuple[np.ndarray, List[Any]]:
+        """ Returns the codes of the index renumbered to the values used by any row, and the values of these codes """
+        codes: np.ndarray = index.codes()
+        labelled: np.ndarray = codes >= 0
+        used: np.ndarray = np.unique(codes[labelled])
+        encoded: np.ndarray = np.full(codes.shape[0], -1, dtype=np.int64)
+        encoded[labelled] = np.searchsorted(used, codes[labelled])
+        return encoded, index.vocabulary.values(used.tolist())
+
+    @staticmethod
+    def _decode_label_codes(codes: np.ndarray, vocabulary: List[Any], value_type: Type[Label]) -> np.ndarray:
+        """ Inverse of `_encode_label_codes`, returning codes in the vocabulary of `value_type`
+            raises: LabelError if any value isn't a valid value of `value_type`
+                    IndexError if any code isn't in `vocabulary` """
+        mapping: np.ndarray = np.array([value_type(value).code for value in vocabulary], dtype=np.int64)
+        decoded: np.ndarray = np.full(codes.shape[0], -1, dtype=np.int64)
+        labelled: np.ndarray = codes >= 0
+        decoded[labelled] = mapping[codes[labelled]]
+        return decoded
+
+    @staticmethod
+    def _key_to_json(key: Union[type, str]) -> Dict[str, str]:
+        if isinstance(key, str):
+            return {"name": key}
+        return {"type": BinaryCorpusFormat.type_name(key)}
+
+    @staticmethod
+    def _key_from_json(key: Dict[str, str], base: type) -> Union[type, str]:
+        """ raises: CorpusError if the key is a type that isn't a subclass of `base` """
+        if "name" in key:
+            return key["name"]
+        return BinaryCorpusFormat.resolve_type(key["type"], base)
@@ -0,0 +1,146 @@
+import sys
+from multiprocessing import shared_memory
+from typing import Dict, Any, Tuple, List, NamedTuple, Optional, Type, Union
+
+import numpy as np
+
+from gig.main.corpus_columns import CorpusColumns
+from gig.main.corpus_event import CorpusEvent
+from gig.main.corpus_format import BinaryCorpusFormat, CorpusContent
+from gig.main.descriptor import Descriptor
+from gig.main.exceptions import CorpusError
+from gig.main.label import Label
+
+
+class SharedCorpusHandle(NamedTuple):
+    """ Picklable description of a corpus published in shared memory, which may be passed to other processes
+        (for example as an argument to an `AsyncOscMPC`) in order to attach to the corpus there """
+    manifest: Dict[str, Any]
+    arrays: Dict[str, Tuple[str, Tuple[int, ...], str]]  # {name: (shared memory block name, shape, dtype)}
+    extra_files: Dict[str, Tuple[str, int]]  # {name: (shared memory block name, size in bytes)}
+
+
+class _SharedMemoryBlock(shared_memory.SharedMemory):
+    """ Shared memory block that may be closed (or garbage collected) while arrays still reference its buffer,
+        in which case the memory stays mapped until the last of these arrays has been freed """
+
+    def close(self) -> None:
+        try:
+            super().close()
+        except BufferError:
+            pass
+
+
+class SharedCorpusMemory:
+    """ The shared memory blocks holding the columns (descriptors, scheduling attributes, label values) of a corpus
+        in `BinaryCorpusFormat` layout. Columns are published once by one process (`publish`) and attached read-only
+        by any number of other processes (`attach`), so that multiple agents running in separate processes can use
+        the same corpus without each loading and holding their own copy of it.
+
+        The publishing process owns the blocks: they're released when it calls `close` (or exits the context),
+        which should only be done once all attached processes have terminated. Attached processes map the same
+        physical memory and only need to create their event objects.
+
+        Note: on python < 3.13, attaching registers each block with the resource tracker, so processes attaching to
+              a corpus should be started by the publishing process (as with `AsyncOscMPC`), which shares its
+              resource tracker with its children.
+    """
+
+    def __init__(self, handle: SharedCorpusHandle, blocks: List[shared_memory.SharedMemory], owner: bool):
+        self.handle: SharedCorpusHandle = handle
+        self._blocks: List[shared_memory.SharedMemory] = blocks
+        self._owner: bool = owner
+
+    def __enter__(self) -> 'SharedCorpusMemory':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(block.size for block in self._blocks)
+
+    @staticmethod
+    def publish(event_type: Type[CorpusEvent],
+                events: List[CorpusEvent],
+                columns: CorpusColumns,
+                label_types: List[Union[Type[Label], str]],
+                extra_files: Optional[Dict[str, bytes]] = None,
+                descriptor_value_types: Optional[Dict[Union[Type[Descriptor], str], Type[Descriptor]]] = None
+                ) -> 'SharedCorpusMemory':
+        """ Copy all columns (and `extra_files`) of a corpus into newly created shared memory blocks.
+            See `BinaryCorpusFormat.encode` for `descriptor_value_types`.
+            raises: CorpusError if any descriptor or label can't be stored as a column """
+        manifest, arrays = BinaryCorpusFormat.encode(event_type, events, columns, label_types, extra_files,
+                                                     descriptor_value_types)
+        blocks: List[shared_memory.SharedMemory] = []
+        try:
+            array_specs: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block: shared_memory.SharedMemory = _SharedMemoryBlock(create=True, size=max(array.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                array_specs[name] = block.name, array.shape, array.dtype.str
+
+            file_specs: Dict[str, Tuple[str, int]] = {}
+            for name, content in (extra_files or {}).items():
+                block: shared_memory.SharedMemory = _SharedMemoryBlock(create=True, size=max(len(content), 1))
+                blocks.append(block)
+                block.buf[:len(content)] = content
+                file_specs[name] = block.name, len(content)
+        except BaseException:
+            for block in blocks:
+                block.close()
+                block.unlink()
+            raise
+
+        return SharedCorpusMemory(SharedCorpusHandle(manifest, array_specs, file_specs), blocks, owner=True)
+
+    @staticmethod
+    def attach(handle: SharedCorpusHandle, lazy_events: bool = False) -> Tuple['SharedCorpusMemory', CorpusContent]:
+        """ Attach to the blocks of a published corpus. Returns the content of the corpus, where all columns are
+            read-only views of shared memory (see `BinaryCorpusFormat.decode` for `lazy_events`). The returned
+            `SharedCorpusMemory` must be kept alive as long as the content is used.
+            raises: CorpusError if the corpus is no longer published or can't be loaded """
+        blocks: List[shared_memory.SharedMemory] = []
+        arrays: Dict[str, np.ndarray] = {}
+        extra_files: Dict[str, bytes] = {}
+        try:
+            for name, (block_name, shape, dtype) in handle.arrays.items():
+                block: shared_memory.SharedMemory = SharedCorpusMemory._open(block_name)
+                blocks.append(block)
+                array: np.ndarray = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+                array.setflags(write=False)
+                arrays[name] = array
+            for name, (block_name, size) in handle.extra_files.items():
+                block: shared_memory.SharedMemory = SharedCorpusMemory._open(block_name)
+                blocks.append(block)
+                extra_files[name] = bytes(block.buf[:size])
+        except FileNotFoundError as e:
+            for block in blocks:
+                block.close()
+            raise CorpusError(f"Could not attach to shared corpus: {e}") from e
+
+        content: CorpusContent = BinaryCorpusFormat.decode(handle.manifest, arrays.__getitem__, extra_files,
+                                                           source="<shared memory>", lazy_events=lazy_events)
+        return SharedCorpusMemory(handle, blocks, owner=False), content
+
+    def close(self) -> None:
+        """ Detach from the shared memory blocks, and release them if this is the publishing process """
+        for block in self._blocks:
+            block.close()
+            if self._owner:
+                try:
+                    block.unlink()
+                except FileNotFoundError:
+                    pass
+        self._blocks = []
+
+    @staticmethod
+    def _open(name: str) -> shared_memory.SharedMemory:
+        """ raises: FileNotFoundError if the block doesn't exist """
+        if sys.version_info >= (3, 13):
+            return _SharedMemoryBlock(name=name, track=False)
+        return _SharedMemoryBlock(name=name)
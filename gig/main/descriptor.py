@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, Type, List
+from typing import TypeVar, Generic, Type, List, Dict, Optional, FrozenSet, Iterable, Tuple, Sequence, \
+    Union, Iterator, Callable, Any
 
 import numpy as np
 
@@ -7,12 +8,49 @@ from gig.io.parsable import Parsable
 from gig.main.exceptions import DescriptorError
 
 T = TypeVar('T')
+D = TypeVar('D', bound='Descriptor')
 
 
 class Descriptor(Generic[T], Parsable['Descriptor'], ABC):
+    # All subclasses of Descriptor, registered on definition
+    _registry: List[Type['Descriptor']] = []
+    # Compatibility (`compatible_with`) and subclass (`subtypes`) tables over `_registry`, rebuilt on the first lookup
+    # after a new descriptor type has been registered
+    _tables: Optional[Tuple[Dict[Type['Descriptor'], FrozenSet[Type['Descriptor']]],
+                            Dict[Type['Descriptor'], FrozenSet[Type['Descriptor']]]]] = None
+
     def __init__(self, value: T):
         self.value: T = value
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Descriptor._registry.append(cls)
+        Descriptor._tables = None
+
+    @classmethod
+    def array(cls: Type[D], values: np.ndarray) -> 'DescriptorArray[D]':
+        """ Batch of descriptors of this type, stored as one array with one value per row (see `DescriptorArray`)
+            raises: DescriptorError if the values aren't valid values of this type """
+        return DescriptorArray(cls, values)
+
+    @classmethod
+    def validate_array(cls, values: np.ndarray) -> np.ndarray:
+        """ Validate multiple values of this descriptor type at once, given as an array with one value per row.
+            Returns the (possibly reshaped or cast) values, which may be a view of `values`.
+            Subclasses that validate values in `__init__` should override this with the equivalent array validation.
+            raises: DescriptorError if any of the values isn't a valid value of this type """
+        if values.ndim == 0:
+            raise DescriptorError(f"{cls.__name__} values must be given as an array with one value per row")
+        return values
+
+    @classmethod
+    def _view(cls: Type[D], value: T) -> D:
+        """ Create a descriptor with a value that has already been validated (with `validate_array`),
+            without copying or validating it """
+        descriptor: D = cls.__new__(cls)
+        descriptor.value = value
+        return descriptor
+
     # TODO: Implement way to parse Descriptor directly from set of onsets etc (without limiting it to onset/duration)
     #  This is one of the most important functions, and it should be able to handle a number of cases, for example
     #  a pre-computed NoteMatrix, pre-computed spectrogram (or compute its own spectrogram), list of onsets, etc.
@@ -67,15 +105,64 @@ class Descriptor(Generic[T], Parsable['Descriptor'], ABC):
                 `descriptor_that_the_prospector_has_been_trained_on.compatible_with(type(influence_descriptor))`
 
             """
-        return issubclass(descriptor_type, cls) or descriptor_type in cls._compatible_descriptors()
+        return descriptor_type in cls.compatible_types()
+
+    @classmethod
+    def compatible_types(cls) -> FrozenSet[Type['Descriptor']]:
+        """ All registered descriptor types `t` for which `cls.compatible_with(t)` is true """
+        return Descriptor._lookup(cls, 1)
+
+    @classmethod
+    def subtypes(cls) -> FrozenSet[Type['Descriptor']]:
+        """ All registered descriptor types that are subclasses of `cls` (including `cls` itself). This is a cached
+            equivalent of `issubclass(descriptor_type, cls)` for descriptor types, i.e. `t in cls.subtypes()` """
+        return Descriptor._lookup(cls, 0)
+
+    @classmethod
+    def incompatible_types(cls, descriptor_types: Iterable[Type['Descriptor']]) -> List[Type['Descriptor']]:
+        """ Batch form of `compatible_with`: returns all types in `descriptor_types` that `cls` isn't compatible with
+            (an empty list if all of them are compatible) """
+        compatible: FrozenSet[Type[Descriptor]] = cls.compatible_types()
+        return [t for t in descriptor_types if t not in compatible]
+
+    @staticmethod
+    def _lookup(descriptor_type: Type['Descriptor'], table_index: int) -> FrozenSet[Type['Descriptor']]:
+        tables = Descriptor._tables
+        if tables is None or descriptor_type not in tables[table_index]:
+            tables = Descriptor._build_tables()
+        return tables[table_index][descriptor_type]
+
+    @staticmethod
+    def _build_tables() -> Tuple[Dict[Type['Descriptor'], FrozenSet[Type['Descriptor']]],
+                                 Dict[Type['Descriptor'], FrozenSet[Type['Descriptor']]]]:
+        descriptor_types: List[Type[Descriptor]] = [Descriptor, *Descriptor._registry]
+        subtypes: Dict[Type[Descriptor], FrozenSet[Type[Descriptor]]] = {
+            t: frozenset(s for s in descriptor_types if issubclass(s, t)) for t in descriptor_types
+        }
+        compatibility: Dict[Type[Descriptor], FrozenSet[Type[Descriptor]]] = {
+            t: subtypes[t].union(s for s in t._compatible_descriptors() if isinstance(s, type))
+            for t in descriptor_types
+        }
+        Descriptor._tables = subtypes, compatibility
+        return subtypes, compatibility
 
 
 class IntegralDescriptor(Descriptor[int], ABC):
-    pass
+    @classmethod
+    def validate_array(cls, values: np.ndarray) -> np.ndarray:
+        if values.ndim != 1 or not np.issubdtype(values.dtype, np.integer):
+            raise DescriptorError(f"{cls.__name__} values must be given as a one-dimensional array of integers "
+                                  f"(actual: {values.dtype} array with shape {values.shape})")
+        return values
 
 
 class FloatingDescriptor(Descriptor[float], ABC):
-    pass
+    @classmethod
+    def validate_array(cls, values: np.ndarray) -> np.ndarray:
+        if values.ndim != 1 or not np.issubdtype(values.dtype, np.number) or np.iscomplexobj(values):
+            raise DescriptorError(f"{cls.__name__} values must be given as a one-dimensional array of numbers "
+                                  f"(actual: {values.dtype} array with shape {values.shape})")
+        return values.astype(np.float64, copy=False)
 
 
 class VectorialDescriptor(Descriptor[np.ndarray], ABC):
@@ -86,9 +173,17 @@ class VectorialDescriptor(Descriptor[np.ndarray], ABC):
         if value.ndim > 1:
             raise DescriptorError(f"{self.__class__.__name__} only supports one-dimensional vectors")
 
+    @classmethod
+    def validate_array(cls, values: np.ndarray) -> np.ndarray:
+        if values.ndim != 2:
+            raise DescriptorError(f"{cls.__name__} values must be given as a two-dimensional array with one vector "
+                                  f"per row (actual shape: {values.shape})")
+        return values
+
 
 class FixedVectorialFeature(VectorialDescriptor, ABC):
     """ Feature class for (1d) vectors with a fixed feature size (for example 12-dimensional chroma, etc.) """
+    SIZE: Optional[int] = None  # the feature size, if the same for all instances of the class
 
     def __init__(self, value: np.ndarray, size: int):
         super().__init__(value)
@@ -100,7 +195,7 @@ class FixedVectorialFeature(VectorialDescriptor, ABC):
 class MidiPitch(IntegralDescriptor):
     @staticmethod
     def _compatible_descriptors() -> List[Type['Descriptor']]:
-        return super()._compatible_descriptors()
+        return IntegralDescriptor._compatible_descriptors()
 
 
 class Chroma12(FixedVectorialFeature):
@@ -116,6 +211,66 @@ class Chroma12(FixedVectorialFeature):
 
         super().__init__(value=value.reshape(-1), size=value.size)
 
+    @classmethod
+    def validate_array(cls, values: np.ndarray) -> np.ndarray:
+        if values.ndim < 2 or int(np.prod(values.shape[1:])) != cls.SIZE:
+            raise DescriptorError(f"{cls.__name__} can only handle values of size {cls.SIZE} "
+                                  f"(actual shape: {values.shape})")
+        return values.reshape(values.shape[0], cls.SIZE)
+
     @staticmethod
     def _compatible_descriptors() -> List[Type['Descriptor']]:
-        return super()._compatible_descriptors()
+        return FixedVectorialFeature._compatible_descriptors()
+
+
+class DescriptorArray(Sequence[D]):
+    """ N values of the descriptor type `descriptor_type` stored in a single array with one value per row, for example
+        all chroma frames of a recording. The values are validated once for the whole batch (with
+        `Descriptor.validate_array`) rather than once per `Descriptor` object.
+
+        Indexing returns a `Descriptor` of `descriptor_type`, whose value is a view of the corresponding row
+        (not a copy) for vectorial descriptors, and slicing (or indexing with an array of indices) returns a
+        `DescriptorArray`.
+        The array may be passed anywhere a numpy array of descriptor values is accepted (`np.asarray` doesn't copy it).
+    """
+
+    def __init__(self, descriptor_type: Type[D], values: np.ndarray):
+        """ raises: DescriptorError if the values aren't valid values of `descriptor_type` """
+        self.descriptor_type: Type[D] = descriptor_type
+        self.values: np.ndarray = descriptor_type.validate_array(np.asarray(values))
+
+    @classmethod
+    def from_descriptors(cls, descriptors: Sequence[D]) -> 'DescriptorArray[D]':
+        """ raises: DescriptorError if the descriptors are empty or don't all have the same type """
+        if len(descriptors) == 0:
+            raise DescriptorError(f"Cannot determine the descriptor type of an empty {cls.__name__}")
+        descriptor_type: Type[D] = type(descriptors[0])
+        if any(type(descriptor) is not descriptor_type for descriptor in descriptors):
+            raise DescriptorError(f"All descriptors of a {cls.__name__} must have the same type")
+        return cls(descriptor_type, np.array([descriptor.value for descriptor in descriptors]))
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def __getitem__(self, index: Union[int, slice, Sequence[int], np.ndarray]) -> Union[D, 'DescriptorArray[D]']:
+        if isinstance(index, (int, np.integer)):
+            value: np.ndarray = self.values[index]
+            return self.descriptor_type._view(value.item() if value.ndim == 0 else value)
+        array: DescriptorArray[D] = DescriptorArray.__new__(DescriptorArray)
+        array.descriptor_type = self.descriptor_type
+        array.values = self.values[index]
+        return array
+
+    def __iter__(self) -> Iterator[D]:
+        view: Callable[[Any], D] = self.descriptor_type._view
+        if self.values.ndim == 1:
+            return (view(value) for value in self.values.tolist())
+        return (view(value) for value in self.values)
+
+    def __array__(self, dtype: Optional[np.dtype] = None, copy: Optional[bool] = None) -> np.ndarray:
+        if copy:
+            return np.array(self.values, dtype=dtype)
+        return self.values if dtype is None else self.values.astype(dtype, copy=False)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.descriptor_type.__name__}, shape={self.values.shape})"
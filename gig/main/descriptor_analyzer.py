@@ -0,0 +1,64 @@
+from abc import ABC, abstractmethod
+from typing import Type, Union, Dict, Optional, Sequence, Callable, Any
+
+import numpy as np
+
+from gig.main.corpus_event import CorpusEvent
+from gig.main.descriptor import Descriptor
+from gig.main.exceptions import DescriptorError
+
+
+class DescriptorAnalyzer(ABC):
+    """ Computes the values of a descriptor from the (raw) content of events, for example from the notes of a
+        `MidiEvent` or the `data` of a `GenericCorpusEvent`, rather than requiring the descriptor to be computed
+        before the events are created.
+
+        Analyzers are registered either globally (`DescriptorAnalyzer.register`) or for a single corpus
+        (`Corpus.register_analyzer`). A corpus which doesn't have a descriptor will compute it with the registered
+        analyzer for all its events the first time the descriptor is requested, and store the result as a column
+        (see `Corpus.persist_analyzed_descriptors` to store the column alongside a corpus on disk).
+    """
+    _registry: Dict[Union[Type[Descriptor], str], 'DescriptorAnalyzer'] = {}
+
+    def __init__(self, descriptor_type: Type[Descriptor], key: Optional[Union[Type[Descriptor], str]] = None):
+        """ `key` is the key of the descriptor in the corpus (by default `descriptor_type`) """
+        self.descriptor_type: Type[Descriptor] = descriptor_type
+        self.key: Union[Type[Descriptor], str] = key if key is not None else descriptor_type
+
+    @abstractmethod
+    def analyze(self, events: Sequence[CorpusEvent]) -> np.ndarray:
+        """ Returns the value of the descriptor for each event, as an array with one row per event
+            raises: DescriptorError if the descriptor can't be computed for the given events """
+
+    @staticmethod
+    def register(analyzer: 'DescriptorAnalyzer', override: bool = False) -> None:
+        """ raises: DescriptorError if an analyzer is already registered for the key and `override` is False """
+        if analyzer.key in DescriptorAnalyzer._registry and not override:
+            raise DescriptorError(f"An analyzer is already registered for "
+                                  f"'{getattr(analyzer.key, '__name__', analyzer.key)}'")
+        DescriptorAnalyzer._registry[analyzer.key] = analyzer
+
+    @staticmethod
+    def unregister(key: Union[Type[Descriptor], str]) -> None:
+        DescriptorAnalyzer._registry.pop(key, None)
+
+    @staticmethod
+    def registered(key: Union[Type[Descriptor], str]) -> Optional['DescriptorAnalyzer']:
+        return DescriptorAnalyzer._registry.get(key)
+
+
+class FunctionAnalyzer(DescriptorAnalyzer):
+    """ Analyzer computing the value of the descriptor of each event independently with `function` """
+
+    def __init__(self,
+                 descriptor_type: Type[Descriptor],
+                 function: Callable[[CorpusEvent], Any],
+                 key: Optional[Union[Type[Descriptor], str]] = None):
+        super().__init__(descriptor_type, key)
+        self.function: Callable[[CorpusEvent], Any] = function
+
+    def analyze(self, events: Sequence[CorpusEvent]) -> np.ndarray:
+        try:
+            return np.array([self.function(event) for event in events])
+        except (TypeError, ValueError, AttributeError) as e:
+            raise DescriptorError(f"Could not compute {self.descriptor_type.__name__}: {repr(e)}") from e
@@ -3,7 +3,7 @@ from collections.abc import Iterable
 from typing import TypeVar, Generic, List, Union, Type, Any
 
 from gig.main.corpus_event import CorpusEvent
-from gig.main.descriptor import Descriptor
+from gig.main.descriptor import Descriptor, DescriptorArray
 from gig.main.label import Label
 
 T = TypeVar('T')
@@ -22,7 +22,8 @@ class Influence(Generic[T], ABC):
         return cls._from_type_or_iterable(value_type=CorpusEvent, influence_type=CorpusInfluence, data=events)
 
     @classmethod
-    def from_descriptors(cls, descriptors: Union[Descriptor, List[Descriptor]]) -> List['Influence']:
+    def from_descriptors(cls, descriptors: Union[Descriptor, List[Descriptor], DescriptorArray]) -> List['Influence']:
+        """ Note: the influences of a `DescriptorArray` share their values with the array (see `DescriptorArray`) """
         return cls._from_type_or_iterable(value_type=Descriptor, influence_type=DescriptorInfluence, data=descriptors)
 
     @classmethod
@@ -1,14 +1,150 @@
+import threading
 from abc import ABC
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, List, Dict, Hashable, Iterable, Optional, Tuple, Iterator, Any, Union
+
+import numpy as np
+
+from gig.main.exceptions import LabelError
 
 T = TypeVar('T')
 
 
+class LabelVocabulary:
+    """ Interning table mapping the values of a label type to dense integer codes (0, 1, 2, ... in order of first
+        occurrence), allowing labels to be stored and compared as integer arrays.
+        Note: codes depend on the order in which values are interned, and are only valid within a process.
+    """
+
+    def __init__(self):
+        self._codes: Dict[Hashable, int] = {}
+        self._values: List[Hashable] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, value: Hashable) -> bool:
+        return value in self._codes
+
+    def code(self, value: Hashable) -> int:
+        """ Returns the code of `value`, adding it to the vocabulary if it doesn't exist
+            raises: TypeError if the value isn't hashable """
+        try:
+            return self._codes[value]
+        except KeyError:
+            with self._lock:
+                code: Optional[int] = self._codes.get(value)
+                if code is None:
+                    code = len(self._values)
+                    self._values.append(value)
+                    self._codes[value] = code
+                return code
+
+    def codes(self, values: Iterable[Hashable]) -> np.ndarray:
+        """ Returns the codes of multiple values (see `code`) """
+        if isinstance(values, np.ndarray):
+            values = values.tolist()
+        return np.fromiter((self.code(value) for value in values), dtype=np.int64)
+
+    def get(self, value: Hashable, default: int = -1) -> int:
+        """ Returns the code of `value` without adding it to the vocabulary, or `default` if it doesn't exist """
+        try:
+            return self._codes.get(value, default)
+        except TypeError:
+            return default
+
+    def value(self, code: int) -> Hashable:
+        """ raises: IndexError if no value has the given code """
+        if code < 0:
+            raise IndexError(f"invalid label code {code}")
+        return self._values[code]
+
+    def values(self, codes: Optional[Iterable[int]] = None) -> List[Hashable]:
+        """ Returns the values of the given codes, or all values in the vocabulary (ordered by code) """
+        if codes is None:
+            return list(self._values)
+        return [self.value(code) for code in codes]
+
+
 class Label(Generic[T], ABC):
+    """ Labels are interned: each label type has a `LabelVocabulary` mapping its values to dense integer codes (the
+        `code` of each label) and a single, immutable instance per value (e.g. `IntLabel(3) is IntLabel(3)`).
+        Labels are compared and hashed by type and value.
+
+        Subclasses may normalize values (for example to make them hashable) by overriding `_canonical`.
+    """
+    __slots__ = ("label", "code")
+
+    _vocabulary: LabelVocabulary = LabelVocabulary()
+    _instances: Dict[int, 'Label'] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._vocabulary = LabelVocabulary()
+        cls._instances = {}
+
+    def __new__(cls, label: T):
+        """ raises: LabelError if `label` isn't a valid value of this label type """
+        value: Hashable = cls._canonical(label)
+        try:
+            code: int = cls._vocabulary.code(value)
+        except TypeError as e:
+            raise LabelError(f"Invalid value for {cls.__name__}: {repr(label)} is not hashable") from e
+        instance: Optional[Label] = cls._instances.get(code)
+        if instance is None:
+            instance = super().__new__(cls)
+            object.__setattr__(instance, "label", value)
+            object.__setattr__(instance, "code", code)
+            instance = cls._instances.setdefault(code, instance)
+        return instance
+
     def __init__(self, label: T):
-        self.label: T = label
+        """ Note: `label` and `code` are assigned on interning (in `__new__`) """
+        pass
 
-    pass  # TODO: Empty interface for now
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Label):
+            return NotImplemented
+        return self is other or (type(self) is type(other) and self.code == other.code)
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.code))
+
+    def __reduce__(self):
+        # labels are re-interned when unpickled, as codes are only valid within a process
+        return type(self), (self.label,)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(label={repr(self.label)})"
+
+    @classmethod
+    def vocabulary(cls) -> LabelVocabulary:
+        return cls._vocabulary
+
+    @classmethod
+    def from_code(cls, code: int) -> 'Label':
+        """ raises: LabelError if no label of this type has the given code """
+        try:
+            return cls._instances[code]
+        except KeyError:
+            pass
+        try:
+            return cls(cls._vocabulary.value(code))
+        except IndexError as e:
+            raise LabelError(f"No {cls.__name__} with code {code}") from e
+
+    @classmethod
+    def from_codes(cls, codes: Iterable[int]) -> List['Label']:
+        """ raises: LabelError if no label of this type has one of the given codes """
+        return [cls.from_code(code) for code in codes]
+
+    @classmethod
+    def _canonical(cls, label: T) -> Hashable:
+        """ The value that `label` is interned as (and stored as in `self.label`) """
+        return label.item() if isinstance(label, np.generic) else label
 
 
 class IntLabel(Label[int]):
@@ -17,9 +153,64 @@ class IntLabel(Label[int]):
         return f"{self.__class__.__name__}(label={self.label})"
 
 
-class ListLabel(Label[List[T]]):
-    pass  # TODO: DYCI2 implementation
+class ListLabel(Label[Tuple[T, ...]]):
+    """ Label consisting of a sequence of values (for example the pitch classes of a set of simultaneous notes).
+        The values are stored as a tuple, i.e. `ListLabel([0, 4, 7]) is ListLabel((0, 4, 7))` """
+
+    def __len__(self) -> int:
+        return len(self.label)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.label)
+
+    @classmethod
+    def _canonical(cls, label: Union[Iterable[T], np.ndarray]) -> Tuple[T, ...]:
+        if isinstance(label, np.ndarray):
+            return tuple(label.tolist())
+        try:
+            return tuple(value.item() if isinstance(value, np.generic) else value for value in label)
+        except TypeError as e:
+            raise LabelError(f"Invalid value for {cls.__name__}: {repr(label)} is not a sequence") from e
+
+
+class ChordLabel(Label[str]):
+    """ Chord given by a root (pitch class) and a quality, either as a string "<root> <quality>"
+        (e.g. `ChordLabel("db min7")`) or as a tuple (root, quality) with the root given as an int or a note name
+        (e.g. `ChordLabel((1, "min7"))`). Values are normalized to lower case and roots spelled with sharps, so both
+        examples are the same label with value "c# min7". """
+    NOTE_NAMES: List[str] = ["c", "c#", "d", "d#", "e", "f", "f#", "g", "g#", "a", "a#", "b"]
+
+    @property
+    def root(self) -> int:
+        """ Pitch class of the root (0-11) """
+        return self.NOTE_NAMES.index(self.label.split(" ", 1)[0])
+
+    @property
+    def quality(self) -> str:
+        return self.label.split(" ", 1)[1]
+
+    def transpose(self, semitones: int) -> 'ChordLabel':
+        return ChordLabel((self.root + semitones, self.quality))
 
+    @classmethod
+    def _canonical(cls, label: Union[str, Tuple[Union[int, str], str]]) -> str:
+        if isinstance(label, str):
+            parts: List[str] = label.strip().split(maxsplit=1)
+        elif isinstance(label, (tuple, list)):
+            parts: List[Any] = list(label)
+        else:
+            parts: List[Any] = []
+        if len(parts) != 2 or not isinstance(parts[1], str) or len(parts[1].strip()) == 0:
+            raise LabelError(f"Invalid value for {cls.__name__}: {repr(label)}. "
+                             f"Expected a root and a quality, for example 'c maj7'")
+        return f"{cls.NOTE_NAMES[cls._parse_root(parts[0])]} {parts[1].strip().lower()}"
 
-class ChordLabel(Label):
-    pass  # TODO: DYCI2 implementation
+    @classmethod
+    def _parse_root(cls, root: Union[int, str]) -> int:
+        """ raises: LabelError if the root is neither an int nor a note name (e.g. 'c', 'C#', 'eb') """
+        if isinstance(root, (int, np.integer)):
+            return int(root) % 12
+        root = str(root).lower()
+        if len(root) == 0 or root[0] not in cls.NOTE_NAMES or any(c not in "#b" for c in root[1:]):
+            raise LabelError(f"Invalid root for {cls.__name__}: '{root}'")
+        return (cls.NOTE_NAMES.index(root[0]) + root.count("#") - root[1:].count("b")) % 12
@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+import numpy as np
+
+from gig.io.component import Component
+from gig.io.param_utils import MaxFloat, NumericRange
+from gig.io.parameter import Parameter
 from gig.main.candidate import Candidate
-from gig.main.candidates import Candidates
+from gig.main.candidates import Candidates, MatrixCandidates
 
 
 class MergeHandler(ABC):
@@ -18,3 +23,109 @@ class MergeHandler(ABC):
     @abstractmethod
     def clear(self) -> None:
         """ """
+
+
+class GroupingMergeHandler(MergeHandler, ABC):
+    """ Base class for merge handlers that group the candidates of all prospectors by (corpus, event index, transform)
+        and combine the scores within each group with a vectorized reduction. Returns a `MatrixCandidates` with
+        one candidate per group.
+    """
+
+    def merge(self, candidates: List[Candidates]) -> Candidates:
+        concatenated: MatrixCandidates = MatrixCandidates.new_empty()
+        for c in candidates:
+            concatenated.add(c)
+        sources: np.ndarray = np.repeat(np.arange(len(candidates)), [c.size() for c in candidates])
+
+        if concatenated.is_empty():
+            return concatenated
+
+        corpus_ids: np.ndarray = concatenated.get_corpus_ids()
+        indices: np.ndarray = concatenated.get_indices()
+        transform_ids: np.ndarray = concatenated.get_transform_ids()
+        keys: np.ndarray = np.ravel_multi_index((corpus_ids, indices, transform_ids),
+                                                (len(concatenated.associated_corpora()),
+                                                 int(np.max(indices)) + 1,
+                                                 len(concatenated.transform_table())))
+        _, first, groups = np.unique(keys, return_index=True, return_inverse=True)
+
+        scores, valid = self._reduce(concatenated.get_scores(), groups.reshape(-1), first.size, sources,
+                                     len(candidates))
+        return MatrixCandidates(indices=indices[first][valid],
+                                scores=scores[valid],
+                                corpora=concatenated.associated_corpora(),
+                                corpus_ids=corpus_ids[first][valid],
+                                transforms=concatenated.transform_table(),
+                                transform_ids=transform_ids[first][valid])
+
+    @abstractmethod
+    def _reduce(self, scores: np.ndarray, groups: np.ndarray, num_groups: int, sources: np.ndarray,
+                num_sources: int) -> Tuple[np.ndarray, np.ndarray]:
+        """ Combine the `scores` belonging to each group (given by `groups`, in range [0, num_groups)).
+            `sources` gives the index of the input `Candidates` each score originates from.
+            Returns the combined score of each group and a boolean mask of the groups to keep. """
+
+    def feedback(self, event: Optional[Candidate], **kwargs) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    @staticmethod
+    def _reduce_sorted(ufunc: np.ufunc, scores: np.ndarray, groups: np.ndarray) -> np.ndarray:
+        """ Apply `ufunc` over each group (all groups must be non-empty) """
+        order: np.ndarray = np.argsort(groups, kind="stable")
+        sorted_groups: np.ndarray = groups[order]
+        starts: np.ndarray = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+        return ufunc.reduceat(scores[order], starts)
+
+
+class SumMergeHandler(GroupingMergeHandler):
+    """ Sums the scores of all candidates sharing the same event and transform """
+
+    def _reduce(self, scores: np.ndarray, groups: np.ndarray, num_groups: int, sources: np.ndarray,
+                num_sources: int) -> Tuple[np.ndarray, np.ndarray]:
+        return np.bincount(groups, weights=scores, minlength=num_groups), np.ones(num_groups, dtype=bool)
+
+
+class MaxMergeHandler(GroupingMergeHandler):
+    """ Keeps the highest score among all candidates sharing the same event and transform """
+
+    def _reduce(self, scores: np.ndarray, groups: np.ndarray, num_groups: int, sources: np.ndarray,
+                num_sources: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self._reduce_sorted(np.maximum, scores, groups), np.ones(num_groups, dtype=bool)
+
+
+class ProductMergeHandler(GroupingMergeHandler):
+    """ Multiplies the scores of all candidates sharing the same event and transform. An event that is missing from
+        one or more of the non-empty inputs is considered to have a score of zero there and is hence removed.
+    """
+
+    def _reduce(self, scores: np.ndarray, groups: np.ndarray, num_groups: int, sources: np.ndarray,
+                num_sources: int) -> Tuple[np.ndarray, np.ndarray]:
+        num_non_empty: int = np.unique(sources).size
+        num_sources_per_group: np.ndarray = np.bincount(np.unique(groups * num_sources + sources) // num_sources,
+                                                        minlength=num_groups)
+        return self._reduce_sorted(np.multiply, scores, groups), num_sources_per_group == num_non_empty
+
+
+class WeightedSumMergeHandler(GroupingMergeHandler, Component):
+    """ Sums the scores of all candidates sharing the same event and transform, where the scores of each input
+        (i.e. each prospector, in the order given to `merge`) are scaled by a weight. The weights are exposed as
+        `Parameter`s named `weight_0`, `weight_1`, etc. Inputs without a corresponding weight have weight 1.0.
+    """
+
+    def __init__(self, weights: List[float], name: str = "merge_handler", *args, **kwargs):
+        super().__init__(name=name, search_lists=True, *args, **kwargs)
+        self.weights: List[Parameter[float]] = [Parameter(f"weight_{i}", float(w), type_info=MaxFloat(),
+                                                          param_range=NumericRange(lower_bound=0.0),
+                                                          description=f"Weight of prospector {i} when merging")
+                                                for i, w in enumerate(weights)]
+
+    def _reduce(self, scores: np.ndarray, groups: np.ndarray, num_groups: int, sources: np.ndarray,
+                num_sources: int) -> Tuple[np.ndarray, np.ndarray]:
+        weights: np.ndarray = np.ones(num_sources, dtype=np.float64)
+        num_weights: int = min(num_sources, len(self.weights))
+        weights[:num_weights] = [w.value for w in self.weights[:num_weights]]
+        return (np.bincount(groups, weights=scores * weights[sources], minlength=num_groups),
+                np.ones(num_groups, dtype=bool))
@@ -0,0 +1,275 @@
+from abc import ABC, abstractmethod
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+
+class NearestNeighbourIndex(ABC):
+    """ Index for k-nearest-neighbour and radius queries over a set of (1d) vectors under euclidean distance,
+        for example over the column of a `VectorialDescriptor` in a `Corpus`. Vectors are identified by the order
+        in which they were added. All queries are batched: `queries` is an array of shape (num_queries, dim)
+        (a single vector of shape (dim,) is treated as a batch of one query).
+    """
+
+    def __init__(self, dim: int):
+        self.dim: int = dim
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """ """
+
+    @abstractmethod
+    def add(self, vectors: np.ndarray) -> None:
+        """ Insert vectors of shape (n, dim) into the index, which are given the ids len(self) ... len(self) + n - 1
+            raises: ValueError if the vectors have an invalid shape """
+
+    @abstractmethod
+    def query(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the distances and ids (both of shape (num_queries, min(k, len(self)))) of the `k` nearest
+            neighbours of each query, sorted by increasing distance """
+
+    @abstractmethod
+    def query_radius(self, queries: np.ndarray, radius: float) -> List[np.ndarray]:
+        """ Returns, for each query, the (sorted) ids of all vectors within distance `radius` """
+
+    @staticmethod
+    def create(vectors: np.ndarray,
+               min_quantized_dim: int = 2048,
+               min_quantized_size: int = 50000) -> 'NearestNeighbourIndex':
+        """ Create an index over `vectors` of shape (n, dim): brute force search (`FlatIndex`) unless the vectors
+            have at least `min_quantized_dim` dimensions and there are at least `min_quantized_size` of them, in
+            which case a (trained) `ProductQuantizedIndex` is used. Brute force search computes distances with a
+            single matrix product per batch of queries, which is faster than the table lookups of a product
+            quantized index unless the vectors have very many dimensions, and doesn't require training. """
+        vectors = np.asarray(vectors)
+        if vectors.shape[1] >= min_quantized_dim and vectors.shape[0] >= min_quantized_size:
+            quantized: ProductQuantizedIndex = ProductQuantizedIndex(vectors.shape[1])
+            quantized.add(vectors)
+            quantized.train()
+            return quantized
+        index: FlatIndex = FlatIndex(vectors.shape[1])
+        index.add(vectors)
+        return index
+
+    def _as_batch(self, vectors: np.ndarray) -> np.ndarray:
+        """ raises: ValueError if the vectors have an invalid shape """
+        vectors = np.asarray(vectors, dtype=np.float64)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"expected vectors of dimension {self.dim} (actual shape: {vectors.shape})")
+        return vectors
+
+
+class FlatIndex(NearestNeighbourIndex):
+    """ Exact (brute force) search, computing all distances of a batch of queries with a single matrix product.
+        Vectors are stored in a buffer that grows geometrically, so insertion is amortized O(1) per vector.
+    """
+    MIN_CAPACITY = 256
+    GROWTH_FACTOR = 2
+    MAX_CHUNK_SIZE = 1 << 22  # max number of distances computed at once (bounds memory usage for large batches)
+
+    def __init__(self, dim: int):
+        super().__init__(dim)
+        self._vectors: np.ndarray = np.zeros((0, dim), dtype=np.float64)
+        self._squared_norms: np.ndarray = np.zeros(0, dtype=np.float64)
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self._size]
+
+    def add(self, vectors: np.ndarray) -> None:
+        vectors = self._as_batch(vectors)
+        end: int = self._size + vectors.shape[0]
+        if end > self._vectors.shape[0]:
+            capacity: int = max(end, self.MIN_CAPACITY, self._vectors.shape[0] * self.GROWTH_FACTOR)
+            new_vectors: np.ndarray = np.zeros((capacity, self.dim), dtype=np.float64)
+            new_vectors[:self._size] = self._vectors[:self._size]
+            new_norms: np.ndarray = np.zeros(capacity, dtype=np.float64)
+            new_norms[:self._size] = self._squared_norms[:self._size]
+            self._vectors, self._squared_norms = new_vectors, new_norms
+        self._vectors[self._size:end] = vectors
+        self._squared_norms[self._size:end] = np.einsum("ij,ij->i", vectors, vectors)
+        self._size = end
+
+    def query(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = self._as_batch(queries)
+        k = min(max(k, 0), self._size)
+        distances: np.ndarray = np.zeros((queries.shape[0], k), dtype=np.float64)
+        ids: np.ndarray = np.zeros((queries.shape[0], k), dtype=np.intp)
+        if k == 0:
+            return distances, ids
+
+        for start, end in self._chunks(queries.shape[0]):
+            squared: np.ndarray = self.squared_distances(queries[start:end])
+            nearest: np.ndarray = np.argpartition(squared, k - 1, axis=1)[:, :k] if k < self._size \
+                else np.broadcast_to(np.arange(self._size), squared.shape)
+            nearest_distances: np.ndarray = np.take_along_axis(squared, nearest, axis=1)
+            order: np.ndarray = np.argsort(nearest_distances, axis=1, kind="stable")
+            ids[start:end] = np.take_along_axis(nearest, order, axis=1)
+            distances[start:end] = np.sqrt(np.take_along_axis(nearest_distances, order, axis=1))
+        return distances, ids
+
+    def query_radius(self, queries: np.ndarray, radius: float) -> List[np.ndarray]:
+        queries = self._as_batch(queries)
+        results: List[np.ndarray] = []
+        for start, end in self._chunks(queries.shape[0]):
+            within: np.ndarray = self.squared_distances(queries[start:end]) <= radius * radius
+            results.extend(np.flatnonzero(row) for row in within)
+        return results
+
+    def squared_distances(self, queries: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """ Squared distances between each query and all vectors (shape (num_queries, len(self))), or if `ids` of
+            shape (num_queries, m) are given, between each query and its own subset of vectors. """
+        if ids is not None:
+            differences: np.ndarray = self._vectors[ids] - queries[:, np.newaxis, :]
+            return np.einsum("ijk,ijk->ij", differences, differences)
+        query_norms: np.ndarray = np.einsum("ij,ij->i", queries, queries)
+        squared: np.ndarray = (query_norms[:, np.newaxis] + self._squared_norms[np.newaxis, :self._size]
+                               - 2.0 * queries @ self._vectors[:self._size].T)
+        return np.maximum(squared, 0.0, out=squared)
+
+    def _chunks(self, num_queries: int) -> List[Tuple[int, int]]:
+        chunk_size: int = max(1, self.MAX_CHUNK_SIZE // max(self._size, 1))
+        return [(start, min(start + chunk_size, num_queries)) for start in range(0, num_queries, chunk_size)]
+
+
+class ProductQuantizedIndex(NearestNeighbourIndex):
+    """ Product quantized index: each vector is split into `num_subspaces` sub-vectors, each encoded as the id of its
+        nearest centroid in a per-subspace codebook (trained with k-means). Distances are approximated from small
+        per-query lookup tables (asymmetric distance computation), which reduces the cost per vector from `dim`
+        floating point operations to `num_subspaces` table lookups.
+
+        k-NN queries are re-ranked with exact distances over a shortlist of `rerank_factor * k` candidates.
+        Radius queries are exact: the reconstruction error of each vector bounds the approximation error, so only
+        candidates that may be within the radius are verified with exact distances.
+
+        The codebooks are trained explicitly with `train`, until which queries fall back to brute force search.
+        Vectors added after training are encoded with the existing codebooks (call `train` again to re-train on all
+        vectors).
+    """
+
+    def __init__(self,
+                 dim: int,
+                 num_subspaces: int = 8,
+                 num_centroids: int = 256,
+                 max_train_size: int = 32768,
+                 rerank_factor: int = 8,
+                 num_iterations: int = 12,
+                 seed: Optional[int] = 0):
+        super().__init__(dim)
+        self.num_subspaces: int = min(num_subspaces, dim)
+        self.num_centroids: int = min(num_centroids, 256)
+        self.max_train_size: int = max_train_size
+        self.rerank_factor: int = rerank_factor
+        self.num_iterations: int = num_iterations
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+
+        self._flat: FlatIndex = FlatIndex(dim)
+        self._subspaces: List[np.ndarray] = np.array_split(np.arange(dim), self.num_subspaces)
+        self._codebooks: Optional[List[np.ndarray]] = None
+        self._codes: np.ndarray = np.zeros((0, self.num_subspaces), dtype=np.uint8)
+        self._errors: np.ndarray = np.zeros(0, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self._flat)
+
+    @property
+    def is_trained(self) -> bool:
+        return self._codebooks is not None
+
+    def add(self, vectors: np.ndarray) -> None:
+        vectors = self._as_batch(vectors)
+        self._flat.add(vectors)
+        if self.is_trained:
+            codes, errors = self._encode(vectors)
+            self._codes = np.concatenate((self._codes, codes))
+            self._errors = np.concatenate((self._errors, errors))
+
+    def train(self) -> None:
+        """ Train the codebooks on (a sample of at most `max_train_size` of) all vectors and re-encode all vectors
+            raises: ValueError if the index is empty """
+        vectors: np.ndarray = self._flat.vectors()
+        if vectors.shape[0] == 0:
+            raise ValueError("cannot train a product quantized index without any vectors")
+        if vectors.shape[0] > self.max_train_size:
+            sample: np.ndarray = vectors[self._rng.choice(vectors.shape[0], self.max_train_size, replace=False)]
+        else:
+            sample: np.ndarray = vectors
+        self._codebooks = [kmeans(sample[:, dims], min(self.num_centroids, sample.shape[0]),
+                                  self.num_iterations, self._rng)
+                           for dims in self._subspaces]
+        self._codes, self._errors = self._encode(vectors)
+
+    def query(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = self._as_batch(queries)
+        shortlist_size: int = min(len(self), max(k, 0) * self.rerank_factor)
+        if not self.is_trained or shortlist_size >= len(self):
+            return self._flat.query(queries, k)
+
+        k = min(max(k, 0), len(self))
+        approximate: np.ndarray = self._approximate_squared_distances(queries)
+        shortlist: np.ndarray = np.argpartition(approximate, shortlist_size - 1, axis=1)[:, :shortlist_size]
+        exact: np.ndarray = self._flat.squared_distances(queries, shortlist)
+        nearest: np.ndarray = np.argpartition(exact, k - 1, axis=1)[:, :k] if k < shortlist_size \
+            else np.broadcast_to(np.arange(shortlist_size), exact.shape)
+        nearest_distances: np.ndarray = np.take_along_axis(exact, nearest, axis=1)
+        order: np.ndarray = np.argsort(nearest_distances, axis=1, kind="stable")
+        ids: np.ndarray = np.take_along_axis(np.take_along_axis(shortlist, nearest, axis=1), order, axis=1)
+        return np.sqrt(np.take_along_axis(nearest_distances, order, axis=1)), ids
+
+    def query_radius(self, queries: np.ndarray, radius: float) -> List[np.ndarray]:
+        queries = self._as_batch(queries)
+        if not self.is_trained:
+            return self._flat.query_radius(queries, radius)
+
+        # |d(q, x) - d(q, q(x))| <= error(x), hence d(q, x) <= radius requires d(q, q(x)) - error(x) <= radius
+        approximate: np.ndarray = np.sqrt(self._approximate_squared_distances(queries))
+        results: List[np.ndarray] = []
+        for query, distances in zip(queries, approximate):
+            candidates: np.ndarray = np.flatnonzero(distances - self._errors <= radius)
+            exact: np.ndarray = self._flat.squared_distances(query[np.newaxis, :], candidates[np.newaxis, :])[0]
+            results.append(candidates[exact <= radius * radius])
+        return results
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the codes of each vector and the euclidean norm of their reconstruction errors """
+        codes: np.ndarray = np.zeros((vectors.shape[0], self.num_subspaces), dtype=np.uint8)
+        squared_errors: np.ndarray = np.zeros(vectors.shape[0], dtype=np.float64)
+        for m, (dims, codebook) in enumerate(zip(self._subspaces, self._codebooks)):
+            squared: np.ndarray = pairwise_squared_distances(vectors[:, dims], codebook)
+            codes[:, m] = np.argmin(squared, axis=1)
+            squared_errors += np.maximum(squared[np.arange(vectors.shape[0]), codes[:, m]], 0.0)
+        return codes, np.sqrt(squared_errors)
+
+    def _approximate_squared_distances(self, queries: np.ndarray) -> np.ndarray:
+        """ Squared distances between each query and the reconstruction of each vector, shape (num_queries, n) """
+        distances: np.ndarray = np.zeros((queries.shape[0], len(self)), dtype=np.float64)
+        for m, (dims, codebook) in enumerate(zip(self._subspaces, self._codebooks)):
+            table: np.ndarray = pairwise_squared_distances(queries[:, dims], codebook)  # (num_queries, num_centroids)
+            distances += table[:, self._codes[:, m]]
+        return distances
+
+
+def kmeans(data: np.ndarray, num_clusters: int, num_iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """ Lloyd's k-means, initialized with randomly sampled data points. Returns centroids of shape (num_clusters, d).
+        Centroids of clusters that become empty are left at their previous position. """
+    centroids: np.ndarray = data[rng.choice(data.shape[0], num_clusters, replace=False)].astype(np.float64)
+    for _ in range(num_iterations):
+        assignments: np.ndarray = np.argmin(pairwise_squared_distances(data, centroids), axis=1)
+        counts: np.ndarray = np.bincount(assignments, minlength=num_clusters)
+        sums: np.ndarray = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+        non_empty: np.ndarray = counts > 0
+        centroids[non_empty] = sums[non_empty] / counts[non_empty, np.newaxis]
+    return centroids
+
+
+def pairwise_squared_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """ Pairwise squared euclidean distances between the rows of `a` and `b` """
+    squared: np.ndarray = (np.einsum("ij,ij->i", a, a)[:, np.newaxis] + np.einsum("ij,ij->i", b, b)[np.newaxis, :]
+                           - 2.0 * a @ b.T)
+    return np.maximum(squared, 0.0, out=squared)
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, List, Tuple, Union, Type
+
+import numpy as np
 
 from gig.io.parsable import Parsable
 from gig.main.candidate import Candidate
@@ -19,3 +21,81 @@ class PostFilter(Parsable, ABC):
     @abstractmethod
     def clear(self) -> None:
         """ """
+
+
+class FusablePostFilter(PostFilter, ABC):
+    """ A `PostFilter` expressed as a mask and/or score factors over the candidates rather than as a new `Candidates`,
+        allowing a `PostFilterChain` to fuse it with other filters without copying the candidates.
+
+        Note: the mask and factors of a candidate must only depend on the candidate itself (not on which other
+        candidates are present), as the filter may be evaluated on candidates that previous filters in a chain have
+        masked out but not yet removed. Filters that don't fulfil this should be implemented as a `PostFilter`.
+    """
+
+    @abstractmethod
+    def evaluate(self, candidates: Candidates) -> Tuple[Optional[np.ndarray], Optional[Union[float, np.ndarray]]]:
+        """ Returns a boolean mask of the candidates to keep (or None to keep all) and the factors to scale the
+            scores of the candidates with (or None to leave scores unchanged). """
+
+    def filter(self, candidates: Candidates) -> Candidates:
+        mask, factors = self.evaluate(candidates)
+        filtered: Candidates = candidates.shallow_copy()
+        if factors is not None:
+            filtered.scale(factors)
+        if mask is not None:
+            filtered.keep(mask)
+        return filtered
+
+
+class PostFilterChain(PostFilter):
+    """ Runs a sequence of `PostFilter`s on a single copy of the candidates.
+
+        Consecutive `FusablePostFilter`s are combined into a single mask (and applied score factors), which is only
+        compacted once, before running a non-fusable filter or at the end of the chain. The chain stops as soon as
+        no candidates remain.
+    """
+
+    def __init__(self, filters: Optional[List[PostFilter]] = None):
+        self.filters: List[PostFilter] = filters if filters is not None else []
+
+    @classmethod
+    def from_names(cls, names: Union[str, List[str]], base_class: Type[PostFilter] = PostFilter) -> 'PostFilterChain':
+        """ Create a chain of (default-constructed) filters from a list of class names or a string of names separated
+            by whitespace or commas, parsed by `base_class.from_string`.
+            raises: InputError if a name doesn't correspond to a `PostFilter` """
+        if isinstance(names, str):
+            names = names.replace(",", " ").split()
+        return cls([base_class.from_string(name)() for name in names])
+
+    def filter(self, candidates: Candidates) -> Candidates:
+        filtered: Candidates = candidates.shallow_copy()
+        keep: Optional[np.ndarray] = None
+        for post_filter in self.filters:
+            if filtered.is_empty():
+                break
+
+            if isinstance(post_filter, FusablePostFilter):
+                mask, factors = post_filter.evaluate(filtered)
+                if factors is not None:
+                    filtered.scale(factors)
+                if mask is not None:
+                    keep = filtered.as_mask(mask) if keep is None else keep & filtered.as_mask(mask)
+                    if not np.any(keep):
+                        break
+            else:
+                if keep is not None:
+                    filtered.keep(keep)
+                    keep = None
+                filtered = post_filter.filter(filtered)
+
+        if keep is not None:
+            filtered.keep(keep)
+        return filtered
+
+    def feedback(self, candidate: Optional[Candidate], **kwargs) -> None:
+        for post_filter in self.filters:
+            post_filter.feedback(candidate, **kwargs)
+
+    def clear(self) -> None:
+        for post_filter in self.filters:
+            post_filter.clear()
@@ -1,9 +1,10 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Optional, TypeVar, Generic, List, Union
+from typing import Optional, TypeVar, Generic, List, Union, Type, Set
 
+from gig.main.descriptor import Descriptor
 from gig.main.exceptions import QueryError
-from gig.main.influence import Influence
+from gig.main.influence import Influence, DescriptorInfluence
 from gig.stubs.pathspec import PathSpec
 from gig.stubs.timepoint import Timepoint
 
@@ -54,6 +55,23 @@ class InfluenceQuery(Query[List[Influence]]):
     def __len__(self) -> int:
         return len(self.content)
 
+    def descriptor_types(self) -> Set[Type[Descriptor]]:
+        """ The distinct descriptor types of all `DescriptorInfluence`s in the query """
+        return {type(influence.value) for influence in self.content if isinstance(influence, DescriptorInfluence)}
+
+    def compatible_with(self, descriptor_type: Type[Descriptor]) -> bool:
+        """ Whether all `DescriptorInfluence`s in the query are compatible with `descriptor_type` (see
+            `Descriptor.compatible_with`). Influences of other types are not checked. """
+        return self.descriptor_types().issubset(descriptor_type.compatible_types())
+
+    def validate(self, descriptor_type: Type[Descriptor]) -> None:
+        """ raises: QueryError if any `DescriptorInfluence` in the query isn't compatible with `descriptor_type` """
+        incompatible: List[Type[Descriptor]] = descriptor_type.incompatible_types(self.descriptor_types())
+        if len(incompatible) > 0:
+            raise QueryError(f"{self.__class__.__name__} contains descriptors of type(s) "
+                             f"{', '.join(sorted(t.__name__ for t in incompatible))}, "
+                             f"which are not compatible with {descriptor_type.__name__}")
+
 # class FeatureQuery(InfluenceQuery[Feature]):
 #     pass
 #
@@ -0,0 +1,50 @@
+import numpy as np
+
+from gig.main.candidate import Candidate
+from gig.main.candidates import ListCandidates, MatrixCandidates
+from gig.main.corpus import GenericCorpus
+from gig.main.corpus_event import GenericCorpusEvent
+from gig.main.descriptor import MidiPitch, Chroma12
+from gig.main.label import IntLabel
+
+
+def test_list_candidates_with_non_positional_indices():
+    corpus = GenericCorpus([GenericCorpusEvent(data=None, index=10 * i + 1, descriptors={MidiPitch: MidiPitch(60 + i)},
+                                               labels={IntLabel: IntLabel(i)}) for i in range(3)])
+    candidates = ListCandidates([Candidate(e, 1.0, None, corpus) for e in reversed(corpus.events)],
+                                associated_corpus=corpus)
+    assert candidates.get_feature_array(MidiPitch).tolist() == [62, 61, 60]
+    assert candidates.get_label_codes(IntLabel).tolist() == [IntLabel(i).code for i in (2, 1, 0)]
+
+
+def test_list_candidates_with_positional_indices():
+    corpus = GenericCorpus([GenericCorpusEvent(data=None, index=i, descriptors={MidiPitch: MidiPitch(60 + i)},
+                                               labels={}) for i in range(3)])
+    candidates = ListCandidates([Candidate(corpus.events[i], 1.0, None, corpus) for i in (2, 0)],
+                                associated_corpus=corpus)
+    assert np.array_equal(candidates.get_feature_array(MidiPitch), [62, 60])
+
+
+def test_matrix_candidates_remove_empty_indices():
+    corpus = GenericCorpus([GenericCorpusEvent(data=None, index=i, descriptors={MidiPitch: MidiPitch(60 + i)},
+                                               labels={}) for i in range(3)])
+    candidates = MatrixCandidates(np.arange(3), np.ones(3), [corpus])
+    candidates.get_feature_array(MidiPitch)
+    candidates.remove([])
+    candidates.remove(np.array([]))
+    assert candidates.size() == 3
+    candidates.remove(np.array([1.0]))
+    assert candidates.get_feature_array(MidiPitch).tolist() == [60, 62]
+
+
+def test_matrix_candidates_add_empty_batch_with_cached_vector_feature():
+    rng = np.random.default_rng(0)
+    corpora = [GenericCorpus([GenericCorpusEvent(data=None, index=i, descriptors={Chroma12: Chroma12(rng.random(12))},
+                                                 labels={}) for i in range(3)]) for _ in range(2)]
+    candidates = MatrixCandidates(np.array([0, 1, 2]), np.ones(3), corpora, corpus_ids=np.array([0, 1, 1]))
+    assert candidates.get_feature_array(Chroma12).shape == (3, 12)
+    candidates.add([])
+    candidates.add(MatrixCandidates(np.zeros(0), np.zeros(0), corpora, corpus_ids=np.zeros(0)))
+    assert candidates.get_feature_array(Chroma12).shape == (3, 12)
+    candidates.add([Candidate(corpora[1].events[0], 1.0, None, corpora[1])])
+    assert np.array_equal(candidates.get_feature_array(Chroma12)[-1], corpora[1].events[0].descriptors[Chroma12].value)
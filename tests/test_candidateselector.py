@@ -0,0 +1,50 @@
+import numpy as np
+
+from gig.main.candidates import MatrixCandidates
+from gig.main.candidateselector import WeightedRandomSelector
+from gig.main.corpus import GenericCorpus
+from gig.main.corpus_event import GenericCorpusEvent
+from gig.main.descriptor import MidiPitch
+
+
+def make_candidates(scores: list) -> MatrixCandidates:
+    corpus = GenericCorpus([GenericCorpusEvent(data=None, index=i, descriptors={MidiPitch: MidiPitch(60 + i)},
+                                               labels={}) for i in range(len(scores))])
+    return MatrixCandidates(np.arange(len(scores)), np.array(scores, dtype=float), [corpus])
+
+
+def frequencies(selector: WeightedRandomSelector, candidates: MatrixCandidates, num_draws: int) -> np.ndarray:
+    drawn = [c.event.index for c in selector.decide_multiple(candidates, num_draws)]
+    return np.bincount(drawn, minlength=candidates.size()) / num_draws
+
+
+def test_selection_is_proportional_to_score():
+    candidates = make_candidates([1.0, 0.0, 3.0, -2.0, 4.0])
+    observed = frequencies(WeightedRandomSelector(seed=0), candidates, 40000)
+    assert np.allclose(observed, [0.125, 0.0, 0.375, 0.0, 0.5], atol=0.01)
+
+
+def test_temperature_and_top_p():
+    candidates = make_candidates([1.0, 2.0, 3.0, 4.0])
+    assert np.array_equal(frequencies(WeightedRandomSelector(temperature=0.0, seed=0), candidates, 100), [0, 0, 0, 1])
+
+    observed = frequencies(WeightedRandomSelector(temperature=0.5, seed=0), candidates, 40000)
+    assert np.allclose(observed, np.array([1.0, 4.0, 9.0, 16.0]) / 30.0, atol=0.01)
+
+    observed = frequencies(WeightedRandomSelector(top_p=0.6, seed=0), candidates, 40000)
+    assert np.allclose(observed, [0.0, 0.0, 3 / 7, 4 / 7], atol=0.01)
+
+
+def test_seed_is_reproducible():
+    candidates = make_candidates(list(np.linspace(0.1, 1.0, 10)))
+    selector = WeightedRandomSelector(seed=3)
+    first = [c.event.index for c in selector.decide_multiple(candidates, 20)]
+    selector.seed(3)
+    assert [c.event.index for c in selector.decide_multiple(candidates, 20)] == first
+
+
+def test_nothing_to_select():
+    selector = WeightedRandomSelector(seed=0)
+    assert selector.decide(make_candidates([0.0, -1.0])) is None
+    assert selector.decide(MatrixCandidates.new_empty()) is None
+    assert selector.decide_multiple(make_candidates([1.0]), 0) == []
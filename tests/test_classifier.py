@@ -0,0 +1,116 @@
+from typing import Type
+
+import numpy as np
+import pytest
+
+from gig.main.classifier import CachedClassifier, Classifier, IdentityClassifier, KMeansClassifier, PitchClassClassifier
+from gig.main.corpus import GenericCorpus
+from gig.main.corpus_event import GenericCorpusEvent
+from gig.main.descriptor import Chroma12, Descriptor, MidiPitch
+from gig.main.exceptions import ClassificationError
+from gig.main.label import IntLabel, Label
+
+
+class OctaveClassifier(Classifier):
+    """ Classifier without a vectorized `classify_array` """
+
+    def classify(self, descriptor: Descriptor) -> Label:
+        return IntLabel(descriptor.value // 12)
+
+    def clear(self) -> None:
+        pass
+
+    def compatible_with(self, descriptor_type: Type[Descriptor]) -> bool:
+        return descriptor_type is MidiPitch
+
+
+def make_corpus(n: int = 30) -> GenericCorpus:
+    rng = np.random.default_rng(0)
+    return GenericCorpus([GenericCorpusEvent(data=None, index=i,
+                                             descriptors={MidiPitch: MidiPitch(int(rng.integers(30, 90))),
+                                                          Chroma12: Chroma12(rng.random(12))},
+                                             labels={}) for i in range(n)])
+
+
+def trained_kmeans(corpus: GenericCorpus) -> KMeansClassifier:
+    classifier = KMeansClassifier(num_clusters=4, batch_size=16, seed=0)
+    classifier.pre_process(values=corpus.get_descriptors_of_type(Chroma12, as_array=True))
+    return classifier
+
+
+@pytest.mark.parametrize("classifier, descriptor_type", [(IdentityClassifier(), MidiPitch),
+                                                         (PitchClassClassifier(), MidiPitch),
+                                                         (OctaveClassifier(), MidiPitch),
+                                                         (None, Chroma12)])
+def test_array_classification_matches_classify(classifier, descriptor_type):
+    corpus = make_corpus()
+    classifier = classifier if classifier is not None else trained_kmeans(corpus)
+    descriptors = corpus.get_descriptors_of_type(descriptor_type)
+    expected = [classifier.classify(d) for d in descriptors]
+
+    assert classifier.classify_corpus(corpus, descriptor_type).tolist() == [label.label for label in expected]
+    assert classifier.classify_multiple(descriptors) == expected
+    assert classifier.classify_multiple(corpus.get_descriptor_array(descriptor_type)) == expected
+    assert classifier.classify_multiple([]) == []
+
+
+def test_array_classification_errors():
+    corpus = make_corpus()
+    with pytest.raises(ClassificationError):
+        PitchClassClassifier().classify_corpus(corpus, Chroma12)
+    with pytest.raises(ClassificationError):
+        IdentityClassifier().classify_array(np.array([1.5, 2.5]))
+    with pytest.raises(ClassificationError):
+        OctaveClassifier().classify_array(np.array([60, 61]))
+    with pytest.raises(ClassificationError):
+        KMeansClassifier().classify_array(np.zeros((2, 12)))
+
+
+def test_kmeans_warm_start_adapts_to_new_values():
+    rng = np.random.default_rng(0)
+    classifier = KMeansClassifier(num_clusters=2, batch_size=64, max_iterations=50, tolerance=0.0, seed=0)
+    centers = np.array([[0.0, 0.0], [10.0, 10.0]])
+    classifier.pre_process(values=np.concatenate([c + rng.normal(0, 0.1, (500, 2)) for c in centers]))
+    shifted = centers + 5.0
+    classifier.pre_process(values=np.concatenate([c + rng.normal(0, 0.1, (500, 2)) for c in shifted]))
+    centroids = classifier.centroids[np.argsort(classifier.centroids[:, 0])]
+    assert np.allclose(centroids, shifted, atol=0.5)
+
+
+class CountingClassifier(PitchClassClassifier):
+    def __init__(self):
+        self.num_calls: int = 0
+
+    def classify(self, descriptor: Descriptor) -> Label:
+        self.num_calls += 1
+        return super().classify(descriptor)
+
+
+def test_cached_classifier_hits_misses_and_eviction():
+    classifier = CountingClassifier()
+    cached = CachedClassifier(classifier, max_size=2)
+    for pitch in [60, 61, 60, 62, 61, 60]:
+        assert cached.classify(MidiPitch(pitch)) == IntLabel(pitch % 12)
+    # 61 is evicted by 62 (60 was used more recently), and 60 by 61
+    assert (cached.hits, cached.misses, classifier.num_calls) == (1, 5, 5)
+    assert cached.hit_rate == pytest.approx(1 / 6)
+
+
+def test_cached_classifier_with_vector_values():
+    classifier = trained_kmeans(make_corpus())
+    cached = CachedClassifier(classifier)
+    values = np.random.default_rng(1).random((5, 12))
+    for value in np.concatenate([values, values]):
+        assert cached.classify(Chroma12(value)) == classifier.classify(Chroma12(value))
+    assert (cached.hits, cached.misses) == (5, 5)
+
+
+def test_cached_classifier_invalidated_on_pre_process():
+    corpus = make_corpus()
+    classifier = trained_kmeans(corpus)
+    cached = CachedClassifier(classifier)
+    descriptor = corpus.events[0].descriptors[Chroma12]
+    cached.classify(descriptor)
+    cached.pre_process(values=np.random.default_rng(2).random((50, 12)), warm_start=False)
+    assert cached.classify(descriptor) == classifier.classify(descriptor)
+    assert cached.misses == 2
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from gig.main.corpus import GenericCorpus
+from gig.main.corpus_event import GenericCorpusEvent
+from gig.main.descriptor import MidiPitch, Chroma12
+from gig.main.exceptions import CorpusError
+from gig.main.label import ChordLabel, IntLabel
+
+
+def test_extend_arrays_canonicalizes_labels():
+    corpus = GenericCorpus([GenericCorpusEvent(data=None, index=0, descriptors={MidiPitch: MidiPitch(60)},
+                                               labels={ChordLabel: ChordLabel("c# min7")})])
+    corpus.extend_arrays(descriptors={MidiPitch: np.array([61, 62])}, labels={ChordLabel: ["Db min7", "C#  MIN7"]},
+                         data=[None, None])
+    assert corpus.indices_with_label(ChordLabel("db min7")).tolist() == [0, 1, 2]
+    assert "Db min7" not in ChordLabel.vocabulary()
+    assert corpus.get_label_codes(ChordLabel).tolist() == [ChordLabel("c# min7").code] * 3
+
+
+def test_version_counts_rebuilt_rows():
+    corpus = GenericCorpus([GenericCorpusEvent(data=None, index=i, descriptors={MidiPitch: MidiPitch(60 + i)},
+                                               labels={}) for i in range(10)])
+    version: int = corpus.version
+    del corpus.events[4:]
+    assert corpus.version == version + 4
+
+
+def make_corpus(n: int = 5) -> GenericCorpus:
+    rng = np.random.default_rng(0)
+    return GenericCorpus([GenericCorpusEvent(data=None, index=i,
+                                             descriptors={MidiPitch: MidiPitch(60 + i),
+                                                          Chroma12: Chroma12(rng.random(12))},
+                                             labels={IntLabel: IntLabel(i)}) for i in range(n)])
+
+
+def test_extend_rejects_unknown_descriptors():
+    corpus = make_corpus()
+    events = [GenericCorpusEvent(data=None, index=5, descriptors={MidiPitch: MidiPitch(1)}, labels={}),
+              GenericCorpusEvent(data=None, index=6, descriptors={"pitch": MidiPitch(1)}, labels={})]
+    with pytest.raises(CorpusError):
+        corpus.extend(events)
+    assert len(corpus) == 5 and corpus.version == 0
+
+
+@pytest.mark.parametrize("descriptors, labels", [
+    ({MidiPitch: np.arange(3), Chroma12: np.zeros((2, 12))}, {IntLabel: [1, 2, 3]}),  # different numbers of rows
+    ({MidiPitch: np.array([1.5, 2.5]), Chroma12: np.zeros((2, 12))}, {IntLabel: [1, 2]}),  # invalid values
+    ({MidiPitch: np.arange(2)}, {IntLabel: [1, 2]}),  # missing descriptor
+    ({MidiPitch: np.arange(2), Chroma12: np.zeros((2, 12))}, {}),  # missing label
+])
+def test_extend_arrays_rejects_invalid_batches(descriptors, labels):
+    corpus = make_corpus()
+    chroma: np.ndarray = corpus.get_descriptors_of_type(Chroma12, as_array=True).copy()
+    with pytest.raises(CorpusError):
+        corpus.extend_arrays(descriptors, labels=labels, data=[None] * len(descriptors[MidiPitch]))
+    assert len(corpus) == 5
+    assert np.array_equal(corpus.get_descriptors_of_type(Chroma12, as_array=True), chroma)
+    assert corpus.indices_with_label(IntLabel(1)).tolist() == [1]
+
+
+def test_extend_arrays_allow_missing():
+    corpus = make_corpus()
+    corpus.extend_arrays({MidiPitch: np.arange(2), Chroma12: np.zeros((2, 12))}, allow_missing=True, data=[None] * 2)
+    assert IntLabel not in corpus.events[-1].labels
+    assert corpus.get_label_codes(IntLabel).tolist()[-2:] == [-1, -1]
+    assert corpus.nearest_neighbour_index(Chroma12).query_radius(np.zeros(12), 0.0)[0].tolist() == [5, 6]
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from gig.main.corpus import GenericCorpus
+from gig.main.corpus_builder import CorpusBuilder
+from gig.main.corpus_event import GenericCorpusEvent
+from gig.main.corpus_format import BinaryCorpusFormat
+from gig.main.descriptor import MidiPitch
+from gig.main.exceptions import CorpusError
+from gig.main.label import ChordLabel
+
+CHORDS = ["c maj", "db min7", "f#  sus4", "g 7"]
+
+
+def chord_events(n: int):
+    for i in range(n):
+        yield GenericCorpusEvent(data=None, index=i, descriptors={MidiPitch: MidiPitch(40 + i % 12)},
+                                 labels={ChordLabel: ChordLabel(CHORDS[i % len(CHORDS)])})
+
+
+def test_labels_of_different_lengths_across_chunks():
+    # first chunk only has short labels, so a fixed-width string column would truncate later ones
+    corpus = CorpusBuilder(GenericCorpus, chunk_size=1).consume(chord_events(8)).build()
+    for event in corpus.events:
+        assert event.labels[ChordLabel] is ChordLabel(CHORDS[event.index % len(CHORDS)])
+    assert corpus.indices_with_label(ChordLabel("c# min7")).tolist() == [1, 5]
+
+
+def test_export_labels_of_different_lengths(tmp_path):
+    CorpusBuilder(GenericCorpus, chunk_size=3, keep_events=False).consume(chord_events(8)).export(str(tmp_path / "c"))
+    events = BinaryCorpusFormat.load(str(tmp_path / "c")).events
+    assert [e.labels[ChordLabel].label for e in events] == [ChordLabel(c).label for c in CHORDS * 2]
+
+
+def test_label_first_added_in_later_chunk():
+    events = list(chord_events(4))
+    del events[0].labels[ChordLabel]
+    corpus = CorpusBuilder(GenericCorpus, chunk_size=1).consume(events).build()
+    assert ChordLabel not in corpus.events[0].labels
+    assert np.array_equal(corpus.indices_with_label(ChordLabel("g 7")), [3])
+
+
+def test_builder_cannot_be_used_after_build(tmp_path):
+    builder = CorpusBuilder(GenericCorpus, chunk_size=2).consume(chord_events(4))
+    corpus = builder.build()
+    with pytest.raises(CorpusError):
+        builder.consume(chord_events(2))
+    with pytest.raises(CorpusError):
+        builder.build()
+    with pytest.raises(CorpusError):
+        builder.export(str(tmp_path / "c"))
+    assert len(corpus) == 4 and len(corpus.get_label_codes(ChordLabel)) == 4
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+
+from gig.main.corpus import GenericCorpus
+from gig.main.corpus_cache import CorpusCache
+from gig.main.corpus_event import GenericCorpusEvent
+from gig.main.descriptor import Chroma12
+
+
+def make_corpus(n: int) -> GenericCorpus:
+    rng = np.random.default_rng(n)
+    return GenericCorpus([GenericCorpusEvent(data=None, index=i, descriptors={Chroma12: Chroma12(rng.random(12))},
+                                             labels={}) for i in range(n)])
+
+
+def write_sources(tmp_path, *contents: str):
+    paths = []
+    for i, content in enumerate(contents):
+        paths.append(str(tmp_path / f"source_{i}.txt"))
+        with open(paths[-1], "w") as f:
+            f.write(content)
+    return paths
+
+
+def test_key_depends_on_content_order_and_config(tmp_path):
+    cache = CorpusCache(str(tmp_path / "cache"))
+    a, b = write_sources(tmp_path, "a", "b")
+    key = cache.key([a, b], {"n": 1})
+    assert cache.key([a, b], {"n": 1}) == key
+    assert cache.key([b, a], {"n": 1}) != key
+    assert cache.key([a, b], {"n": 2}) != key
+    with open(a, "w") as f:
+        f.write("changed")
+    assert cache.key([a, b], {"n": 1}) != key
+
+
+def test_hit_and_miss(tmp_path):
+    cache = CorpusCache(str(tmp_path / "cache"))
+    assert cache.get("missing", GenericCorpus.load) is None
+    corpus = make_corpus(10)
+    cache.put("key", lambda path: corpus.export(path, overwrite=True))
+    loaded = cache.get("key", GenericCorpus.load)
+    assert np.array_equal(loaded.get_descriptors_of_type(Chroma12, as_array=True),
+                          corpus.get_descriptors_of_type(Chroma12, as_array=True))
+
+
+def test_invalid_entries_are_removed(tmp_path):
+    cache = CorpusCache(str(tmp_path / "cache"))
+    os.makedirs(cache.path("key"))
+    assert cache.get("key", GenericCorpus.load) is None
+    assert not os.path.exists(cache.path("key"))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = CorpusCache(str(tmp_path / "cache"), max_size=None)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, lambda path: make_corpus(1000).export(path, overwrite=True))
+        os.utime(cache.path(key), (i, i))
+    cache.get("a", GenericCorpus.load)  # most recently used
+    sizes = {key: size for key, size, _ in cache.entries()}
+    cache.max_size = sizes["a"] + sizes["c"]
+    cache.evict()
+    assert sorted(key for key, _, _ in cache.entries()) == ["a", "c"]
@@ -0,0 +1,82 @@
+import json
+import os
+from typing import List
+
+import numpy as np
+import pytest
+
+from gig.main.corpus import GenericCorpus
+from gig.main.corpus_builder import CorpusBuilder
+from gig.main.corpus_event import GenericCorpusEvent, MidiEvent
+from gig.main.corpus_format import BinaryCorpusFormat
+from gig.main.descriptor import MidiPitch, Chroma12
+from gig.main.exceptions import CorpusError
+from gig.main.label import ChordLabel, IntLabel
+from gig.stubs.note import Note
+
+
+def make_corpus(n: int = 20) -> GenericCorpus:
+    rng = np.random.default_rng(0)
+    return GenericCorpus([GenericCorpusEvent(data={"i": i}, index=i,
+                                             descriptors={MidiPitch: MidiPitch(40 + i),
+                                                          Chroma12: Chroma12(rng.random(12))},
+                                             labels={IntLabel: IntLabel(i % 3),
+                                                     **({ChordLabel: ChordLabel("Db min7")} if i % 2 else {})})
+                          for i in range(n)])
+
+
+@pytest.mark.parametrize("lazy_events", [False, True])
+def test_export_load_round_trip(tmp_path, lazy_events):
+    corpus = make_corpus()
+    path = str(tmp_path / "corpus")
+    corpus.export(path)
+    loaded = GenericCorpus.load(path, lazy_events=lazy_events)
+    assert len(loaded) == len(corpus)
+    for original, event in zip(corpus.events, loaded.events):
+        assert event.index == original.index
+        assert event.data == original.data
+        assert event.labels == original.labels
+        assert event.descriptors[MidiPitch].value == original.descriptors[MidiPitch].value
+        assert np.array_equal(event.descriptors[Chroma12].value, original.descriptors[Chroma12].value)
+    assert np.array_equal(loaded.get_descriptors_of_type(Chroma12, as_array=True),
+                          corpus.get_descriptors_of_type(Chroma12, as_array=True))
+    assert loaded.indices_with_label(ChordLabel("c# min7")).tolist() == list(range(1, 20, 2))
+
+
+@pytest.mark.parametrize("entry, name", [("event_type", "builtins:print"),
+                                         ("labels", "builtins:print"),
+                                         ("labels", "gig.main.descriptor:MidiPitch"),
+                                         ("descriptors", "os:system")])
+def test_load_rejects_types_of_other_classes(tmp_path, capsys, entry, name):
+    path = str(tmp_path / "corpus")
+    make_corpus().export(path)
+    manifest_path = os.path.join(path, BinaryCorpusFormat.MANIFEST)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if entry == "event_type":
+        manifest[entry] = name
+    else:
+        manifest[entry][0]["type"] = name
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(CorpusError):
+        GenericCorpus.load(path)
+    assert capsys.readouterr().out == ""
+
+
+def midi_events(notes: List[Note]) -> List[MidiEvent]:
+    return [MidiEvent(index=i, descriptors={MidiPitch: MidiPitch(60 + i)}, labels={}, relative_onset=float(i),
+                      relative_duration=1.0, tempo=120.0, absolute_onset=i * 0.5, absolute_duration=0.5,
+                      notes=notes) for i in range(4)]
+
+
+def test_export_rejects_midi_events_with_notes(tmp_path):
+    builder = CorpusBuilder(GenericCorpus, keep_events=False).consume(midi_events([Note()]))
+    with pytest.raises(CorpusError):
+        builder.export(str(tmp_path / "corpus"))
+    assert not os.path.exists(str(tmp_path / "corpus"))
+
+    CorpusBuilder(GenericCorpus, keep_events=False).consume(midi_events([])).export(str(tmp_path / "corpus"))
+    events = BinaryCorpusFormat.load(str(tmp_path / "corpus")).events
+    assert [(e.absolute_onset, e.tempo, e.notes) for e in events] == [(i * 0.5, 120.0, []) for i in range(4)]
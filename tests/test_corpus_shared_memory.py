@@ -0,0 +1,77 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from gig.main.corpus import GenericCorpus
+from gig.main.corpus_event import GenericCorpusEvent
+from gig.main.corpus_shared_memory import SharedCorpusHandle
+from gig.main.descriptor import MidiPitch, Chroma12
+from gig.main.exceptions import CorpusError
+from gig.main.label import ChordLabel, IntLabel
+
+
+def make_corpus(n: int = 20) -> GenericCorpus:
+    rng = np.random.default_rng(0)
+    return GenericCorpus([GenericCorpusEvent(data={"i": i}, index=i,
+                                             descriptors={MidiPitch: MidiPitch(40 + i),
+                                                          Chroma12: Chroma12(rng.random(12))},
+                                             labels={IntLabel: IntLabel(i % 3),
+                                                     **({ChordLabel: ChordLabel("Db min7")} if i % 2 else {})})
+                          for i in range(n)])
+
+
+def summarize(corpus: GenericCorpus) -> tuple:
+    return (len(corpus),
+            [e.data["i"] for e in corpus.events],
+            corpus.get_descriptors_of_type(MidiPitch, as_array=True).tolist(),
+            corpus.get_descriptors_of_type(Chroma12, as_array=True).tolist(),
+            corpus.indices_with_label(ChordLabel("c# min7")).tolist(),
+            [e.labels for e in corpus.events])
+
+
+def attach_and_summarize(handle: SharedCorpusHandle, lazy_events: bool, results: multiprocessing.Queue) -> None:
+    corpus = GenericCorpus.attach(handle, lazy_events=lazy_events)
+    results.put(summarize(corpus))
+
+
+@pytest.mark.parametrize("lazy_events", [False, True])
+def test_attach_in_same_process(lazy_events):
+    corpus = make_corpus()
+    with corpus.share() as shared:
+        attached = GenericCorpus.attach(shared.handle, lazy_events=lazy_events)
+        assert summarize(attached) == summarize(corpus)
+        assert not attached.get_descriptor_array(Chroma12).values.flags.writeable
+
+
+@pytest.mark.parametrize("lazy_events", [False, True])
+def test_attach_in_other_process(lazy_events):
+    corpus = make_corpus()
+    with corpus.share() as shared:
+        results = multiprocessing.Queue()
+        process = multiprocessing.Process(target=attach_and_summarize, args=(shared.handle, lazy_events, results))
+        process.start()
+        summary = results.get(timeout=30)
+        process.join(timeout=30)
+    assert process.exitcode == 0
+    assert summary == summarize(corpus)
+
+
+def test_append_to_attached_corpus_does_not_modify_shared_memory():
+    corpus = make_corpus()
+    with corpus.share() as shared:
+        first = GenericCorpus.attach(shared.handle)
+        second = GenericCorpus.attach(shared.handle)
+        first.append(GenericCorpusEvent(data={"i": 20}, index=20,
+                                        descriptors={MidiPitch: MidiPitch(0), Chroma12: Chroma12(np.zeros(12))},
+                                        labels={IntLabel: IntLabel(0), ChordLabel: ChordLabel("Db min7")}))
+        assert len(first) == 21
+        assert first.indices_with_label(ChordLabel("c# min7")).tolist()[-1] == 20
+        assert summarize(second) == summarize(corpus)
+
+
+def test_attach_after_close():
+    shared = make_corpus().share()
+    shared.close()
+    with pytest.raises(CorpusError):
+        GenericCorpus.attach(shared.handle)
@@ -0,0 +1,90 @@
+from typing import List, Type
+
+import numpy as np
+import pytest
+
+from gig.main.descriptor import (Chroma12, Descriptor, DescriptorArray, FixedVectorialFeature, IntegralDescriptor,
+                                 MidiPitch)
+from gig.main.exceptions import DescriptorError, QueryError
+from gig.main.influence import DescriptorInfluence, LabelInfluence
+from gig.main.label import IntLabel
+from gig.main.query import InfluenceQuery
+
+
+def compatible_reference(cls: Type[Descriptor], descriptor_type: Type[Descriptor]) -> bool:
+    """ The definition of `compatible_with` before the compatibility tables """
+    return issubclass(descriptor_type, cls) or descriptor_type in cls._compatible_descriptors()
+
+
+def test_compatibility_tables_match_reference():
+    descriptor_types = [Descriptor, *Descriptor._registry]
+    for cls in descriptor_types:
+        for descriptor_type in descriptor_types:
+            assert cls.compatible_with(descriptor_type) == compatible_reference(cls, descriptor_type)
+            assert (descriptor_type in cls.subtypes()) == issubclass(descriptor_type, cls)
+
+
+def test_compatibility_tables_include_types_defined_later():
+    assert not MidiPitch.compatible_with(Chroma12)
+
+    class TopNote(IntegralDescriptor):
+        @staticmethod
+        def _compatible_descriptors() -> List[Type[Descriptor]]:
+            return [MidiPitch]
+
+    assert TopNote in IntegralDescriptor.subtypes()
+    assert TopNote.compatible_with(MidiPitch)
+    assert not MidiPitch.compatible_with(TopNote)
+    incompatible = TopNote.incompatible_types([MidiPitch, TopNote, Chroma12, FixedVectorialFeature])
+    assert incompatible == [Chroma12, FixedVectorialFeature]
+
+
+def test_validate_influence_query():
+    query = InfluenceQuery([DescriptorInfluence(MidiPitch(60)), LabelInfluence(IntLabel(1)),
+                            DescriptorInfluence(MidiPitch(62))])
+    assert query.descriptor_types() == {MidiPitch}
+    assert query.compatible_with(IntegralDescriptor)
+    query.validate(MidiPitch)
+
+    query.content.append(DescriptorInfluence(Chroma12(np.zeros(12))))
+    assert not query.compatible_with(MidiPitch)
+    with pytest.raises(QueryError):
+        query.validate(MidiPitch)
+
+
+def test_descriptor_array_indexing_and_iteration():
+    values = np.random.default_rng(0).random((5, 12))
+    array = DescriptorArray(Chroma12, values)
+    assert len(array) == 5
+    assert isinstance(array[2], Chroma12) and np.shares_memory(array[2].value, values)
+    assert np.array_equal(array[-1].value, values[-1])
+    assert isinstance(array[1:3], DescriptorArray) and np.array_equal(np.asarray(array[[4, 0]]), values[[4, 0]])
+    assert np.shares_memory(np.asarray(array), values)
+    assert all(np.array_equal(d.value, v) for d, v in zip(array, values))
+
+    pitches = DescriptorArray.from_descriptors([MidiPitch(60), MidiPitch(64)])
+    assert pitches.descriptor_type is MidiPitch
+    assert [type(d.value) for d in pitches] == [int, int] and pitches[1].value == 64
+
+
+@pytest.mark.parametrize("descriptor_type, values", [(MidiPitch, np.array([60.5, 61.0])),
+                                                     (MidiPitch, np.zeros((2, 2), dtype=int)),
+                                                     (Chroma12, np.zeros((2, 11)))])
+def test_descriptor_array_rejects_invalid_values(descriptor_type, values):
+    with pytest.raises(DescriptorError):
+        DescriptorArray(descriptor_type, values)
+
+
+def test_descriptor_array_from_invalid_descriptors():
+    with pytest.raises(DescriptorError):
+        DescriptorArray.from_descriptors([])
+    with pytest.raises(DescriptorError):
+        DescriptorArray.from_descriptors([MidiPitch(60), Chroma12(np.zeros(12))])
+
+
+def test_influences_from_descriptor_array():
+    values = np.random.default_rng(0).random((3, 12))
+    influences = DescriptorInfluence.from_descriptors(DescriptorArray(Chroma12, values))
+    assert len(influences) == 3
+    assert all(isinstance(i, DescriptorInfluence) and isinstance(i.value, Chroma12) for i in influences)
+    assert np.array_equal(influences[1].value.value, values[1])
@@ -0,0 +1,69 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from gig.main.corpus import GenericCorpus
+from gig.main.corpus_event import GenericCorpusEvent
+from gig.main.descriptor import MidiPitch
+from gig.main.descriptor_analyzer import FunctionAnalyzer
+from gig.main.exceptions import DescriptorError
+
+
+def make_corpus(descriptor_types=None) -> GenericCorpus:
+    return GenericCorpus([GenericCorpusEvent(data=60 + i, index=i, descriptors={}, labels={}) for i in range(5)],
+                         descriptor_types=descriptor_types)
+
+
+class CountingAnalyzer(FunctionAnalyzer):
+    def __init__(self):
+        super().__init__(MidiPitch, lambda event: event.data)
+        self.num_calls: int = 0
+
+    def analyze(self, events):
+        self.num_calls += 1
+        return super().analyze(events)
+
+
+def test_analyzed_descriptors_are_computed_once():
+    corpus = make_corpus()
+    analyzer = CountingAnalyzer()
+    corpus.register_analyzer(analyzer)
+    assert corpus.get_descriptors_of_type(MidiPitch, as_array=True).tolist() == [60, 61, 62, 63, 64]
+    assert corpus.gather_descriptors(MidiPitch, np.array([4, 0])).tolist() == [64, 60]
+    assert analyzer.num_calls == 1
+
+
+def test_analyzed_descriptors_are_persisted(tmp_path):
+    path = str(tmp_path / "corpus")
+    corpus = make_corpus()
+    corpus.export(path)
+    corpus.register_analyzer(CountingAnalyzer())
+    corpus.get_descriptors_of_type(MidiPitch, as_array=True)
+    corpus.persist_analyzed_descriptors()
+
+    loaded = GenericCorpus.load(path)
+    analyzer = CountingAnalyzer()
+    loaded.register_analyzer(analyzer)
+    assert loaded.get_descriptors_of_type(MidiPitch, as_array=True).tolist() == [60, 61, 62, 63, 64]
+    assert analyzer.num_calls == 0
+
+
+class ScalarAnalyzer(FunctionAnalyzer):
+    def analyze(self, events):
+        return np.array(60)
+
+
+def test_analyzer_with_invalid_shape():
+    corpus = make_corpus()
+    corpus.register_analyzer(ScalarAnalyzer(MidiPitch, lambda event: event.data))
+    with pytest.raises(DescriptorError):
+        corpus.get_descriptors_of_type(MidiPitch, as_array=True)
+
+
+def test_analyzed_descriptor_types_are_not_added_to_callers_list():
+    descriptor_types: List[type] = []
+    corpus = make_corpus(descriptor_types)
+    corpus.register_analyzer(FunctionAnalyzer(MidiPitch, lambda event: event.data))
+    corpus.get_descriptors_of_type(MidiPitch, as_array=True)
+    assert corpus.descriptor_types == [MidiPitch] and descriptor_types == []
@@ -0,0 +1,100 @@
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from gig.main.candidate import Candidate
+from gig.main.candidates import Candidates, DiscreteCandidates, ListCandidates, MatrixCandidates
+from gig.main.corpus import GenericCorpus
+from gig.main.corpus_event import GenericCorpusEvent
+from gig.main.descriptor import MidiPitch
+from gig.main.merge_handler import (MaxMergeHandler, MergeHandler, ProductMergeHandler, SumMergeHandler,
+                                    WeightedSumMergeHandler)
+
+
+def make_corpus(size: int) -> GenericCorpus:
+    return GenericCorpus([GenericCorpusEvent(data=None, index=i, descriptors={MidiPitch: MidiPitch(60 + i)},
+                                             labels={}) for i in range(size)])
+
+
+def make_inputs(seed: int) -> List[Candidates]:
+    rng = np.random.default_rng(seed)
+    corpora = [make_corpus(8), make_corpus(5)]
+
+    def random_peaks(corpus: GenericCorpus, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return rng.integers(0, len(corpus), n), rng.random(n) + 0.1, rng.integers(0, 2, n)
+
+    indices, scores, transform_ids = random_peaks(corpora[0], 10)
+    matrix = MatrixCandidates(np.r_[indices, [0, 1]], np.r_[scores, [0.5, 0.25]], corpora,
+                              corpus_ids=np.r_[np.zeros(10, dtype=int), [1, 1]],
+                              transforms=[0, 1], transform_ids=np.r_[transform_ids, [0, 1]])
+    indices, scores, transform_ids = random_peaks(corpora[0], 6)
+    discrete = DiscreteCandidates(corpora[0], indices, scores, transform_ids, transforms=[0, 1])
+    indices, scores, transform_ids = random_peaks(corpora[1], 6)
+    listed = ListCandidates([Candidate(corpora[1].events[i], s, t, corpora[1])
+                             for i, s, t in zip(indices, scores, transform_ids)], associated_corpus=corpora[1])
+    return [matrix, discrete, listed, MatrixCandidates.new_empty()]
+
+
+Key = Tuple[int, int, int]
+
+
+def reference_merge(candidates: List[Candidates], combine: Callable[[List[Tuple[int, float]]], float],
+                    require_all: bool = False) -> Dict[Key, float]:
+    """ The per-candidate Python loop used before the vectorized handlers """
+    grouped: Dict[Key, List[Tuple[int, float]]] = {}
+    for source, c in enumerate(candidates):
+        for candidate in c.get_candidates():
+            key: Key = (id(candidate.associated_corpus), candidate.event.index, candidate.transform)
+            grouped.setdefault(key, []).append((source, candidate.score))
+
+    num_non_empty: int = sum(1 for c in candidates if not c.is_empty())
+    return {key: combine(scores) for key, scores in grouped.items()
+            if not require_all or len({source for source, _ in scores}) == num_non_empty}
+
+
+def as_dict(candidates: Candidates) -> Dict[Key, float]:
+    merged: Dict[Key, float] = {}
+    for candidate in candidates.get_candidates():
+        key: Key = (id(candidate.associated_corpus), candidate.event.index, candidate.transform)
+        assert key not in merged
+        merged[key] = candidate.score
+    return merged
+
+
+def assert_same(actual: Dict[Key, float], expected: Dict[Key, float]) -> None:
+    assert actual.keys() == expected.keys()
+    assert np.allclose([actual[k] for k in expected], [expected[k] for k in expected])
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("handler, combine, require_all", [
+    (SumMergeHandler(), lambda s: sum(score for _, score in s), False),
+    (MaxMergeHandler(), lambda s: max(score for _, score in s), False),
+    (ProductMergeHandler(), lambda s: float(np.prod([score for _, score in s])), True),
+    (WeightedSumMergeHandler([0.5, 2.0]), lambda s: sum(score * [0.5, 2.0, 1.0, 1.0][i] for i, score in s), False),
+])
+def test_merge_handlers_match_reference(seed: int, handler: MergeHandler, combine, require_all: bool):
+    candidates = make_inputs(seed)
+    assert_same(as_dict(handler.merge(candidates)), reference_merge(candidates, combine, require_all))
+
+
+def test_product_merge_handler_removes_events_missing_from_an_input():
+    corpus = make_corpus(4)
+    merged = ProductMergeHandler().merge([MatrixCandidates(np.array([0, 1, 2]), np.array([0.5, 0.5, 2.0]), [corpus]),
+                                          MatrixCandidates(np.array([2, 1]), np.array([3.0, 4.0]), [corpus])])
+    assert dict(zip(merged.get_indices().tolist(), merged.get_scores().tolist())) == {1: 2.0, 2: 6.0}
+
+
+def test_weighted_sum_merge_handler_weights_are_parameters():
+    corpus = make_corpus(2)
+    handler = WeightedSumMergeHandler([1.0, 1.0])
+    handler.weights[1].value = 3.0
+    merged = handler.merge([MatrixCandidates(np.array([0]), np.array([1.0]), [corpus]),
+                            MatrixCandidates(np.array([0]), np.array([1.0]), [corpus])])
+    assert merged.get_scores().tolist() == [4.0]
+
+
+def test_merge_empty_inputs():
+    assert SumMergeHandler().merge([]).is_empty()
+    assert MaxMergeHandler().merge([MatrixCandidates.new_empty()]).is_empty()
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from gig.main.nearest_neighbour import NearestNeighbourIndex, FlatIndex, ProductQuantizedIndex
+
+
+def test_create_defaults_to_flat_index():
+    vectors: np.ndarray = np.random.default_rng(0).random((60000, 12))
+    assert isinstance(NearestNeighbourIndex.create(vectors), FlatIndex)
+
+
+def test_product_quantized_index_is_trained_explicitly():
+    rng: np.random.Generator = np.random.default_rng(0)
+    vectors, queries = rng.random((2000, 12)), rng.random((5, 12))
+    index: ProductQuantizedIndex = ProductQuantizedIndex(12, num_iterations=2)
+    with pytest.raises(ValueError):
+        index.train()
+    index.add(vectors)
+    assert not index.is_trained
+    index.train()
+    assert index.is_trained
+    flat: FlatIndex = FlatIndex(12)
+    flat.add(vectors)
+    for exact, approximate in zip(flat.query_radius(queries, 0.5), index.query_radius(queries, 0.5)):
+        assert np.array_equal(exact, approximate)
@@ -0,0 +1,101 @@
+from abc import ABC
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import pytest
+
+from gig.main.candidate import Candidate
+from gig.main.candidates import Candidates, DiscreteCandidates, MatrixCandidates
+from gig.main.corpus import GenericCorpus
+from gig.main.corpus_event import GenericCorpusEvent
+from gig.main.descriptor import MidiPitch
+from gig.main.exceptions import InputError
+from gig.main.post_filter import FusablePostFilter, PostFilter, PostFilterChain
+
+
+class ExampleFilter(PostFilter, ABC):
+    def __init__(self):
+        self.num_calls: int = 0
+
+    def feedback(self, candidate: Optional[Candidate], **kwargs) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class MinScore(FusablePostFilter, ExampleFilter):
+    def evaluate(self, candidates: Candidates) -> Tuple[Optional[np.ndarray], Optional[Union[float, np.ndarray]]]:
+        self.num_calls += 1
+        return candidates.get_scores() >= 0.3, None
+
+
+class PitchWeight(FusablePostFilter, ExampleFilter):
+    def evaluate(self, candidates: Candidates) -> Tuple[Optional[np.ndarray], Optional[Union[float, np.ndarray]]]:
+        self.num_calls += 1
+        return None, candidates.get_feature_array(MidiPitch) / 70.0
+
+
+class EvenPitch(FusablePostFilter, ExampleFilter):
+    def evaluate(self, candidates: Candidates) -> Tuple[Optional[np.ndarray], Optional[Union[float, np.ndarray]]]:
+        self.num_calls += 1
+        return candidates.get_feature_array(MidiPitch) % 2 == 0, 2.0
+
+
+class TopFive(ExampleFilter):
+    def filter(self, candidates: Candidates) -> Candidates:
+        self.num_calls += 1
+        filtered: Candidates = candidates.shallow_copy()
+        filtered.keep(candidates.top_k(5, sort=False))
+        return filtered
+
+
+def make_candidates(kind: str, seed: int) -> Candidates:
+    rng = np.random.default_rng(seed)
+    corpus = GenericCorpus([GenericCorpusEvent(data=None, index=i, descriptors={MidiPitch: MidiPitch(50 + i)},
+                                               labels={}) for i in range(20)])
+    indices: np.ndarray = rng.permutation(20)[:15]
+    scores: np.ndarray = rng.random(15)
+    if kind == "matrix":
+        return MatrixCandidates(indices, scores, [corpus])
+    return DiscreteCandidates(corpus, indices, scores)
+
+
+def apply_one_after_another(filters: List[PostFilter], candidates: Candidates) -> Candidates:
+    for post_filter in filters:
+        candidates = post_filter.filter(candidates)
+    return candidates
+
+
+@pytest.mark.parametrize("kind", ["matrix", "discrete"])
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("names", ["pitchweight minscore evenpitch",
+                                   "minscore, topfive, pitchweight",
+                                   "evenpitch topfive minscore pitchweight topfive"])
+def test_chain_matches_filters_applied_one_after_another(kind: str, seed: int, names: str):
+    candidates: Candidates = make_candidates(kind, seed)
+    scores_before: np.ndarray = candidates.get_scores().copy()
+
+    chained: Candidates = PostFilterChain.from_names(names, base_class=ExampleFilter).filter(candidates)
+    expected: Candidates = apply_one_after_another(PostFilterChain.from_names(names, ExampleFilter).filters,
+                                                   candidates)
+
+    chained_scores = dict(zip(chained.get_indices().tolist(), chained.get_scores().tolist()))
+    expected_scores = dict(zip(expected.get_indices().tolist(), expected.get_scores().tolist()))
+    assert chained_scores.keys() == expected_scores.keys()
+    assert np.allclose([chained_scores[i] for i in expected_scores], list(expected_scores.values()))
+    assert np.array_equal(candidates.get_scores(), scores_before)
+
+
+def test_chain_stops_once_empty():
+    remaining = [PitchWeight(), TopFive()]
+    chain = PostFilterChain([EvenPitch(), MinScore()] + remaining)
+    corpora = make_candidates("matrix", 0).associated_corpora()
+    candidates = MatrixCandidates(np.array([1, 3]), np.array([1.0, 1.0]), corpora)
+    assert chain.filter(candidates).is_empty()
+    assert [f.num_calls for f in remaining] == [0, 0]
+
+
+def test_chain_from_unknown_name():
+    with pytest.raises(InputError):
+        PostFilterChain.from_names("minscore notafilter", base_class=ExampleFilter)